@@ -11,6 +11,7 @@
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
 import argparse
+import sys
 
 from ceres.function.command import (
     collect_command_manage,
@@ -18,10 +19,16 @@ from ceres.function.command import (
     plugin_command_manage,
     register_on_manager,
 )
+from ceres.function.cache import COMMAND_CACHE
+from ceres.function.ledger import COMMAND_LEDGER
+
+KNOWN_HASHES_HELP = 'json map of section name to the hash the caller has, only changed sections are output'
 
 
 def main():
     parser = argparse.ArgumentParser()
+    parser.add_argument('--ledger', action="store_true", help='print the cost of executed commands as json to stderr')
+    parser.add_argument('--ledger-file', type=str, help='append the cost of executed commands to this file')
 
     subparsers = parser.add_subparsers()
 
@@ -36,6 +43,11 @@ def main():
     collection_group.add_argument('--host', type=str)
     collection_group.add_argument('--file', type=str)
     collection_group.add_argument('--application', action="store_true")
+    collection_group.add_argument('--all', action="store_true", help='collect the whole host inventory at once')
+    collection_group.add_argument('--roots', type=str, help='json array of container roots to collect the packages of')
+    subparsers_collection.add_argument('--refresh', action="store_true", help='ignore the snapshot of the host info')
+    subparsers_collection.add_argument('--fields', type=str, help='json array of the fields collected by --all')
+    subparsers_collection.add_argument('--known-hashes', type=str, help=KNOWN_HASHES_HELP)
     subparsers_collection.set_defaults(function=collect_command_manage)
 
     subparsers_plugin = subparsers.add_parser("plugin", help='manage plugin')
@@ -44,6 +56,7 @@ def main():
     plugin_group.add_argument('--stop', type=str)
     plugin_group.add_argument('--change-collect-items', type=str)
     plugin_group.add_argument('--info', action="store_true")
+    subparsers_plugin.add_argument('--known-hashes', type=str, help=KNOWN_HASHES_HELP)
     subparsers_plugin.set_defaults(function=plugin_command_manage)
 
     subparsers_cve = subparsers.add_parser("apollo", help="cve/bugfix related action")
@@ -55,11 +68,15 @@ def main():
     subparsers_cve.set_defaults(function=cve_command_manage)
 
     args = parser.parse_args()
+    if args.ledger or args.ledger_file:
+        COMMAND_LEDGER.enable(args.ledger_file)
     try:
         args.function(args)
     except AttributeError:
         print('error: you can get help for -h')
         exit(1)
+    if args.ledger:
+        print(COMMAND_LEDGER.dump(COMMAND_CACHE.stats), file=sys.stderr)
 
 
 if __name__ == '__main__':
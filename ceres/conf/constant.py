@@ -19,6 +19,14 @@ CERES_CONFIG_PATH = os.path.join(BASE_CONFIG_PATH, 'ceres.conf')
 DEFAULT_TOKEN_PATH = os.path.join(BASE_CONFIG_PATH, 'ceres_token.json')
 
 REPO_ID_FOR_CVE_MANAGE = 'aops-update'
+# deadline budget of a whole cve scan and timeout of the dnf command fixing one cve, in seconds
+CVE_SCAN_TIMEOUT = 900
+CVE_FIX_TIMEOUT = 3600
+# limits of collect --file, in bytes: the size of a file, and the total size of the files read by one collection
+COLLECT_FILE_MAX_SIZE = 1024 * 1024
+COLLECT_FILE_BYTE_BUDGET = 64 * 1024 * 1024
+# bytes read at once from a file whose size is unknown, such as the files of procfs and sysfs
+COLLECT_FILE_READ_SIZE = 64 * 1024
 
 INSTALLABLE_PLUGIN = ['gala-gopher']
 INFORMATION_ABOUT_RPM_SERVICE = {
@@ -34,6 +42,22 @@ SCANNED_APPLICATION = ["mysql", "kubernetes", "hadoop", "nginx", "docker", "gala
 # provide a dict about plugin name and its class name
 PLUGIN_WITH_CLASS = {'gala-gopher': "GalaGopher"}
 HOST_COLLECT_INFO_SUPPORT = ["cpu", "disk", "memory", "os"]
+# sections of the host info which are only collected when they are requested
+HOST_COLLECT_INFO_OPTIONAL = ["perf"]
+INVENTORY_FIELDS = [
+    "os_version",
+    "uuid",
+    "host_ip",
+    "host_ips",
+    "os",
+    "cpu",
+    "memory",
+    "disk",
+    "perf",
+    "application",
+    "plugin",
+    "installed_packages",
+]
 REGISTER_HELP_INFO = """
     you can choose start or register in manager,
     if you choose register,you need to provide the following information.
@@ -70,3 +94,4 @@ REGISTER_HELP_INFO = """
 class CommandExitCode:
     SUCCEED = 0
     FAIL = 255
+    TIMEOUT = 124
@@ -20,3 +20,16 @@ log = {
     "MAX_BYTES": 31457280,
     "BACKUP_COUNT": 30,
 }
+
+network = {"INTERFACE": ""}
+
+command = {
+    "MAX_CONCURRENCY": 8,
+    "TIMEOUT": 600,
+    "CACHE_FILE": os.path.join('/', 'var', 'cache', 'aops', 'ceres_command_cache.json'),
+    "SNAPSHOT_FILE": os.path.join('/', 'var', 'cache', 'aops', 'ceres_host_snapshot.json'),
+    "PACKAGE_INDEX_FILE": os.path.join('/', 'var', 'cache', 'aops', 'ceres_package_index.json'),
+    "LEDGER_FILE": "",
+    "SPAWNER": "posix_spawn",
+    "SHIM_DIR": "",
+}
@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+asyncio execution core used by async_execute_shell_command.
+
+It shares the stage grouping of the pipeline engine, so filter stages are still emulated
+in-process, while real processes are started with asyncio subprocesses and can overlap
+with each other. The number of commands running at the same time on one event loop is
+limited by the MAX_CONCURRENCY option in the command section of the configuration.
+Timeouts are enforced the same way as in the pipeline engine: the process group of every
+stage is terminated and the partial output is returned with CommandExitCode.TIMEOUT.
+Commands are recorded in the command ledger too, but without CPU time and max RSS, since
+asyncio reaps its children itself and their resource usage is lost.
+"""
+import asyncio
+import os
+import weakref
+from typing import List, Optional, Tuple
+
+from ceres.conf import configuration
+from ceres.conf.constant import CommandExitCode
+from ceres.function.cache import COMMAND_CACHE, CachePolicy
+from ceres.function.deadline import ProcessWatchdog
+from ceres.function.ledger import COMMAND_LEDGER, CommandTimer
+from ceres.function.log import LOGGER
+from ceres.function.pipeline import LineFilter, group_stages, plan_pipeline, split_pipeline
+from ceres.function.spawn import find_executable
+
+_SEMAPHORES = weakref.WeakKeyDictionary()
+
+
+def get_command_semaphore() -> asyncio.Semaphore:
+    """
+    Get the semaphore which limits concurrent commands on the running event loop.
+
+    Returns:
+        asyncio.Semaphore
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _SEMAPHORES.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(configuration.command.get("MAX_CONCURRENCY"))
+        _SEMAPHORES[loop] = semaphore
+    return semaphore
+
+
+async def _feed_stdin(writer: asyncio.StreamWriter, data: bytes) -> None:
+    """
+    Write data to the stdin of the first process and close it.
+    """
+    try:
+        writer.write(data)
+        await writer.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _run_processes(
+    argv_list: List[List[str]], input_data: Optional[str], watchdog: ProcessWatchdog, **kwargs
+) -> Tuple[int, str, str]:
+    """
+    Run a chain of processes connected by pipes and wait for all of them.
+
+    Args:
+        argv_list(list): argument list of every process
+        input_data(str): data written to stdin of the first process, None means no input
+        watchdog(ProcessWatchdog): every process leads its own process group watched by it
+        **kwargs: keyword arguments used to create the subprocesses, e.g env and cwd
+
+    Returns:
+        Tuple[int, str, str]: return code, stdout and stderr of the last process
+    """
+    processes = []
+    read_fd = None
+    try:
+        for index, argv in enumerate(argv_list):
+            is_last = index == len(argv_list) - 1
+            if index > 0:
+                stdin = read_fd
+            else:
+                stdin = asyncio.subprocess.DEVNULL if input_data is None else asyncio.subprocess.PIPE
+            read_fd, write_fd = (None, None) if is_last else os.pipe()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    find_executable(argv[0], kwargs.get("env")),
+                    *argv[1:],
+                    stdin=stdin,
+                    stdout=asyncio.subprocess.PIPE if is_last else write_fd,
+                    stderr=asyncio.subprocess.PIPE if is_last else asyncio.subprocess.DEVNULL,
+                    start_new_session=True,
+                    **kwargs,
+                )
+                # asyncio processes don't keep their argv, the command ledger reports it
+                process.args = argv
+                watchdog.register(process)
+            finally:
+                if index > 0:
+                    os.close(stdin)
+                if write_fd is not None:
+                    os.close(write_fd)
+            processes.append(process)
+    except Exception:
+        if read_fd is not None:
+            os.close(read_fd)
+        for process in processes:
+            if process.returncode is None:
+                process.kill()
+        raise
+
+    data = None if input_data is None else input_data.encode("utf-8")
+    if data is not None and len(processes) > 1:
+        stdout, stderr = (await asyncio.gather(processes[-1].communicate(), _feed_stdin(processes[0].stdin, data)))[0]
+    else:
+        stdout, stderr = await processes[-1].communicate(data)
+    for process in processes[:-1]:
+        await process.wait()
+    return processes[-1].returncode, stdout.decode("utf-8"), stderr.decode("utf-8")
+
+
+async def run_pipeline_async(
+    command: str, cache: Optional[CachePolicy] = None, timeout: Optional[float] = None, **kwargs
+) -> Tuple[int, str, str]:
+    """
+    Execute a shell pipeline with asyncio subprocesses, filter stages are emulated in-process.
+
+    Args:
+        command(str): shell command, stages are separated by "|"
+        cache(CachePolicy): cache the output of the first stage with this policy
+        timeout(float): seconds after which the whole pipeline is terminated, None means no limit
+        **kwargs: keyword arguments used to create the subprocesses, e.g env and cwd
+
+    Returns:
+        Tuple[int, str, str]
+        a tuple containing three elements (return code, standard output, standard error).
+    """
+    if timeout is not None and timeout <= 0:
+        LOGGER.warning(f"Deadline exceeded before executing command: {command}")
+        return CommandExitCode.TIMEOUT, "", "deadline exceeded"
+
+    timer = CommandTimer()
+    watchdog = ProcessWatchdog(timeout)
+    try:
+        result, cached = await _run_stages(split_pipeline(command), cache, watchdog, **kwargs)
+    except BaseException:
+        watchdog.cancel(kill=True)
+        raise
+    watchdog.cancel()
+
+    if watchdog.expired:
+        LOGGER.warning(f"Command timed out after {timeout:.1f}s: {command}")
+        result = CommandExitCode.TIMEOUT, result[1], result[2]
+    COMMAND_LEDGER.record_result(command, watchdog.processes, timer, result, cached)
+    return result
+
+
+async def _run_stages(
+    stages: List[List[str]], cache: Optional[CachePolicy], watchdog: ProcessWatchdog, **kwargs
+) -> Tuple[Tuple[int, str, str], bool]:
+    """
+    Execute the stages of a pipeline, see run_pipeline_async.
+
+    Returns:
+        Tuple[int, str, str]: result of the pipeline
+        bool: whether the output of the first stage came from the cache
+    """
+    cached = False
+    if cache is None:
+        source, groups = plan_pipeline(stages, kwargs.get("cwd"))
+    else:
+        result = COMMAND_CACHE.get(stages[0], kwargs, cache)
+        cached = result is not None
+        if not cached:
+            result = await _run_processes(stages[:1], None, watchdog, **kwargs)
+            if not watchdog.expired:
+                COMMAND_CACHE.set(stages[0], kwargs, cache, result)
+        if len(stages) == 1:
+            return (result[0], result[1].strip(), result[2].strip()), cached
+        source, groups = result[1].splitlines(keepends=True), group_stages(stages[1:], has_input=True)
+
+    lines = source
+    returncode, stderr = 0, ""
+    for group in groups:
+        if isinstance(group, LineFilter):
+            lines = list(group(lines or []))
+            returncode, stderr = group.returncode, ""
+        else:
+            returncode, stdout, stderr = await _run_processes(
+                group, None if lines is None else "".join(lines), watchdog, **kwargs
+            )
+            lines = stdout.splitlines(keepends=True)
+    return (returncode, "".join(lines or []).strip(), stderr.strip()), cached
@@ -0,0 +1,224 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+TTL result cache for read-only shell commands.
+
+Callers opt in per command by passing a CachePolicy to execute_shell_command. The output of
+the first stage of the pipeline is cached, so "systemctl status X|grep Active" and
+"systemctl status X|grep Main" share one systemctl process. An entry is valid until its TTL
+expires or one of its invalidation keys changes: the mtime of a file or directory, or the
+boot id for hardware facts. Small entries are also saved to a file when the process exits,
+so that repeated CLI invocations hit the cache too.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from ceres.conf import configuration
+from ceres.conf.constant import CommandExitCode
+from ceres.function.log import LOGGER
+
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Describe how the result of a command can be cached.
+
+    Attributes:
+        ttl: seconds the result stays valid
+        depends_on: files or directories whose change invalidates the result, the mtime of
+            a directory and of its direct children are checked
+        per_boot: whether the result is invalidated by a reboot
+        success_codes: return codes of results which can be cached
+    """
+
+    ttl: int
+    depends_on: Tuple[str, ...] = ()
+    per_boot: bool = False
+    success_codes: Tuple[int, ...] = (CommandExitCode.SUCCEED,)
+
+
+def _read_boot_id() -> str:
+    try:
+        with open(BOOT_ID_PATH, "r", encoding="utf-8") as file:
+            return file.read().strip()
+    except OSError:
+        return ""
+
+
+def _path_fingerprint(path: str) -> list:
+    """
+    Get the mtime fingerprint of a path, a directory also contains its direct children.
+
+    Returns:
+        list: e.g ["/etc/yum.repos.d", 1690000000000000000, [["a.repo", 1690000000000000000]]]
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [path, None]
+    fingerprint = [path, stat.st_mtime_ns]
+    if os.path.isdir(path):
+        try:
+            with os.scandir(path) as entries:
+                fingerprint.append(sorted([entry.name, entry.stat().st_mtime_ns] for entry in entries))
+        except OSError:
+            fingerprint.append(None)
+    return fingerprint
+
+
+class CommandCache:
+    """
+    In-memory command result cache with a small on-disk backing file.
+
+    Attributes:
+        hits: number of lookups served from the cache
+        misses: number of lookups which had to execute the command
+    """
+
+    def __init__(self, cache_file: Optional[str] = None, max_entries: int = 64, max_disk_entry_size: int = 65536):
+        self._cache_file = cache_file
+        self._max_entries = max_entries
+        self._max_disk_entry_size = max_disk_entry_size
+        self._entries: Dict[str, dict] = {}
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(argv: List[str], kwargs: dict) -> str:
+        """
+        Make cache key from command arguments and the options which change its output.
+        """
+        return json.dumps([argv, kwargs.get("env"), kwargs.get("cwd")], sort_keys=True)
+
+    @staticmethod
+    def _make_validators(policy: CachePolicy) -> list:
+        validators = [_path_fingerprint(path) for path in policy.depends_on]
+        if policy.per_boot:
+            validators.append(["boot_id", _read_boot_id()])
+        return validators
+
+    def _load(self) -> None:
+        self._loaded = True
+        if not self._cache_file or not os.path.exists(self._cache_file):
+            return
+        try:
+            with open(self._cache_file, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+        except (OSError, ValueError) as error:
+            LOGGER.debug(f"Failed to load command cache: {error}")
+            return
+        if isinstance(entries, dict):
+            self._entries.update(entries)
+
+    def _save(self) -> None:
+        if not self._cache_file:
+            return
+        now = time.time()
+        entries = {
+            key: entry
+            for key, entry in self._entries.items()
+            if entry["expire"] > now and len(entry["result"][1]) + len(entry["result"][2]) <= self._max_disk_entry_size
+        }
+        try:
+            cache_dir = os.path.dirname(self._cache_file)
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".command_cache.")
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(entries, file)
+            os.replace(tmp_path, self._cache_file)
+        except OSError as error:
+            LOGGER.debug(f"Failed to save command cache: {error}")
+
+    def get(self, argv: List[str], kwargs: dict, policy: CachePolicy) -> Optional[Tuple[int, str, str]]:
+        """
+        Get the cached result of a command.
+
+        Returns:
+            Tuple[int, str, str]: return code, stdout and stderr, None if there is no valid entry
+        """
+        key = self.make_key(argv, kwargs)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            entry = self._entries.get(key)
+            if entry is not None and entry["expire"] > time.time():
+                if entry["validators"] == self._make_validators(policy):
+                    self.hits += 1
+                    return tuple(entry["result"])
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, argv: List[str], kwargs: dict, policy: CachePolicy, result: Tuple[int, str, str]) -> None:
+        """
+        Save the result of a command if its return code can be cached.
+        """
+        if result[0] not in policy.success_codes:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._entries[self.make_key(argv, kwargs)] = {
+                "expire": time.time() + policy.ttl,
+                "validators": self._make_validators(policy),
+                "result": list(result),
+            }
+            while len(self._entries) > self._max_entries:
+                self._entries.pop(min(self._entries, key=lambda key: self._entries[key]["expire"]))
+            self._dirty = True
+
+    def invalidate(self, argv: List[str]) -> None:
+        """
+        Drop every entry of a command whatever its env and cwd, e.g after the state of a unit changes.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            prefix = json.dumps([argv], sort_keys=True)[:-1]
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._entries.pop(key)
+            if keys:
+                self._dirty = True
+
+    def flush(self) -> None:
+        """
+        Save the entries to the backing file if they changed, it is called once when the process exits
+        instead of after every command.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save()
+                self._dirty = False
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Get hit and miss counters of this process.
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+COMMAND_CACHE = CommandCache(configuration.command.get("CACHE_FILE"))
+atexit.register(COMMAND_CACHE.flush)
@@ -12,10 +12,12 @@
 # ******************************************************************************/
 import argparse
 import json
-from typing import NoReturn
+from typing import Dict, NoReturn, Optional
 
-from ceres.conf.constant import CERES_CONFIG_PATH, INSTALLABLE_PLUGIN, PLUGIN_WITH_CLASS
+from ceres.conf.constant import CERES_CONFIG_PATH, INSTALLABLE_PLUGIN, PLUGIN_WITH_CLASS, REPO_ID_FOR_CVE_MANAGE
+from ceres.function.delta import make_delta_response
 from ceres.function.log import LOGGER
+from ceres.function.package_index import PackageIndex
 from ceres.function.register import register, register_info_to_dict
 from ceres.function.schema import (
     CHANGE_COLLECT_ITEMS_SCHEMA,
@@ -23,10 +25,13 @@ from ceres.function.schema import (
     CVE_ROLLBACK_SCHEMA,
     CVE_SCAN_SCHEMA,
     HOST_INFO_SCHEMA,
+    INVENTORY_SCHEMA,
+    KNOWN_HASHES_SCHEMA,
     REPO_SET_SCHEMA,
+    ROOTS_SCHEMA,
     STRING_ARRAY,
 )
-from ceres.function.status import SUCCESS, StatusCode
+from ceres.function.status import FILE_NOT_FOUND, SUCCESS, StatusCode
 from ceres.function.util import (
     convert_string_to_json,
     get_dict_from_file,
@@ -36,6 +41,8 @@ from ceres.function.util import (
 )
 from ceres.manages import plugin_manage
 from ceres.manages.collect_manage import Collect
+from ceres.manages.inventory_manage import HostInventory
+from ceres.manages.rootfs_manage import RootfsInventory
 from ceres.manages.vulnerability_manage import VulnerabilityManage
 
 
@@ -115,19 +122,64 @@ def change_collect_items(collect_items_status: dict) -> dict:
     return {"resp": res}
 
 
+def get_known_hashes(args: argparse.Namespace) -> Optional[Dict[str, str]]:
+    """
+    Get the section hashes sent by the caller, the response is a delta response when they are given.
+
+    Returns:
+        dict: section name -> hash, None if the caller wants the full response
+    """
+    if getattr(args, "known_hashes", None) is None:
+        return None
+    known_hashes = convert_string_to_json(args.known_hashes)
+    if not validate_data(known_hashes, KNOWN_HASHES_SCHEMA):
+        exit(1)
+    return known_hashes
+
+
 def collect_command_manage(args):
+    known_hashes = get_known_hashes(args)
     if args.host:
         data = convert_string_to_json(args.host)
         if not validate_data(data, HOST_INFO_SCHEMA):
             exit(1)
-        print(json.dumps(Collect().get_host_info(data)))
+        host_info = Collect().get_host_info(data, refresh=args.refresh)
+        if known_hashes is not None:
+            host_info = make_delta_response(host_info.items(), known_hashes)
+        print(json.dumps(host_info))
     elif args.application:
-        print(json.dumps(Collect.get_application_info()))
+        application_info = Collect.get_application_info()
+        if known_hashes is not None:
+            application_info = make_delta_response([("application", application_info)], known_hashes)
+        print(json.dumps(application_info))
+    elif args.all:
+        fields = None
+        if args.fields is not None:
+            fields = convert_string_to_json(args.fields)
+            if not validate_data(fields, INVENTORY_SCHEMA):
+                exit(1)
+        inventory = HostInventory().get_inventory(fields)
+        if known_hashes is not None:
+            inventory = make_delta_response(inventory.items(), known_hashes)
+        print(json.dumps(inventory))
+    elif args.roots:
+        roots = convert_string_to_json(args.roots)
+        if not validate_data(roots, ROOTS_SCHEMA):
+            exit(1)
+        inventory = RootfsInventory(roots).get_inventory()
+        if known_hashes is not None:
+            inventory = make_delta_response(inventory.items(), known_hashes)
+        print(json.dumps(inventory))
     elif args.file:
         data = convert_string_to_json(args.file)
         if not validate_data(data, STRING_ARRAY):
             exit(1)
-        print(json.dumps(Collect.collect_file(data)))
+        file_info = Collect.collect_file(data)
+        if known_hashes is not None:
+            # each file is a section, the section of a file which can not be collected is None
+            infos = dict(zip(file_info["success_files"], file_info["infos"]))
+            file_info = make_delta_response(((path, infos.get(path)) for path in data), known_hashes)
+        print(json.dumps(file_info))
     else:
         print("Please check the input parameters!")
         exit(1)
@@ -150,12 +202,38 @@ def plugin_command_manage(args):
             exit(1)
         print(json.dumps(change_collect_items(data)))
     elif args.info:
-        print(json.dumps(Collect.get_plugin_info()))
+        plugin_info = Collect.get_plugin_info()
+        known_hashes = get_known_hashes(args)
+        if known_hashes is not None:
+            plugin_info = make_delta_response(((info["plugin_name"], info) for info in plugin_info), known_hashes)
+        print(json.dumps(plugin_info))
     else:
         print("Please check the input parameters!")
         exit(1)
 
 
+def get_installed_packages_result(package_index: Optional[PackageIndex], generation: Optional[int]) -> dict:
+    """
+    get the installed packages of a scan, only the changes are returned when the caller knows the
+    packages of a generation of the index which is still kept
+
+    Returns:
+        dict: e.g {"package_status": "Succeed", "package_generation": 1665452400, "installed_packages": [...]},
+            or {"package_status": "Succeed", "package_generation": 1665452402, "package_changes": {"added": [...],
+            "removed": [...], "upgraded": [...]}}, or {"package_status": "File.Not.Found"} if the installed
+            packages can not be queried
+    """
+    if package_index is None:
+        return {"package_status": FILE_NOT_FOUND}
+    result = {"package_status": SUCCESS, "package_generation": package_index.generation}
+    changes = package_index.get_changes(generation) if generation is not None else None
+    if changes is None:
+        result["installed_packages"] = package_index.get_packages()
+    else:
+        result["package_changes"] = changes
+    return result
+
+
 def cve_command_manage(args):
     if args.set_repo:
         data = convert_string_to_json(args.set_repo)
@@ -170,11 +248,13 @@ def cve_command_manage(args):
             exit(1)
         status_code, cve_scan_info = VulnerabilityManage().cve_scan(data)
         result = {
-            "unfixed_cves": cve_scan_info["unfixed_cves"],
-            "fixed_cves": cve_scan_info["fixed_cves"],
-            "os_version": Collect.get_system_info(),
-            "installed_packages": Collect.get_installed_packages(),
+            "unfixed_cves": cve_scan_info.get("unfixed_cves", []),
+            "fixed_cves": cve_scan_info.get("fixed_cves", []),
+            "os_version": Collect.get_os_version(),
         }
+        result.update(get_installed_packages_result(Collect.get_package_index(), data.get("package_generation")))
+        if data.get("roots"):
+            result["roots"] = RootfsInventory(data["roots"]).scan_cves(REPO_ID_FOR_CVE_MANAGE)
         print(json.dumps(StatusCode.make_response_body((status_code, {"result": result}))))
     elif args.fix:
         data = convert_string_to_json(args.fix)
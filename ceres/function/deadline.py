@@ -0,0 +1,194 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Deadline budgets for executed commands.
+
+Every command gets a timeout: the one passed by the caller, or else the TIMEOUT option in
+the command section of the configuration. A transaction which must not be interrupted, such
+as a dnf or syscare operation rolling back, passes NO_TIMEOUT. An operation such as cve_scan can also open an
+operation deadline, the commands executed inside it never run longer than what is left of
+the operation budget, and the operation can split the budget across its sub-commands with
+budget_share. Children are started in their own process group, ProcessWatchdog terminates
+the whole group when the timeout expires.
+"""
+import contextvars
+import math
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from ceres.conf import configuration
+
+# seconds between SIGTERM and SIGKILL, so that dnf and rpm can release their locks
+KILL_GRACE_PERIOD = 5
+
+# timeout of a command which runs without limit, only the current operation deadline applies
+NO_TIMEOUT = math.inf
+
+_OPERATION_DEADLINE = contextvars.ContextVar("operation_deadline", default=None)
+
+
+class Deadline:
+    """
+    A point in time after which no more command should be running.
+    """
+
+    def __init__(self, seconds: float):
+        self._expire = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """
+        Seconds left before the deadline, 0 if it has passed.
+        """
+        return max(0.0, self._expire - time.monotonic())
+
+    def share(self, parts: int) -> float:
+        """
+        Split the remaining budget evenly between the sub-commands which are left.
+
+        Args:
+            parts(int): number of sub-commands which still need to be executed
+
+        Returns:
+            float: seconds granted to the next sub-command
+        """
+        return self.remaining() / max(parts, 1)
+
+
+@contextmanager
+def operation_deadline(seconds: float) -> Iterator[Deadline]:
+    """
+    Open a deadline budget for an operation, nested operations never exceed the outer budget.
+
+    Example usage:
+    >>> with operation_deadline(900):
+    ...     execute_shell_command("dnf updateinfo list cves --installed", timeout=budget_share(2))
+    """
+    deadline = Deadline(seconds)
+    parent = _OPERATION_DEADLINE.get()
+    if parent is not None and parent.remaining() < deadline.remaining():
+        deadline = parent
+    token = _OPERATION_DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _OPERATION_DEADLINE.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """
+    Get the deadline of the operation which is running, None if there is no such operation.
+    """
+    return _OPERATION_DEADLINE.get()
+
+
+def budget_share(parts: int) -> Optional[float]:
+    """
+    Get the share of the current operation budget for the next of the remaining sub-commands.
+
+    Returns:
+        float: seconds, None if no operation deadline is open
+    """
+    deadline = current_deadline()
+    return None if deadline is None else deadline.share(parts)
+
+
+def command_timeout(timeout: Optional[float] = None) -> Optional[float]:
+    """
+    Get the timeout of a command: the timeout required by the caller, or the configured default
+    timeout if there is none, capped by the rest of the current operation budget.
+
+    Args:
+        timeout(float): seconds required by the caller, None for the configured default timeout,
+            NO_TIMEOUT for no limit
+
+    Returns:
+        float: seconds, None means no limit
+    """
+    if timeout is None:
+        timeout = configuration.command.get("TIMEOUT") or None
+    elif timeout == NO_TIMEOUT:
+        timeout = None
+    deadline = current_deadline()
+    if deadline is not None:
+        timeout = deadline.remaining() if timeout is None else min(timeout, deadline.remaining())
+    return timeout
+
+
+class ProcessWatchdog:
+    """
+    Terminate the process groups of registered children when the timeout expires.
+
+    Attributes:
+        expired: whether the timeout has expired and the children have been terminated
+    """
+
+    def __init__(self, timeout: Optional[float], grace: float = KILL_GRACE_PERIOD):
+        self.expired = False
+        self._grace = grace
+        self._processes = []
+        self._timers = []
+        self._lock = threading.Lock()
+        if timeout is not None:
+            self._start_timer(timeout, self._expire)
+
+    def _start_timer(self, interval: float, function) -> None:
+        timer = threading.Timer(interval, function)
+        timer.daemon = True
+        self._timers.append(timer)
+        timer.start()
+
+    @property
+    def processes(self) -> list:
+        """
+        Children registered so far, in start order.
+        """
+        with self._lock:
+            return list(self._processes)
+
+    def register(self, process) -> None:
+        """
+        Watch a child which has been started with a new session, e.g Popen or asyncio Process.
+        """
+        with self._lock:
+            self._processes.append(process)
+        if self.expired:
+            self._signal(signal.SIGKILL)
+
+    def _signal(self, signum: int) -> None:
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            if process.returncode is not None:
+                continue
+            try:
+                os.killpg(process.pid, signum)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    def _expire(self) -> None:
+        self.expired = True
+        self._signal(signal.SIGTERM)
+        self._start_timer(self._grace, lambda: self._signal(signal.SIGKILL))
+
+    def cancel(self, kill: bool = False) -> None:
+        """
+        Stop watching, the children which are still running are killed if kill is True.
+        """
+        for timer in self._timers:
+            timer.cancel()
+        if kill:
+            self._signal(signal.SIGKILL)
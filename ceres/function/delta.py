@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Delta responses of the collect outputs.
+
+The caller of the CLI may send the hashes of the sections it already has, the response then
+carries the hash of every section and the data of the changed sections only, e.g
+
+    {
+        "os": {"hash": "9f2c...", "not_modified": true},
+        "disk": {"hash": "41ab...", "data": [...]}
+    }
+
+The sections are the fields of collect --host and --all, the application list of collect
+--application, the roots of collect --roots and the paths of collect --file, a file which can
+not be collected is a None section.
+
+A hash is the sha256 of the canonical JSON of the section: sorted keys, no whitespace, and
+non-ASCII characters kept as they are, so it does not depend on the order the data was built in.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Tuple
+
+NOT_MODIFIED = "not_modified"
+
+
+def section_hash(data: Any) -> str:
+    """
+    Get the content hash of a section.
+
+    Returns:
+        str: hex sha256 of the canonical JSON of the section
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def make_delta_response(sections: Iterable[Tuple[str, Any]], known_hashes: Dict[str, str]) -> Dict[str, dict]:
+    """
+    Replace the sections whose hash the caller already has with a not-modified marker.
+
+    Args:
+        sections: (section name, data) of the response in the order to output them
+        known_hashes: section name -> hash the caller already has
+
+    Returns:
+        dict: section name -> {"hash": str, "data": data} or {"hash": str, "not_modified": True}
+    """
+    response = {}
+    for name, data in sections:
+        digest = section_hash(data)
+        if known_hashes.get(name) == digest:
+            response[name] = {"hash": digest, NOT_MODIFIED: True}
+        else:
+            response[name] = {"hash": digest, "data": data}
+    return response
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Comparison of rpm (epoch, version, release) values with the semantics of rpmvercmp.
+
+A version is tokenized once into a flat tuple of (rank, value) pairs whose natural order is
+the order of rpmvercmp, so that comparing two versions is a single tuple comparison done by
+the interpreter:
+
+    ~          (0, 0)    sorts before everything, even the end of the version
+    end        (1, 0)    appended to every version
+    ^          (2, 0)    sorts after the end of the version, before any other segment
+    letters    (3, str)  compared as strcmp does
+    digits     (4, int)  leading zeros are ignored, a number is newer than letters
+
+Any other character only separates the segments. The parsed values are kept in an LRU, the
+versions of the installed packages and of the advisories are parsed once per process.
+"""
+import re
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Union
+
+EVR_CACHE_SIZE = 65536
+
+_SEGMENT_PATTERN = re.compile(r"~|\^|[0-9]+|[a-zA-Z]+")
+_TILDE = (0, 0)
+_END = (1, 0)
+_CARET = (2, 0)
+
+VersionKey = Tuple[Union[int, str], ...]
+# epoch, version key, release key, the release key is None when the release is not given
+EvrKey = Tuple[int, VersionKey, Optional[VersionKey]]
+Evr = Union[str, Tuple[Optional[int], str, Optional[str]]]
+
+
+@lru_cache(maxsize=EVR_CACHE_SIZE)
+def version_key(version: str) -> VersionKey:
+    """
+    Tokenize a version or a release, two keys compare as rpmvercmp compares the strings.
+
+    Args:
+        version(str): e.g 1.2~rc1
+
+    Returns:
+        tuple: e.g (4, 1, 4, 2, 0, 0, 3, "rc", 4, 1, 1, 0)
+    """
+    key = []
+    for segment in _SEGMENT_PATTERN.findall(version):
+        if segment == "~":
+            key.extend(_TILDE)
+        elif segment == "^":
+            key.extend(_CARET)
+        elif segment.isdigit():
+            key.extend((4, int(segment)))
+        else:
+            key.extend((3, segment))
+    key.extend(_END)
+    return tuple(key)
+
+
+@lru_cache(maxsize=EVR_CACHE_SIZE)
+def parse_evr(evr: Evr) -> EvrKey:
+    """
+    Parse an EVR into its comparison key, a missing epoch is 0.
+
+    Args:
+        evr: [epoch:]version[-release], e.g 1:5.10.0-136.oe2203, or a tuple (epoch, version, release)
+            such as the fields of an installed rpm package
+
+    Returns:
+        tuple: (epoch, version key, release key)
+    """
+    if isinstance(evr, str):
+        epoch, _, version = evr.rpartition(":")
+        version, separator, release = version.rpartition("-")
+        if not separator:
+            version, release = release, None
+    else:
+        epoch, version, release = evr
+    return (
+        int(epoch) if epoch not in (None, "") else 0,
+        version_key(version),
+        version_key(release) if release is not None else None,
+    )
+
+
+def _compare_keys(first: EvrKey, second: EvrKey) -> int:
+    # as rpm does, the releases are only compared when both are given
+    if first[2] is None or second[2] is None:
+        first, second = first[:2], second[:2]
+    return (first > second) - (first < second)
+
+
+def compare_evr(first: Evr, second: Evr) -> int:
+    """
+    Compare two EVRs.
+
+    Returns:
+        int: 1 if first is newer, 0 if they are equal, -1 if second is newer
+    """
+    return _compare_keys(parse_evr(first), parse_evr(second))
+
+
+def compare_evr_matrix(rows: Sequence[Evr], columns: Sequence[Evr]) -> List[List[int]]:
+    """
+    Compare every EVR of rows with every EVR of columns, e.g the installed packages with the
+    fixed versions of the advisories.
+
+    Returns:
+        list: one list per row, the result of compare_evr(row, column) for each column
+    """
+    row_keys = [parse_evr(evr) for evr in rows]
+    column_keys = [parse_evr(evr) for evr in columns]
+    if any(key[2] is None for key in row_keys) or any(key[2] is None for key in column_keys):
+        return [[_compare_keys(row, column) for column in column_keys] for row in row_keys]
+    return [[(row > column) - (row < column) for column in column_keys] for row in row_keys]
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Lazy and memoized facts with declared dependencies.
+
+A fact is computed the first time it is asked for, after the facts it depends on, which are
+passed to it as keyword arguments. Its value is then kept by the graph, so every fact is
+computed at most once whatever the number of facts depending on it, including when they are
+asked for by several threads at the same time.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from ceres.function.log import LOGGER
+
+
+@dataclass(frozen=True)
+class FactDefinition:
+    """
+    Describe how a fact is computed.
+
+    Attributes:
+        func: computes the fact, the facts of depends_on are passed as keyword arguments
+        depends_on: names of the facts which must be computed first
+    """
+
+    func: Callable[..., Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+class FactGraph:
+    """
+    Values of the facts computed so far, a graph lives as long as one invocation of the agent.
+    """
+
+    def __init__(self, definitions: Dict[str, FactDefinition]):
+        self._definitions = definitions
+        self._check_definitions()
+        self._values: Dict[str, Any] = {}
+        self._locks = {name: threading.Lock() for name in definitions}
+
+    def _check_definitions(self) -> None:
+        """
+        Make sure every dependency is defined and there is no cycle.
+
+        Raises:
+            ValueError
+        """
+        visited = set()
+
+        def visit(name: str, path: List[str]) -> None:
+            if name in path:
+                raise ValueError(f"fact cycle: {' -> '.join(path + [name])}")
+            if name not in self._definitions:
+                raise ValueError(f"unknown fact {name} required by {path[-1]}")
+            if name in visited:
+                return
+            for dependency in self._definitions[name].depends_on:
+                visit(dependency, path + [name])
+            visited.add(name)
+
+        for fact_name in self._definitions:
+            visit(fact_name, [])
+
+    def get(self, name: str) -> Any:
+        """
+        Get the value of a fact, it is computed with its dependencies the first time.
+
+        Raises:
+            KeyError: the fact is unknown
+            the error raised by the fact or one of its dependencies, it is raised again each time
+        """
+        definition = self._definitions[name]
+        with self._locks[name]:
+            if name not in self._values:
+                try:
+                    kwargs = {dependency: self.get(dependency) for dependency in definition.depends_on}
+                    self._values[name] = (True, definition.func(**kwargs))
+                except Exception as error:
+                    self._values[name] = (False, error)
+        succeed, value = self._values[name]
+        if not succeed:
+            raise value
+        return value
+
+    def get_many(self, names: Iterable[str], max_workers: int) -> Dict[str, Any]:
+        """
+        Get several facts concurrently, a fact which fails is None and does not affect the others.
+
+        Returns:
+            dict: fact name -> value, in the order of names
+        """
+        names = list(names)
+        if not names:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(len(names), max_workers), thread_name_prefix="fact") as pool:
+            futures = [pool.submit(self.get, name) for name in names]
+        result = {}
+        for name, future in zip(names, futures):
+            error = future.exception()
+            if error is not None:
+                LOGGER.error(f"Failed to get fact {name}: {error}")
+            result[name] = None if error is not None else future.result()
+        return result
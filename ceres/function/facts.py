@@ -0,0 +1,744 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Native readers of host facts.
+
+Most facts collected by the agent are exposed by the kernel, reading them costs a few
+syscalls instead of a process:
+
+- BIOS, system, board and chassis fields of the DMI tables: /sys/class/dmi/id
+- kernel release: os.uname()
+- os release: /etc/os-release, or /usr/lib/os-release
+- CPU model, topology and caches: /proc/cpuinfo and /sys/devices/system/cpu
+- online memory: /sys/devices/system/memory, or /proc/meminfo
+- memory devices and the other DMI structures: /sys/firmware/dmi/tables/DMI
+- disks: /sys/block
+
+The DMI structures are decoded from the raw table of sysfs when it is readable. Otherwise
+dmidecode is executed once without a type filter, and its output is parsed into the same
+DmiTable, which every collector shares.
+"""
+import asyncio
+import contextvars
+import itertools
+import os
+import re
+import shlex
+import struct
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ceres.conf.constant import CommandExitCode
+from ceres.function.cache import CachePolicy
+from ceres.function.log import LOGGER
+from ceres.function.util import execute_shell_command
+
+DMI_ID_DIR = "/sys/class/dmi/id"
+CPU_SYSFS_DIR = "/sys/devices/system/cpu"
+CPUINFO_PATH = "/proc/cpuinfo"
+DMI_TABLES_DIR = "/sys/firmware/dmi/tables"
+MEMORY_SYSFS_DIR = "/sys/devices/system/memory"
+MEMINFO_PATH = "/proc/meminfo"
+BLOCK_SYSFS_DIR = "/sys/block"
+# the size attribute of a block device counts 512 byte sectors whatever its logical block size
+SECTOR_SIZE = 512
+OS_RELEASE_PATHS = ("/etc/os-release", "/usr/lib/os-release")
+DMI_TABLE_CACHE = CachePolicy(ttl=3600, per_boot=True)
+
+# file of /sys/class/dmi/id -> (DMI type, field name printed by dmidecode)
+DMI_ID_FIELDS = {
+    "bios_vendor": (0, "Vendor"),
+    "bios_version": (0, "Version"),
+    "bios_date": (0, "Release Date"),
+    "sys_vendor": (1, "Manufacturer"),
+    "product_name": (1, "Product Name"),
+    "product_version": (1, "Version"),
+    "product_serial": (1, "Serial Number"),
+    "product_uuid": (1, "UUID"),
+    "board_vendor": (2, "Manufacturer"),
+    "board_name": (2, "Product Name"),
+    "board_version": (2, "Version"),
+    "board_serial": (2, "Serial Number"),
+    "chassis_vendor": (3, "Manufacturer"),
+    "chassis_serial": (3, "Serial Number"),
+}
+
+# CPU implementer and part of /proc/cpuinfo on aarch64 -> vendor and model names printed by lscpu
+ARM_CPU_IMPLEMENTERS = {
+    "0x41": (
+        "ARM",
+        {
+            "0xd03": "Cortex-A53",
+            "0xd07": "Cortex-A57",
+            "0xd08": "Cortex-A72",
+            "0xd0c": "Neoverse-N1",
+            "0xd40": "Neoverse-V1",
+            "0xd49": "Neoverse-N2",
+            "0xd4f": "Neoverse-V2",
+        },
+    ),
+    "0x48": ("HiSilicon", {"0xd01": "Kunpeng-920", "0xd02": "Kunpeng-930"}),
+    "0x70": ("Phytium", {"0x660": "FTC660", "0x661": "FTC661", "0x662": "FTC662", "0x663": "FTC663"}),
+}
+# level and type of a cache of sysfs -> cache name printed by lscpu
+CPU_CACHE_NAMES = {("1", "Data"): "L1d", ("1", "Instruction"): "L1i", ("2", "Unified"): "L2", ("3", "Unified"): "L3"}
+
+# Memory Type of DMI type 17, starting from 0x01, as printed by dmidecode
+DMI_MEMORY_TYPES = (
+    "Other", "Unknown", "DRAM", "EDRAM", "VRAM", "SRAM", "RAM", "ROM", "Flash", "EEPROM", "FEPROM", "EPROM",
+    "CDRAM", "3DRAM", "SDRAM", "SGRAM", "RDRAM", "DDR", "DDR2", "DDR2 FB-DIMM", "Reserved", "Reserved",
+    "Reserved", "DDR3", "FBD2", "DDR4", "LPDDR", "LPDDR2", "LPDDR3", "LPDDR4", "Logical non-volatile device",
+    "HBM", "HBM2", "DDR5", "LPDDR5", "HBM3",
+)
+# DMI type -> name and string fields (offset, name) of the structures decoded from the raw table
+DMI_STRUCTURES = {
+    0: ("BIOS Information", ((0x04, "Vendor"), (0x05, "Version"), (0x08, "Release Date"))),
+    1: (
+        "System Information",
+        ((0x04, "Manufacturer"), (0x05, "Product Name"), (0x06, "Version"), (0x07, "Serial Number")),
+    ),
+    2: (
+        "Base Board Information",
+        ((0x04, "Manufacturer"), (0x05, "Product Name"), (0x06, "Version"), (0x07, "Serial Number")),
+    ),
+    3: ("Chassis Information", ((0x04, "Manufacturer"), (0x06, "Version"), (0x07, "Serial Number"))),
+    17: (
+        "Memory Device",
+        (
+            (0x10, "Locator"),
+            (0x11, "Bank Locator"),
+            (0x17, "Manufacturer"),
+            (0x18, "Serial Number"),
+            (0x19, "Asset Tag"),
+            (0x1A, "Part Number"),
+        ),
+    ),
+}
+DMI_END_OF_TABLE = 127
+
+_DMI_HANDLE_PATTERN = re.compile(r"^Handle (0x[0-9A-Fa-f]+), DMI type (\d+),")
+# collectors running concurrently wait for the first dmidecode instead of starting their own
+_DMI_TABLE_LOCK = threading.Lock()
+
+_SOURCE_FAILURES = contextvars.ContextVar("source_failures", default=None)
+
+
+@contextmanager
+def track_source_failures() -> Iterator[List[str]]:
+    """
+    Record the sources of facts which can not be read while collecting, the facts returned
+    in place of theirs are degraded, e.g a memory section without devices when dmidecode failed.
+
+    Example usage:
+    >>> with track_source_failures() as failures:
+    ...     memory_devices = get_dmi_table().find(17)
+    >>> failures
+    ['dmidecode']
+    """
+    failures = []
+    token = _SOURCE_FAILURES.set(failures)
+    try:
+        yield failures
+    finally:
+        _SOURCE_FAILURES.reset(token)
+
+
+def report_source_failure(source: str) -> None:
+    """
+    Report a source of facts which can not be read to the tracking of the current collection.
+
+    Args:
+        source(str): e.g dmidecode
+    """
+    failures = _SOURCE_FAILURES.get()
+    if failures is not None:
+        failures.append(source)
+
+
+def read_text(path: str) -> Optional[str]:
+    """
+    Read a small text file such as a sysfs attribute.
+
+    Returns:
+        str: stripped content, None if the file can not be read
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def get_kernel_release() -> str:
+    """
+    Get the release of the running kernel.
+
+    Returns:
+        str: e.g 5.10.0-60.18.0.50.oe2203.x86_64
+    """
+    return os.uname().release
+
+
+def root_path(root: str, path: str) -> Optional[str]:
+    """
+    Get the path of a file of an alternate root, e.g the root filesystem of a container. The
+    symbolic links are resolved inside the root.
+
+    Returns:
+        str: e.g /var/lib/containers/storage/overlay/<id>/merged/var/lib/rpm/rpmdb.sqlite, None if
+            the path leads out of the root
+    """
+    if root == "/":
+        return path
+    real_root = os.path.realpath(root)
+    real_path = os.path.realpath(os.path.join(real_root, path.lstrip("/")))
+    if os.path.commonpath([real_root, real_path]) != real_root:
+        return None
+    return real_path
+
+
+def read_os_release(root: str = "/") -> Dict[str, str]:
+    """
+    Read the os-release file, values are unquoted.
+
+    Args:
+        root(str): the root directory the file is read from, e.g the root filesystem of a container
+
+    Returns:
+        dict: e.g {"NAME": "openEuler", "VERSION_ID": "22.03", "PRETTY_NAME": "openEuler 22.03 LTS"}
+    """
+    for path in OS_RELEASE_PATHS:
+        path = root_path(root, path)
+        content = read_text(path) if path else None
+        if content is not None:
+            break
+    else:
+        LOGGER.warning(f"Failed to read os-release, please check file {os.path.join(root, 'etc/os-release')}")
+        report_source_failure("os-release")
+        return {}
+
+    os_release = {}
+    for line in content.splitlines():
+        key, separator, value = line.strip().partition("=")
+        if not separator or key.startswith("#"):
+            continue
+        try:
+            words = shlex.split(value)
+        except ValueError:
+            words = [value]
+        os_release[key] = " ".join(words)
+    return os_release
+
+
+@dataclass(frozen=True)
+class DmiRecord:
+    """
+    One structure of the DMI table as printed by dmidecode.
+
+    Attributes:
+        handle: e.g 0x0001
+        dmi_type: e.g 1
+        name: e.g System Information
+        fields: e.g {"UUID": "3F2C9A1E-...", "Characteristics": ["PCI is supported", ...]},
+            a field followed by indented lines is a list
+    """
+
+    handle: str
+    dmi_type: int
+    name: str
+    fields: Dict[str, Union[str, List[str]]] = field(default_factory=dict)
+
+
+class DmiTable:
+    """
+    DMI table decoded from sysfs or parsed from the output of dmidecode, it is shared read-only
+    by the collectors.
+    """
+
+    def __init__(self, records: List[DmiRecord]):
+        self.records = records
+
+    def find(self, dmi_type: int) -> List[DmiRecord]:
+        """
+        Get the structures of a DMI type, e.g 17 for the memory devices.
+        """
+        return [record for record in self.records if record.dmi_type == dmi_type]
+
+    def value(self, dmi_type: int, name: str) -> Optional[str]:
+        """
+        Get a field of the first structure of a DMI type.
+
+        Returns:
+            str: None if there is no such structure or field
+        """
+        for record in self.find(dmi_type):
+            value = record.fields.get(name)
+            return value if isinstance(value, str) else None
+        return None
+
+
+@lru_cache(maxsize=1)
+def parse_dmi_table(output: str) -> DmiTable:
+    """
+    Parse the output of dmidecode, the last parsed output is memoized so that every
+    collector of one invocation shares the same table.
+
+    Args:
+        output(str): e.g
+            Handle 0x0001, DMI type 1, 27 bytes
+            System Information
+                    Manufacturer: Huawei
+                    UUID: 3F2C9A1E-8B4D-11EC-9A6F-0242AC130003
+
+    Returns:
+        DmiTable
+    """
+    records = []
+    for block in re.split(r"\n\s*\n", output):
+        lines = block.strip("\n").splitlines()
+        if len(lines) < 2:
+            continue
+        header = _DMI_HANDLE_PATTERN.match(lines[0].strip())
+        if header is None:
+            continue
+        fields = {}
+        last_key = None
+        for line in lines[2:]:
+            if line.startswith("\t\t") and last_key is not None:
+                fields[last_key].append(line.strip())
+                continue
+            key, _, value = line.strip().partition(":")
+            value = value.strip()
+            last_key = None if value else key
+            fields[key] = value or []
+        records.append(DmiRecord(header.group(1), int(header.group(2)), lines[1].strip(), fields))
+    return DmiTable(records)
+
+
+def _dmi_string(strings: List[bytes], index: int) -> str:
+    if index == 0:
+        return "Not Specified"
+    if index > len(strings):
+        return "<BAD INDEX>"
+    return strings[index - 1].decode("utf-8", "replace").strip()
+
+
+def _dmi_uuid(data: bytes, version: Tuple[int, int]) -> str:
+    """
+    Format a system uuid the way dmidecode prints it, the first three fields are little endian
+    since SMBIOS 2.6.
+    """
+    if data == b"\xff" * 16:
+        return "Not Present"
+    if data == b"\x00" * 16:
+        return "Not Settable"
+    if version >= (2, 6):
+        data = data[3::-1] + data[5:3:-1] + data[7:5:-1] + data[8:]
+    text = data.hex().upper()
+    return f"{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}"
+
+
+def _dmi_memory_size(size: int, extended_size: Optional[int]) -> str:
+    """
+    Format the Size of a memory device the way dmidecode prints it, e.g 32 GB, 512 MB.
+    """
+    if size == 0:
+        return "No Module Installed"
+    if size == 0xFFFF:
+        return "Unknown"
+    if size == 0x7FFF and extended_size is not None:
+        size_kb = (extended_size & 0x7FFFFFFF) * 1024
+    else:
+        size_kb = (size & 0x7FFF) * (1 if size & 0x8000 else 1024)
+    for unit in ("kB", "MB", "GB", "TB"):
+        if size_kb % 1024 or unit == "TB":
+            return f"{size_kb} {unit}"
+        size_kb //= 1024
+    return ""
+
+
+def _decode_memory_device(formatted: bytes, fields: Dict[str, str]) -> None:
+    def word(offset: int) -> Optional[int]:
+        return struct.unpack_from("<H", formatted, offset)[0] if len(formatted) >= offset + 2 else None
+
+    def dword(offset: int) -> Optional[int]:
+        return struct.unpack_from("<I", formatted, offset)[0] if len(formatted) >= offset + 4 else None
+
+    fields["Size"] = _dmi_memory_size(word(0x0C), dword(0x1C))
+    memory_type = formatted[0x12]
+    fields["Type"] = DMI_MEMORY_TYPES[memory_type - 1] if 0 < memory_type <= len(DMI_MEMORY_TYPES) else "<OUT OF SPEC>"
+    speed = word(0x15)
+    if speed == 0xFFFF and dword(0x54) is not None:
+        speed = dword(0x54)
+    fields["Speed"] = f"{speed} MT/s" if speed else "Unknown"
+
+
+@lru_cache(maxsize=1)
+def decode_dmi_table(data: bytes, version: Tuple[int, int]) -> DmiTable:
+    """
+    Decode the raw DMI table of sysfs, the structures of DMI_STRUCTURES are decoded into the
+    fields dmidecode prints for them, the other structures are skipped.
+
+    Args:
+        data(bytes): content of /sys/firmware/dmi/tables/DMI
+        version(tuple): SMBIOS version, e.g (3, 2)
+
+    Returns:
+        DmiTable
+    """
+    records = []
+    offset = 0
+    while offset + 4 <= len(data):
+        dmi_type, length, handle = struct.unpack_from("<BBH", data, offset)
+        if length < 4:
+            break
+        strings_end = data.find(b"\x00\x00", offset + length)
+        if strings_end < 0:
+            break
+        formatted = data[offset:offset + length]
+        strings = data[offset + length:strings_end].split(b"\x00") if strings_end > offset + length else []
+        offset = strings_end + 2
+        if dmi_type == DMI_END_OF_TABLE:
+            break
+        if dmi_type not in DMI_STRUCTURES:
+            continue
+
+        name, string_fields = DMI_STRUCTURES[dmi_type]
+        fields = {key: _dmi_string(strings, formatted[index]) for index, key in string_fields if index < length}
+        if dmi_type == 1 and length >= 0x19:
+            fields["UUID"] = _dmi_uuid(formatted[0x08:0x18], version)
+        if dmi_type == 17 and length >= 0x17:
+            _decode_memory_device(formatted, fields)
+        records.append(DmiRecord(f"0x{handle:04X}", dmi_type, name, fields))
+    return DmiTable(records)
+
+
+def read_dmi_table() -> Optional[DmiTable]:
+    """
+    Read the raw DMI table of sysfs, it is only readable by root.
+
+    Returns:
+        DmiTable: None if the table can not be read
+    """
+    try:
+        with open(os.path.join(DMI_TABLES_DIR, "smbios_entry_point"), "rb") as file:
+            entry_point = file.read()
+        with open(os.path.join(DMI_TABLES_DIR, "DMI"), "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    if entry_point.startswith(b"_SM3_") and len(entry_point) >= 9:
+        version = (entry_point[7], entry_point[8])
+    elif entry_point.startswith(b"_SM_") and len(entry_point) >= 8:
+        version = (entry_point[6], entry_point[7])
+    else:
+        version = (2, 0)
+    return decode_dmi_table(data, version)
+
+
+def get_dmi_table() -> DmiTable:
+    """
+    Get the DMI table, decoded from sysfs or from one dmidecode invocation whose output is
+    cached until reboot.
+
+    Returns:
+        DmiTable: empty if neither can be read
+    """
+    table = read_dmi_table()
+    if table is not None:
+        return table
+    with _DMI_TABLE_LOCK:
+        code, stdout, _ = execute_shell_command("dmidecode", cache=DMI_TABLE_CACHE)
+    if code != CommandExitCode.SUCCEED:
+        LOGGER.warning("Failed to read the DMI table by dmidecode")
+        report_source_failure("dmidecode")
+        return DmiTable([])
+    return parse_dmi_table(stdout)
+
+
+async def async_get_dmi_table() -> DmiTable:
+    """
+    Get the DMI table without blocking the event loop, concurrent callers share one dmidecode.
+
+    Returns:
+        DmiTable: empty if dmidecode failed
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, get_dmi_table)
+
+
+def _read_dmi_ids(names: Iterable[str]) -> Dict[str, Optional[str]]:
+    facts = {}
+    for name in names:
+        value = read_text(os.path.join(DMI_ID_DIR, name))
+        # the kernel prints the uuid in lower case, dmidecode in upper case, the dmidecode form is
+        # kept since the uuid identifies the host
+        facts[name] = value.upper() if value and name == "product_uuid" else value
+    return facts
+
+
+def _fill_dmi_facts(facts: Dict[str, Optional[str]], table: DmiTable) -> Dict[str, str]:
+    for name, value in facts.items():
+        if value is None:
+            facts[name] = table.value(*DMI_ID_FIELDS[name]) or ""
+    return facts
+
+
+def get_dmi_facts(names: Iterable[str]) -> Dict[str, str]:
+    """
+    Get DMI facts from /sys/class/dmi/id, dmidecode is only executed if one of them is missing.
+
+    Args:
+        names(list): files of /sys/class/dmi/id, keys of DMI_ID_FIELDS, e.g ["bios_version"]
+
+    Returns:
+        dict: e.g {"bios_version": "1.57"}, a fact which can not be read is an empty string
+    """
+    facts = _read_dmi_ids(names)
+    if None not in facts.values():
+        return facts
+    return _fill_dmi_facts(facts, get_dmi_table())
+
+
+async def async_get_dmi_facts(names: Iterable[str]) -> Dict[str, str]:
+    """
+    Get DMI facts from /sys/class/dmi/id, dmidecode is only executed if one of them is missing.
+
+    Returns:
+        dict: the same as get_dmi_facts
+    """
+    facts = _read_dmi_ids(names)
+    if None not in facts.values():
+        return facts
+    return _fill_dmi_facts(facts, await async_get_dmi_table())
+
+
+def parse_cpu_list(cpu_list: str) -> List[int]:
+    """
+    Parse a cpu list of sysfs.
+
+    Args:
+        cpu_list(str): e.g 0-3,8,10-11
+
+    Returns:
+        list: e.g [0, 1, 2, 3, 8, 10, 11]
+    """
+    cpus = []
+    for cpu_range in filter(None, cpu_list.strip().split(",")):
+        first, _, last = cpu_range.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def parse_size(size: str) -> int:
+    """
+    Parse a size of sysfs or procfs, K M and G are binary units.
+
+    Args:
+        size(str): e.g 32K, 1024 kB
+
+    Returns:
+        int: bytes
+    """
+    match = re.match(r"^\s*(\d+)\s*([KMG]?)", size, re.IGNORECASE)
+    if match is None:
+        return 0
+    return int(match.group(1)) * 1024 ** " KMG".index(match.group(2).upper() or " ")
+
+
+def format_size(size: int, short: bool = False) -> str:
+    """
+    Format a size in bytes the way lscpu does, or the way lsmem does when short is set.
+
+    Returns:
+        str: e.g 32 KiB, 1.5 MiB, or 48G when short is set
+    """
+    units = ("B", "K", "M", "G", "T") if short else ("B", "KiB", "MiB", "GiB", "TiB")
+    for unit in units[:-1]:
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = units[-1]
+    size = round(size, 1)
+    text = str(int(size)) if size == int(size) else f"{size:.1f}"
+    return f"{text}{unit}" if short else f"{text} {unit}"
+
+
+def get_online_memory() -> Optional[int]:
+    """
+    Get the size of the online memory, it is the block size times the online memory blocks
+    of sysfs, or MemTotal of /proc/meminfo if memory blocks are not exposed.
+
+    Returns:
+        int: bytes, None if neither can be read
+    """
+    block_size = read_text(os.path.join(MEMORY_SYSFS_DIR, "block_size_bytes"))
+    if block_size:
+        try:
+            with os.scandir(MEMORY_SYSFS_DIR) as entries:
+                blocks = [entry.name for entry in entries if re.match(r"^memory\d+$", entry.name)]
+        except OSError:
+            blocks = []
+        online_blocks = sum(read_text(os.path.join(MEMORY_SYSFS_DIR, block, "state")) == "online" for block in blocks)
+        if online_blocks:
+            return int(block_size, 16) * online_blocks
+
+    for line in (read_text(MEMINFO_PATH) or "").splitlines():
+        if line.startswith("MemTotal:"):
+            return parse_size(line.split(":", 1)[1])
+    return None
+
+
+def read_cpuinfo() -> Dict[str, str]:
+    """
+    Read the fields of the first processor of /proc/cpuinfo. The vendor and model names of
+    aarch64 cpus, which only have implementer and part ids there, are added.
+
+    Returns:
+        dict: e.g {"vendor_id": "GenuineIntel", "model name": "Intel(R) Xeon(R) Gold 6248 CPU @ 2.50GHz", ...}
+    """
+    content = read_text(CPUINFO_PATH) or ""
+    cpuinfo = {}
+    for line in content.split("\n\n", 1)[0].splitlines():
+        key, separator, value = line.partition(":")
+        if separator:
+            cpuinfo[key.strip()] = value.strip()
+
+    implementer = cpuinfo.get("CPU implementer")
+    if implementer is not None:
+        vendor, parts = ARM_CPU_IMPLEMENTERS.get(implementer, (implementer, {}))
+        part = cpuinfo.get("CPU part", "")
+        cpuinfo.setdefault("vendor_id", vendor)
+        cpuinfo.setdefault("model name", parts.get(part, part))
+    return cpuinfo
+
+
+def get_cpu_topology() -> Optional[Dict[str, Union[int, Dict[str, int]]]]:
+    """
+    Get the topology and the cache sizes of the online cpus in one pass over sysfs, a cache which
+    is shared with a cpu already visited is not read again.
+
+    Returns:
+        dict: e.g
+            {
+                "cpus": 96,
+                "sockets": 2,
+                "cores_per_socket": 48,
+                "threads_per_core": 1,
+                "caches": {"L1d": 6291456, "L1i": 6291456, "L2": 50331648, "L3": 100663296}
+            }
+        None if the online cpus can not be read
+    """
+    online = read_text(os.path.join(CPU_SYSFS_DIR, "online"))
+    if not online:
+        return None
+    cpus = parse_cpu_list(online)
+
+    threads = {}
+    caches = {}
+    covered_cpus = {}
+    for cpu in cpus:
+        cpu_dir = os.path.join(CPU_SYSFS_DIR, f"cpu{cpu}")
+        core = (
+            read_text(os.path.join(cpu_dir, "topology", "physical_package_id")),
+            read_text(os.path.join(cpu_dir, "topology", "core_id")),
+        )
+        threads[core] = threads.get(core, 0) + 1
+
+        for index in itertools.count():
+            if cpu in covered_cpus.get(index, ()):
+                continue
+            index_dir = os.path.join(cpu_dir, "cache", f"index{index}")
+            shared_cpus = read_text(os.path.join(index_dir, "shared_cpu_list"))
+            if shared_cpus is None:
+                break
+            covered_cpus.setdefault(index, set()).update(parse_cpu_list(shared_cpus) or [cpu])
+            name = CPU_CACHE_NAMES.get(
+                (read_text(os.path.join(index_dir, "level")), read_text(os.path.join(index_dir, "type")))
+            )
+            if name is not None:
+                caches[name] = caches.get(name, 0) + parse_size(read_text(os.path.join(index_dir, "size")) or "")
+
+    sockets = len({package for package, _ in threads})
+    return {
+        "cpus": len(cpus),
+        "sockets": sockets,
+        "cores_per_socket": len(threads) // sockets,
+        "threads_per_core": max(threads.values()),
+        "caches": caches,
+    }
+
+
+def list_physical_block_devices() -> Optional[List[str]]:
+    """
+    List the block devices of /sys/block which are not virtual, such as loop, dm and zram, nor
+    the hidden paths of multipath nvme namespaces.
+
+    Returns:
+        list: sorted names, e.g ["nvme0n1", "sda"], None if /sys/block can not be read
+    """
+    try:
+        names = sorted(os.listdir(BLOCK_SYSFS_DIR))
+    except OSError:
+        return None
+    return [
+        name
+        for name in names
+        if "/devices/virtual/" not in os.path.realpath(os.path.join(BLOCK_SYSFS_DIR, name))
+        and read_text(os.path.join(BLOCK_SYSFS_DIR, name, "hidden")) != "1"
+    ]
+
+
+def get_block_devices() -> Optional[List[Dict[str, Any]]]:
+    """
+    Get the physical block devices, virtual devices such as loop, dm and zram, and the hidden
+    paths of multipath nvme namespaces are skipped.
+
+    Returns:
+        list: e.g
+            [
+                {
+                    "name": "nvme0n1",
+                    "size": 960197124096,
+                    "model": "HWE52P431T9M002N",
+                    "vendor": None,
+                    "rotational": False,
+                    "nvme": True
+                }
+            ]
+        None if /sys/block can not be read
+    """
+    names = list_physical_block_devices()
+    if names is None:
+        return None
+
+    devices = []
+    for name in names:
+        device_dir = os.path.join(BLOCK_SYSFS_DIR, name)
+        sectors = read_text(os.path.join(device_dir, "size"))
+        # virtio devices expose the numeric id of their PCI vendor, only SCSI vendor names are kept
+        vendor = read_text(os.path.join(device_dir, "device", "vendor"))
+        devices.append(
+            {
+                "name": name,
+                "size": int(sectors) * SECTOR_SIZE if sectors and sectors.isdigit() else 0,
+                "model": read_text(os.path.join(device_dir, "device", "model")) or None,
+                "vendor": None if not vendor or vendor.startswith("0x") else vendor,
+                "rotational": read_text(os.path.join(device_dir, "queue", "rotational")) == "1",
+                "nvme": name.startswith("nvme"),
+            }
+        )
+    return devices
@@ -0,0 +1,186 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Cost ledger of executed commands.
+
+When the ledger is enabled, one entry is recorded per executed command: the argv of every
+process which was started, wall time, user and system CPU time and max RSS of the processes
+taken from their os.wait4 resource usage, return code and size of the output. The ledger
+is enabled by the LEDGER_FILE option in the command section of the configuration, entries
+are then appended to that file as JSON lines, or by the --ledger option of the CLI which
+prints the entries and the counters of the command cache as JSON to stderr next to the normal output.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from ceres.conf import configuration
+from ceres.function.log import LOGGER
+
+
+@dataclass
+class LedgerEntry:
+    """
+    Cost of one executed command.
+
+    Attributes:
+        command: command passed to execute_shell_command
+        argv: argument list of every process which was started, empty if no process was needed
+        started: unix time when the command started
+        wall_time: seconds between the start of the command and the end of its last process
+        user_time: user CPU seconds of all processes, None if the resource usage is unknown
+        system_time: system CPU seconds of all processes, None if the resource usage is unknown
+        max_rss: largest max resident set size of the processes in KiB, None if it is unknown.
+            the kernel counts the pages copied from this process by fork before exec, so it
+            is an upper bound
+        returncode: return code of the command
+        stdout_bytes: size of the standard output in bytes
+        stderr_bytes: size of the standard error in bytes
+        cached: whether the output of the first stage came from the command cache
+    """
+
+    command: str
+    argv: List[List[str]]
+    started: float
+    wall_time: float
+    user_time: Optional[float]
+    system_time: Optional[float]
+    max_rss: Optional[int]
+    returncode: int
+    stdout_bytes: int
+    stderr_bytes: int
+    cached: bool = False
+
+
+class CommandLedger:
+    """
+    Ledger of the commands executed by this process.
+    """
+
+    def __init__(self, ledger_file: Optional[str] = None):
+        self._ledger_file = ledger_file or None
+        self.enabled = self._ledger_file is not None
+        self._entries: List[LedgerEntry] = []
+        self._lock = threading.Lock()
+
+    def enable(self, ledger_file: Optional[str] = None) -> None:
+        """
+        Start recording, entries are also appended to ledger_file if it is set.
+        """
+        self.enabled = True
+        if ledger_file:
+            self._ledger_file = ledger_file
+
+    @property
+    def entries(self) -> List[LedgerEntry]:
+        with self._lock:
+            return list(self._entries)
+
+    def record(
+        self,
+        command: str,
+        processes: list,
+        timer: "CommandTimer",
+        returncode: int,
+        stdout_bytes: int,
+        stderr_bytes: int,
+        cached: bool = False,
+        argv: Optional[List[List[str]]] = None,
+    ) -> None:
+        """
+        Record the cost of a command.
+
+        Args:
+            command(str): command passed to execute_shell_command
+            processes(list): processes which were started, the resource usage of a process is
+                read from its rusage attribute, which is set when it is reaped with os.wait4
+            timer(CommandTimer): timer started with the command
+            returncode(int): return code of the command
+            stdout_bytes(int): size of the standard output
+            stderr_bytes(int): size of the standard error
+            cached(bool): whether the output of the first stage came from the command cache
+            argv(list): argument list of every process which was started, when some of them
+                were started by a helper process instead of the agent, default: the args of processes
+        """
+        if not self.enabled:
+            return
+        usages = [getattr(process, "rusage", None) for process in processes]
+        known = bool(processes) and None not in usages
+        entry = LedgerEntry(
+            command=command,
+            argv=argv or [list(getattr(process, "args", None) or []) for process in processes],
+            started=timer.started,
+            wall_time=round(timer.elapsed, 6),
+            user_time=round(sum(usage.ru_utime for usage in usages), 6) if known else None,
+            system_time=round(sum(usage.ru_stime for usage in usages), 6) if known else None,
+            max_rss=max(usage.ru_maxrss for usage in usages) if known else None,
+            returncode=returncode,
+            stdout_bytes=stdout_bytes,
+            stderr_bytes=stderr_bytes,
+            cached=cached,
+        )
+        with self._lock:
+            self._entries.append(entry)
+            if self._ledger_file:
+                self._append(entry)
+
+    def record_result(
+        self, command: str, processes: list, timer: "CommandTimer", result: tuple, cached: bool = False
+    ) -> None:
+        """
+        Record the cost of a command from its (return code, stdout, stderr) result.
+        """
+        if self.enabled:
+            stdout_bytes, stderr_bytes = len(result[1].encode("utf-8")), len(result[2].encode("utf-8"))
+            self.record(command, processes, timer, result[0], stdout_bytes, stderr_bytes, cached)
+
+    def _append(self, entry: LedgerEntry) -> None:
+        try:
+            os.makedirs(os.path.dirname(self._ledger_file) or ".", mode=0o700, exist_ok=True)
+            with open(self._ledger_file, "a", encoding="utf-8") as file:
+                file.write(json.dumps(asdict(entry)) + "\n")
+        except OSError as error:
+            LOGGER.debug(f"Failed to append command ledger: {error}")
+
+    def dump(self, cache_stats: Optional[Dict[str, int]] = None) -> str:
+        """
+        Get all entries of this process as a JSON string.
+
+        Args:
+            cache_stats(dict): hit and miss counters of the command cache reported next to the
+                entries, e.g {"hits": 3, "misses": 1, "entries": 4}
+        """
+        report = {"command_ledger": [asdict(entry) for entry in self.entries]}
+        if cache_stats is not None:
+            report["command_cache"] = cache_stats
+        return json.dumps(report)
+
+
+class CommandTimer:
+    """
+    Measure the wall time of a command for the ledger.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._start = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+
+COMMAND_LEDGER = CommandLedger(configuration.command.get("LEDGER_FILE"))
@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Native readers of the addresses and routes of the host, no packet is sent:
+
+- IPv4 routes: /proc/net/route
+- IPv6 routes: /proc/net/ipv6_route
+- IPv4 address of each interface: the SIOCGIFADDR ioctl
+- IPv6 addresses: /proc/net/if_inet6
+
+The source address towards a destination is the address of the interface of the longest
+matching route, as the kernel would pick it for a connection.
+"""
+import fcntl
+import ipaddress
+import socket
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+IPV4_ROUTE_PATH = "/proc/net/route"
+IPV6_ROUTE_PATH = "/proc/net/ipv6_route"
+IF_INET6_PATH = "/proc/net/if_inet6"
+
+SIOCGIFADDR = 0x8915
+IFNAMSIZ = 16
+RTF_UP = 0x0001
+RTF_REJECT = 0x0200
+# routes of the addresses of the host itself
+RTF_LOCAL = 0x80000000
+IPV6_SCOPE_GLOBAL = 0x00
+# dad failed, deprecated and tentative addresses can not be used as a source
+IFA_F_UNUSABLE = 0x08 | 0x20 | 0x40
+
+
+@dataclass(frozen=True)
+class Route:
+    interface: str
+    network: Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+    metric: int
+
+
+@dataclass(frozen=True)
+class InterfaceAddress:
+    interface: str
+    address: str
+    family: int
+
+
+def _read_lines(path: str) -> List[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read().splitlines()
+    except OSError:
+        return []
+
+
+def read_ipv4_routes() -> List[Route]:
+    """
+    Read the usable IPv4 routes, unreachable routes and the routes of local addresses are skipped.
+    The addresses of /proc/net/route are printed in host byte order.
+    """
+    routes = []
+    for line in _read_lines(IPV4_ROUTE_PATH)[1:]:
+        fields = line.split()
+        if len(fields) < 8:
+            continue
+        flags = int(fields[3], 16)
+        if not flags & RTF_UP or flags & (RTF_REJECT | RTF_LOCAL):
+            continue
+        destination, mask = (socket.inet_ntoa(struct.pack("=I", int(value, 16))) for value in (fields[1], fields[7]))
+        network = ipaddress.IPv4Network(f"{destination}/{mask}", strict=False)
+        routes.append(Route(fields[0], network, int(fields[6])))
+    return routes
+
+
+def read_ipv6_routes() -> List[Route]:
+    """
+    Read the usable IPv6 routes, unreachable routes and the routes of local addresses are skipped.
+    """
+    routes = []
+    for line in _read_lines(IPV6_ROUTE_PATH):
+        fields = line.split()
+        if len(fields) < 10:
+            continue
+        flags = int(fields[8], 16)
+        if not flags & RTF_UP or flags & (RTF_REJECT | RTF_LOCAL):
+            continue
+        destination = ipaddress.IPv6Address(bytes.fromhex(fields[0]))
+        network = ipaddress.IPv6Network(f"{destination}/{int(fields[1], 16)}", strict=False)
+        routes.append(Route(fields[9], network, int(fields[5], 16)))
+    return routes
+
+
+def _get_ipv4_address(sock: socket.socket, interface: str) -> Optional[str]:
+    try:
+        ifreq = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, struct.pack("256s", interface[: IFNAMSIZ - 1].encode()))
+    except OSError:
+        # the interface has no IPv4 address
+        return None
+    return socket.inet_ntoa(ifreq[20:24])
+
+
+def get_interface_addresses() -> List[InterfaceAddress]:
+    """
+    Get the addresses of the interfaces, loopback and link-local addresses are skipped.
+
+    Returns:
+        list: IPv4 addresses in the order of the interface indexes, then IPv6 global addresses
+    """
+    addresses = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _, interface in socket.if_nameindex():
+            address = _get_ipv4_address(sock, interface)
+            if address and not ipaddress.IPv4Address(address).is_loopback:
+                addresses.append(InterfaceAddress(interface, address, socket.AF_INET))
+    for line in _read_lines(IF_INET6_PATH):
+        fields = line.split()
+        if len(fields) < 6 or int(fields[3], 16) != IPV6_SCOPE_GLOBAL or int(fields[4], 16) & IFA_F_UNUSABLE:
+            continue
+        address = ipaddress.IPv6Address(bytes.fromhex(fields[0]))
+        if not address.is_loopback:
+            addresses.append(InterfaceAddress(fields[5], str(address), socket.AF_INET6))
+    return addresses
+
+
+def find_route_interface(destination: Union[ipaddress.IPv4Address, ipaddress.IPv6Address]) -> Optional[str]:
+    """
+    Find the interface of the longest matching route of a destination, the lowest metric wins a tie.
+
+    Returns:
+        str: interface name, None if there is no route to the destination
+    """
+    routes = read_ipv4_routes() if destination.version == 4 else read_ipv6_routes()
+    matches = [route for route in routes if destination in route.network]
+    if not matches:
+        return None
+    return min(matches, key=lambda route: (-route.network.prefixlen, route.metric)).interface
+
+
+def get_source_address(destination: Optional[str] = None, interface: Optional[str] = None) -> str:
+    """
+    Get the address the host would use towards a destination, without sending any packet.
+
+    Args:
+        destination: IP address of the peer, e.g the zeus address, default: the default route
+        interface: use the address of this interface whatever the routes
+
+    Returns:
+        str: e.g 192.168.1.2, the first address of the host if no route matches, empty if the host
+            has no address
+    """
+    try:
+        target = ipaddress.ip_address(destination) if destination else ipaddress.IPv4Address("0.0.0.0")
+    except ValueError:
+        # a host name would need a DNS query, the default route is used instead
+        target = ipaddress.IPv4Address("0.0.0.0")
+    if interface is None:
+        interface = find_route_interface(target)
+        if interface is None and not destination:
+            interface = find_route_interface(ipaddress.IPv6Address("::"))
+    # the addresses of the family of the destination come first
+    family = socket.AF_INET if target.version == 4 else socket.AF_INET6
+    addresses = sorted(get_interface_addresses(), key=lambda address: address.family != family)
+    for address in addresses:
+        if address.interface == interface:
+            return address.address
+    return addresses[0].address if addresses else ""
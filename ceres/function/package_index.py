@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Persistent index of the installed source packages.
+
+The index is rebuilt only when the fingerprint of the rpm database changed, and each rebuild
+which changes the packages starts a new generation. The changes of the last generations are
+kept, so a caller which knows the packages of an older generation can be sent the packages
+added, removed and upgraded since then instead of the whole list:
+
+    {
+        "added": [{"name": "nginx", "version": "1.21.5-2"}],
+        "removed": [{"name": "httpd", "version": "2.4.51-9"}],
+        "upgraded": [{"name": "kernel", "version": "5.10.0-136", "previous_version": "5.10.0-60"}]
+    }
+"""
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ceres.function.log import LOGGER
+
+PACKAGE_INDEX_HISTORY = 32
+
+
+def _group_versions(packages: Iterable[Dict[str, str]]) -> Dict[str, Set[str]]:
+    versions = {}
+    for package in packages:
+        versions.setdefault(package["name"], set()).add(package["version"])
+    return versions
+
+
+def diff_packages(old: Iterable[Dict[str, str]], new: Iterable[Dict[str, str]]) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Compare two lists of packages, a package is identified by its name. A version which replaced
+    another one of the same package is an upgrade, a downgrade is reported as an upgrade too.
+
+    Args:
+        old(list): e.g [{"name": "kernel", "version": "5.10.0-60"}]
+        new(list): e.g [{"name": "kernel", "version": "5.10.0-136"}]
+
+    Returns:
+        dict: e.g {"added": [], "removed": [], "upgraded": [{"name": "kernel", "version": "5.10.0-136",
+            "previous_version": "5.10.0-60"}]}
+    """
+    old_versions, new_versions = _group_versions(old), _group_versions(new)
+    changes = {"added": [], "removed": [], "upgraded": []}
+    for name in sorted(old_versions.keys() | new_versions.keys()):
+        gone = sorted(old_versions.get(name, set()) - new_versions.get(name, set()))
+        came = sorted(new_versions.get(name, set()) - old_versions.get(name, set()))
+        for previous_version, version in zip(gone, came):
+            changes["upgraded"].append({"name": name, "version": version, "previous_version": previous_version})
+        changes["added"].extend({"name": name, "version": version} for version in came[len(gone):])
+        changes["removed"].extend({"name": name, "version": version} for version in gone[len(came):])
+    return changes
+
+
+def _revert_changes(packages: Set[Tuple[str, str]], changes: Dict[str, List[Dict[str, str]]]) -> None:
+    for package in changes["added"] + changes["upgraded"]:
+        packages.discard((package["name"], package["version"]))
+    packages.update((package["name"], package["version"]) for package in changes["removed"])
+    packages.update((package["name"], package["previous_version"]) for package in changes["upgraded"])
+
+
+class PackageIndex:
+    """
+    Installed source packages saved with the fingerprint of the rpm database they were read from.
+    """
+
+    def __init__(self, index_file: Optional[str]):
+        self._index_file = index_file
+        self._fingerprint: Optional[list] = None
+        self._generation = 0
+        self._packages: List[Dict[str, str]] = []
+        self._history: List[dict] = []
+        self._changed = False
+        self._load()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def _load(self) -> None:
+        if not self._index_file or not os.path.exists(self._index_file):
+            return
+        try:
+            with open(self._index_file, "r", encoding="utf-8") as file:
+                index = json.load(file)
+            fingerprint, generation = index["fingerprint"], int(index["generation"])
+            packages, history = list(index["packages"]), list(index["history"])
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            LOGGER.debug(f"Failed to load package index: {error}")
+            return
+        self._fingerprint, self._generation, self._packages, self._history = fingerprint, generation, packages, history
+
+    def save(self) -> None:
+        """
+        Write the index to its file if it changed, it is replaced atomically.
+        """
+        if not self._index_file or not self._changed:
+            return
+        index = {
+            "fingerprint": self._fingerprint,
+            "generation": self._generation,
+            "packages": self._packages,
+            "history": self._history,
+        }
+        try:
+            index_dir = os.path.dirname(self._index_file)
+            os.makedirs(index_dir, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=index_dir, prefix=".package_index.")
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(index, file)
+            os.replace(tmp_path, self._index_file)
+            self._changed = False
+        except OSError as error:
+            LOGGER.debug(f"Failed to save package index: {error}")
+
+    def refresh(
+        self, fingerprint: Optional[list], query_packages: Callable[[], Optional[List[Dict[str, str]]]]
+    ) -> bool:
+        """
+        Rebuild the index if the rpm database changed, without fingerprint it is always rebuilt.
+
+        Args:
+            fingerprint(list): fingerprint of the rpm database
+            query_packages(callable): read the installed source packages, None if they can not be read
+
+        Returns:
+            bool: False if the index is outdated because the packages could not be read
+        """
+        # json turns tuples into lists, compare the fingerprint as it will be saved
+        fingerprint = json.loads(json.dumps(fingerprint))
+        if fingerprint is not None and fingerprint == self._fingerprint:
+            return True
+        packages = query_packages()
+        if packages is None:
+            return False
+        self._fingerprint = fingerprint
+        self._changed = True
+        if self._generation == 0:
+            # a new index starts from the current time, the generations of a lost index are never reused
+            self._generation, self._packages = int(time.time()), packages
+            return True
+        changes = diff_packages(self._packages, packages)
+        if any(changes.values()):
+            self._generation += 1
+            self._history = (self._history + [dict(changes, generation=self._generation)])[-PACKAGE_INDEX_HISTORY:]
+        self._packages = packages
+        return True
+
+    def get_packages(self) -> List[Dict[str, str]]:
+        """
+        Get the installed source packages, e.g [{"name": "kernel", "version": "5.10.0-136"}]
+        """
+        return self._packages
+
+    def get_changes(self, generation: int) -> Optional[Dict[str, List[Dict[str, str]]]]:
+        """
+        Get the packages added, removed and upgraded since a generation of the index.
+
+        Args:
+            generation(int): the generation the caller knows the packages of
+
+        Returns:
+            dict: the same as diff_packages, None if the changes since the generation are not kept
+        """
+        if generation > self._generation or len(self._history) < self._generation - generation:
+            return None
+        packages = {(package["name"], package["version"]) for package in self._packages}
+        for changes in reversed(self._history):
+            if changes["generation"] <= generation:
+                break
+            _revert_changes(packages, changes)
+        old = [{"name": name, "version": version} for name, version in packages]
+        return diff_packages(old, self._packages)
@@ -0,0 +1,210 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Native readers of the performance tuning state of the host.
+
+- NUMA nodes: /sys/devices/system/node
+- transparent hugepages and hugepage pools: /sys/kernel/mm
+- cpufreq policies: /sys/devices/system/cpu/cpufreq
+- I/O scheduler of the disks: /sys/block/<disk>/queue/scheduler
+- IRQs of the NICs: /sys/class/net/<nic>/device and /proc/irq/<irq>/smp_affinity_list
+
+Unlike the hardware facts, these are tunables which may change at any time.
+"""
+import os
+import re
+from typing import Dict, List, Optional, Union
+
+from ceres.function import facts
+from ceres.function.facts import list_physical_block_devices, parse_cpu_list, parse_size, read_text
+
+NODE_SYSFS_DIR = "/sys/devices/system/node"
+THP_SYSFS_DIR = "/sys/kernel/mm/transparent_hugepage"
+HUGEPAGES_SYSFS_DIR = "/sys/kernel/mm/hugepages"
+NET_SYSFS_DIR = "/sys/class/net"
+IRQ_PROC_DIR = "/proc/irq"
+
+_SELECTED_VALUE_PATTERN = re.compile(r"\[([^\]]+)\]")
+
+
+def _list_dir(path: str, pattern: str) -> List[str]:
+    """
+    List the entries of a directory which match a pattern, sorted by the number they end with.
+    """
+    try:
+        names = [name for name in os.listdir(path) if re.match(pattern, name)]
+    except OSError:
+        return []
+    return sorted(names, key=lambda name: int(re.search(r"(\d+)\D*$", name).group(1)))
+
+
+def format_cpu_list(cpus: List[int]) -> str:
+    """
+    Format cpus the way sysfs prints a cpu list.
+
+    Args:
+        cpus(list): e.g [0, 1, 2, 3, 8, 10, 11]
+
+    Returns:
+        str: e.g 0-3,8,10-11
+    """
+    ranges = []
+    for cpu in sorted(set(cpus)):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def get_numa_nodes() -> List[Dict[str, Union[int, str]]]:
+    """
+    Get the online NUMA nodes.
+
+    Returns:
+        list: e.g [{"node": 0, "cpus": "0-63", "memory": 270039130112}], empty if NUMA is not supported
+    """
+    nodes = []
+    for name in _list_dir(NODE_SYSFS_DIR, r"^node\d+$"):
+        node_dir = os.path.join(NODE_SYSFS_DIR, name)
+        meminfo = read_text(os.path.join(node_dir, "meminfo")) or ""
+        match = re.search(r"MemTotal:\s*(\d+\s*kB)", meminfo)
+        nodes.append(
+            {
+                "node": int(name[len("node"):]),
+                "cpus": read_text(os.path.join(node_dir, "cpulist")) or "",
+                "memory": parse_size(match.group(1)) if match else 0,
+            }
+        )
+    return nodes
+
+
+def get_transparent_hugepage() -> Dict[str, Optional[str]]:
+    """
+    Get the selected modes of transparent hugepages.
+
+    Returns:
+        dict: e.g {"enabled": "madvise", "defrag": "madvise"}, a mode is None if it can not be read
+    """
+    modes = {}
+    for name in ("enabled", "defrag"):
+        match = _SELECTED_VALUE_PATTERN.search(read_text(os.path.join(THP_SYSFS_DIR, name)) or "")
+        modes[name] = match.group(1) if match else None
+    return modes
+
+
+def get_hugepage_pools() -> List[Dict[str, int]]:
+    """
+    Get the pools of persistent hugepages.
+
+    Returns:
+        list: e.g [{"size": 2097152, "total": 1024, "free": 1000}]
+    """
+    pools = []
+    for name in _list_dir(HUGEPAGES_SYSFS_DIR, r"^hugepages-\d+kB$"):
+        pool_dir = os.path.join(HUGEPAGES_SYSFS_DIR, name)
+        counts = [read_text(os.path.join(pool_dir, count)) for count in ("nr_hugepages", "free_hugepages")]
+        pools.append(
+            {
+                "size": parse_size(name[len("hugepages-"):]),
+                "total": int(counts[0]) if counts[0] and counts[0].isdigit() else 0,
+                "free": int(counts[1]) if counts[1] and counts[1].isdigit() else 0,
+            }
+        )
+    return pools
+
+
+def get_cpufreq_policies() -> List[Dict[str, Optional[Union[int, str]]]]:
+    """
+    Get the cpufreq policies, the frequencies are in kHz.
+
+    Returns:
+        list: e.g [{"policy": 0, "cpus": "0-3", "governor": "performance", "min_freq": 1000000,
+            "max_freq": 2600000}], empty if the host has no cpufreq driver, e.g a virtual machine
+    """
+    policies_dir = os.path.join(facts.CPU_SYSFS_DIR, "cpufreq")
+    policies = []
+    for name in _list_dir(policies_dir, r"^policy\d+$"):
+        policy_dir = os.path.join(policies_dir, name)
+        frequencies = [read_text(os.path.join(policy_dir, f"scaling_{bound}_freq")) for bound in ("min", "max")]
+        # related_cpus is a list of cpus separated by spaces, not a cpu list
+        related_cpus = (read_text(os.path.join(policy_dir, "related_cpus")) or "").split()
+        policies.append(
+            {
+                "policy": int(name[len("policy"):]),
+                "cpus": format_cpu_list([int(cpu) for cpu in related_cpus if cpu.isdigit()]),
+                "governor": read_text(os.path.join(policy_dir, "scaling_governor")),
+                "min_freq": int(frequencies[0]) if frequencies[0] and frequencies[0].isdigit() else None,
+                "max_freq": int(frequencies[1]) if frequencies[1] and frequencies[1].isdigit() else None,
+            }
+        )
+    return policies
+
+
+def get_io_schedulers() -> Dict[str, Optional[str]]:
+    """
+    Get the selected I/O scheduler of the physical disks.
+
+    Returns:
+        dict: e.g {"nvme0n1": "none", "sda": "mq-deadline"}, None if the disk has no scheduler
+    """
+    schedulers = {}
+    for name in list_physical_block_devices() or []:
+        scheduler = read_text(os.path.join(facts.BLOCK_SYSFS_DIR, name, "queue", "scheduler")) or ""
+        match = _SELECTED_VALUE_PATTERN.search(scheduler)
+        # a disk with a single scheduler, such as none, prints it without brackets
+        schedulers[name] = match.group(1) if match else scheduler or None
+    return schedulers
+
+
+def _list_device_irqs(device_dir: str) -> List[int]:
+    """
+    List the IRQs of a PCI device, its MSI and MSI-X vectors, or its legacy interrupt line. The
+    IRQs of a virtio device belong to the PCI device it sits on.
+    """
+    real_dir = os.path.realpath(device_dir)
+    for irq_dir in (real_dir, os.path.dirname(real_dir)):
+        irqs = [int(name) for name in _list_dir(os.path.join(irq_dir, "msi_irqs"), r"^\d+$")]
+        if irqs:
+            return irqs
+        irq = read_text(os.path.join(irq_dir, "irq"))
+        if irq and irq.isdigit() and irq != "0":
+            return [int(irq)]
+        if not os.path.basename(real_dir).startswith("virtio"):
+            break
+    return []
+
+
+def get_nic_irq_affinity() -> List[Dict[str, Union[int, str]]]:
+    """
+    Summarize the IRQ affinity of the NICs backed by a device, the virtual interfaces are skipped.
+
+    Returns:
+        list: e.g [{"name": "eth0", "irqs": 33, "cpus": "0-31"}], cpus is the union of the cpus the
+            IRQs of the NIC may be handled by
+    """
+    summaries = []
+    try:
+        names = sorted(os.listdir(NET_SYSFS_DIR))
+    except OSError:
+        return summaries
+    for name in names:
+        device_dir = os.path.join(NET_SYSFS_DIR, name, "device")
+        if not os.path.isdir(device_dir):
+            continue
+        irqs = _list_device_irqs(device_dir)
+        cpus = []
+        for irq in irqs:
+            cpus.extend(parse_cpu_list(read_text(os.path.join(IRQ_PROC_DIR, str(irq), "smp_affinity_list")) or ""))
+        summaries.append({"name": name, "irqs": len(irqs), "cpus": format_cpu_list(cpus)})
+    return summaries
@@ -0,0 +1,849 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Pipeline engine used by execute_shell_command.
+
+A command such as "systemctl status nginx|grep Active" is split into stages. Stages which
+are simple text filters (grep, awk '{print$N}', wc -l, cat) run in-process over the output
+of the previous stage, and "cat FILE" at the head of a pipeline is replaced by reading the
+file directly. Every other stage is executed as a real process, so the behavior visible to
+the caller is the same as running the whole pipeline in a shell without pipefail.
+
+Every process is started in a new session, so when the timeout expires the process group
+of each stage, including the children it forked, is terminated and the partial output is
+returned with CommandExitCode.TIMEOUT.
+
+Processes are started by the configured spawner, see spawn_process, and are reaped with
+os.wait4, their resource usage is kept for the command ledger.
+
+stream_pipeline does not buffer the output: it returns a CommandStream which yields the
+lines of the last stage while it is producing them, so that commands with megabytes of
+output, e.g "rpm -qai", can be parsed with bounded memory.
+
+run_batch executes several independent read-only commands with one helper shell instead
+of one process per command, e.g the dmidecode and lsmem calls of a collection.
+"""
+import os
+import re
+import secrets
+import shlex
+import subprocess
+import tempfile
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from ceres.conf.constant import CommandExitCode
+from ceres.function.cache import COMMAND_CACHE, CachePolicy
+from ceres.function.deadline import ProcessWatchdog
+from ceres.function.ledger import COMMAND_LEDGER, CommandTimer
+from ceres.function.log import LOGGER
+from ceres.function.spawn import ChildProcess, find_executable, spawn_process
+
+
+class PipelineError(Exception):
+    """
+    Error raised while reading the output of a pipeline.
+
+    Attributes:
+        stdout: standard output of the pipeline read before the error, unstripped
+    """
+
+    def __init__(self, error: Exception, stdout: str):
+        super().__init__(str(error))
+        self.stdout = stdout
+
+
+class BatchError(Exception):
+    """
+    Error raised while executing a command batch.
+
+    Attributes:
+        stdouts: standard output of every command read before the error, in the order of the commands
+    """
+
+    def __init__(self, error: Exception, stdouts: List[str]):
+        super().__init__(str(error))
+        self.stdouts = stdouts
+
+
+class LineFilter:
+    """
+    Base class of the stages which can be emulated in-process.
+
+    Attributes:
+        returncode: exit code the real command would return, it is valid after all
+            lines have been consumed.
+    """
+
+    def __init__(self):
+        self.returncode = 0
+
+    def __call__(self, lines: Iterable[str]) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class GrepFilter(LineFilter):
+    """
+    Emulate "grep [-w] [-v] [-i] PATTERN" with a basic regular expression.
+    """
+
+    def __init__(self, regex: str, word: bool = False, invert: bool = False, ignore_case: bool = False):
+        super().__init__()
+        if word:
+            regex = rf"(?<!\w)(?:{regex})(?!\w)"
+        self._pattern = re.compile(regex, re.IGNORECASE if ignore_case else 0)
+        self._invert = invert
+
+    def __call__(self, lines: Iterable[str]) -> Iterator[str]:
+        self.returncode = 1
+        for line in lines:
+            if (self._pattern.search(line.rstrip("\n")) is None) == self._invert:
+                self.returncode = 0
+                yield line if line.endswith("\n") else f"{line}\n"
+
+
+class AwkPrintFilter(LineFilter):
+    """
+    Emulate "awk '{print$N}'" and "awk '{print $N,$M}'" with the default field separator.
+    """
+
+    def __init__(self, fields: List[int]):
+        super().__init__()
+        self._fields = fields
+
+    def __call__(self, lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            line = line.rstrip("\n")
+            columns = line.split()
+            values = []
+            for field in self._fields:
+                if field == 0:
+                    values.append(line)
+                else:
+                    values.append(columns[field - 1] if field <= len(columns) else "")
+            yield " ".join(values) + "\n"
+
+
+class LineCountFilter(LineFilter):
+    """
+    Emulate "wc -l".
+    """
+
+    def __call__(self, lines: Iterable[str]) -> Iterator[str]:
+        count = 0
+        for line in lines:
+            if line.endswith("\n"):
+                count += 1
+        yield f"{count}\n"
+
+
+class PassthroughFilter(LineFilter):
+    """
+    Emulate "cat" without file arguments in the middle of a pipeline.
+    """
+
+    def __call__(self, lines: Iterable[str]) -> Iterator[str]:
+        yield from lines
+
+
+def _basic_regex_to_python(pattern: str) -> Optional[str]:
+    """
+    Translate a simple POSIX basic regular expression to the python syntax.
+
+    Only patterns without escapes and bracket expressions are supported, in BRE the
+    characters "+?(){}|" are literal and must be escaped for the re module.
+
+    Returns:
+        str: python regular expression, None if the pattern can not be translated safely
+    """
+    if not pattern or "\\" in pattern or "[" in pattern or pattern.startswith("*"):
+        return None
+    return re.sub(r"([+?(){}|])", r"\\\1", pattern)
+
+
+def build_filter(argv: List[str]) -> Optional[LineFilter]:
+    """
+    Create in-process filter for a pipeline stage which is not the first one.
+
+    Args:
+        argv(list): stage arguments, e.g ["grep", "-w", "nginx"]
+
+    Returns:
+        LineFilter: None if the stage can not be emulated
+    """
+    if not argv:
+        return None
+    name, args = argv[0], argv[1:]
+
+    if name == "grep":
+        options, operands = set(), []
+        for arg in args:
+            if arg.startswith("-") and len(arg) > 1 and not operands:
+                options.update(arg[1:])
+            else:
+                operands.append(arg)
+        if len(operands) != 1 or not options.issubset({"w", "v", "i"}):
+            return None
+        regex = _basic_regex_to_python(operands[0])
+        if regex is None:
+            return None
+        return GrepFilter(regex, word="w" in options, invert="v" in options, ignore_case="i" in options)
+
+    if name == "awk" and len(args) == 1:
+        match = re.fullmatch(r"\{\s*print\s*(\$\d+(?:\s*,\s*\$\d+)*)\s*\}", args[0].strip())
+        if match is None:
+            return None
+        return AwkPrintFilter([int(field) for field in re.findall(r"\$(\d+)", match.group(1))])
+
+    if name == "wc" and args == ["-l"]:
+        return LineCountFilter()
+
+    if name == "cat" and not args:
+        return PassthroughFilter()
+
+    return None
+
+
+def read_source_files(argv: List[str], cwd: Optional[str] = None) -> Optional[List[str]]:
+    """
+    Read the files of a leading "cat FILE..." stage directly instead of forking cat.
+
+    Args:
+        argv(list): stage arguments, e.g ["cat", "/etc/os-release"]
+        cwd(str): working directory used for relative paths
+
+    Returns:
+        list: lines of all files, None if the stage is not a plain cat or a file can not be read
+    """
+    if len(argv) < 2 or argv[0] != "cat" or any(arg.startswith("-") for arg in argv[1:]):
+        return None
+
+    lines = []
+    for file_path in argv[1:]:
+        if cwd and not os.path.isabs(file_path):
+            file_path = os.path.join(cwd, file_path)
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                lines.extend(file.readlines())
+        except (OSError, UnicodeDecodeError):
+            return None
+    return lines
+
+
+def split_pipeline(command: str) -> List[List[str]]:
+    """
+    Split a shell pipeline into the argument list of every stage.
+
+    Args:
+        command(str): e.g "ps -aux|grep -w nginx|awk {print$3}"
+
+    Returns:
+        list: e.g [["ps", "-aux"], ["grep", "-w", "nginx"], ["awk", "{print$3}"]]
+    """
+    return [shlex.split(cmd) for cmd in command.split("|")]
+
+
+def group_stages(stages: List[List[str]], has_input: bool = False) -> list:
+    """
+    Group consecutive stages which must run as real processes.
+
+    Args:
+        stages(list): argument list of every stage
+        has_input(bool): whether the first stage reads lines produced in-process
+
+    Returns:
+        list: items are either a LineFilter or a list of argv which are executed together
+    """
+    groups = []
+    for index, argv in enumerate(stages):
+        line_filter = build_filter(argv) if index > 0 or has_input else None
+        if line_filter is not None:
+            groups.append(line_filter)
+        elif groups and isinstance(groups[-1], list):
+            groups[-1].append(argv)
+        else:
+            groups.append([argv])
+    return groups
+
+
+def plan_pipeline(stages: List[List[str]], cwd: Optional[str]) -> Tuple[Optional[List[str]], list]:
+    """
+    Decide how every stage of a pipeline is executed.
+
+    Returns:
+        list: lines produced by a leading "cat FILE", None if there is no such source
+        list: groups of the remaining stages, see group_stages
+    """
+    source = read_source_files(stages[0], cwd)
+    if source is not None:
+        return source, group_stages(stages[1:], has_input=True)
+    return None, group_stages(stages)
+
+
+def _spawn_processes(
+    argv_list: List[List[str]], stdin: int, last_stderr, watchdog: ProcessWatchdog, **kwargs
+) -> List[ChildProcess]:
+    """
+    Start a chain of processes connected by pipes, only the stderr of the last one is kept.
+    Every process leads its own process group which is watched by the watchdog.
+
+    Args:
+        argv_list(list): argument list of every process
+        stdin(int): file descriptor read by the first process, or subprocess.DEVNULL
+        last_stderr: subprocess.PIPE, subprocess.DEVNULL or a file which gets the stderr of the last process
+        watchdog(ProcessWatchdog): watchdog of the pipeline
+
+    Returns:
+        list: started processes, stdout of the last one is opened for reading, and so is its
+        stderr when last_stderr is subprocess.PIPE
+    """
+    processes = []
+    stdin_fd = stdin
+    for index, argv in enumerate(argv_list):
+        is_last = index == len(argv_list) - 1
+        read_fd, write_fd = os.pipe()
+        stderr_read_fd, stderr_fd = None, subprocess.DEVNULL
+        if is_last and last_stderr == subprocess.PIPE:
+            stderr_read_fd, stderr_fd = os.pipe()
+        elif is_last and last_stderr != subprocess.DEVNULL:
+            stderr_fd = last_stderr.fileno()
+        try:
+            process = spawn_process(argv, stdin_fd, write_fd, stderr_fd, **kwargs)
+        except BaseException:
+            os.close(read_fd)
+            if stderr_read_fd is not None:
+                os.close(stderr_read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+            if stderr_read_fd is not None:
+                os.close(stderr_fd)
+            if index > 0:
+                # let the previous process get SIGPIPE if this one exits early
+                os.close(stdin_fd)
+        watchdog.register(process)
+        processes.append(process)
+        stdin_fd = read_fd
+
+    processes[-1].stdout = open(stdin_fd, "r", encoding="utf-8")
+    if stderr_read_fd is not None:
+        processes[-1].stderr = open(stderr_read_fd, "r", encoding="utf-8")
+    return processes
+
+
+def _communicate(processes: List[ChildProcess]) -> Tuple[int, str, str]:
+    """
+    Read all output of the last process and reap the whole chain.
+    """
+    last = processes[-1]
+    stderr_chunks = []
+    stderr_reader = None
+    if last.stderr is not None:
+        stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(last.stderr.read()), daemon=True)
+        stderr_reader.start()
+    stdout_lines = []
+    try:
+        stdout_lines.extend(last.stdout)
+    except Exception as error:
+        raise PipelineError(error, "".join(stdout_lines)) from error
+    finally:
+        last.stdout.close()
+        if stderr_reader is not None:
+            stderr_reader.join()
+            last.stderr.close()
+    for process in processes:
+        process.wait()
+    return last.returncode, "".join(stdout_lines), "".join(stderr_chunks)
+
+
+def run_pipeline(
+    command: str, cache: Optional[CachePolicy] = None, timeout: Optional[float] = None, **kwargs
+) -> Tuple[int, str, str]:
+    """
+    Execute a shell pipeline, filter stages are emulated in-process when possible.
+
+    Args:
+        command(str): shell command, stages are separated by "|"
+        cache(CachePolicy): cache the output of the first stage with this policy
+        timeout(float): seconds after which the whole pipeline is terminated, None means no limit
+        **kwargs: keyword arguments used to start the processes, e.g env and cwd
+
+    Returns:
+        Tuple[int, str, str]
+        a tuple containing three elements (return code, standard output, standard error).
+        the return code and standard error belong to the last stage of the pipeline, the
+        return code is CommandExitCode.TIMEOUT and the output is partial if the timeout expired.
+
+    Raises:
+        PipelineError: the output can't be read, e.g it is not valid utf-8
+    """
+    if timeout is not None and timeout <= 0:
+        LOGGER.warning(f"Deadline exceeded before executing command: {command}")
+        return CommandExitCode.TIMEOUT, "", "deadline exceeded"
+
+    timer = CommandTimer()
+    stages = split_pipeline(command)
+    watchdog = ProcessWatchdog(timeout)
+    cached = False
+    try:
+        if cache is None:
+            source, groups = plan_pipeline(stages, kwargs.get("cwd"))
+            result = _run_groups(source, groups, watchdog, **kwargs)
+        else:
+            result, cached = _run_cached(stages, cache, watchdog, **kwargs)
+    except BaseException:
+        watchdog.cancel(kill=True)
+        raise
+    watchdog.cancel()
+
+    if watchdog.expired:
+        LOGGER.warning(f"Command timed out after {timeout:.1f}s: {command}")
+        result = CommandExitCode.TIMEOUT, result[1], result[2]
+    COMMAND_LEDGER.record_result(command, watchdog.processes, timer, result, cached)
+    return result
+
+
+def _run_cached(
+    stages: List[List[str]], cache: CachePolicy, watchdog: ProcessWatchdog, **kwargs
+) -> Tuple[Tuple[int, str, str], bool]:
+    """
+    Execute a pipeline whose first stage output is served from the command cache when valid.
+
+    Returns:
+        Tuple[int, str, str]: result of the pipeline
+        bool: whether the output of the first stage came from the cache
+    """
+    result = COMMAND_CACHE.get(stages[0], kwargs, cache)
+    cached = result is not None
+    if not cached:
+        processes = _spawn_processes(stages[:1], subprocess.DEVNULL, subprocess.PIPE, watchdog, **kwargs)
+        result = _communicate(processes)
+        if not watchdog.expired:
+            COMMAND_CACHE.set(stages[0], kwargs, cache, result)
+    if len(stages) == 1:
+        return (result[0], result[1].strip(), result[2].strip()), cached
+    groups = group_stages(stages[1:], has_input=True)
+    return _run_groups(result[1].splitlines(keepends=True), groups, watchdog, **kwargs), cached
+
+
+def _run_groups(source: Optional[List[str]], groups: list, watchdog: ProcessWatchdog, **kwargs) -> Tuple[int, str, str]:
+    """
+    Execute grouped stages, see plan_pipeline.
+    """
+    lines: Optional[Iterable[str]] = source
+    for index, group in enumerate(groups):
+        if isinstance(group, LineFilter):
+            lines = group([] if lines is None else lines)
+            continue
+
+        is_last = index == len(groups) - 1
+        stdin = subprocess.DEVNULL if lines is None else _feed_lines(lines)
+        try:
+            processes = _spawn_processes(
+                group, stdin, subprocess.PIPE if is_last else subprocess.DEVNULL, watchdog, **kwargs
+            )
+        finally:
+            if lines is not None:
+                os.close(stdin)
+        if is_last:
+            returncode, stdout, stderr = _communicate(processes)
+            return returncode, stdout.strip(), stderr.strip()
+        lines = _iter_process_output(processes)
+
+    stdout_lines = []
+    try:
+        stdout_lines.extend([] if lines is None else lines)
+    except Exception as error:
+        raise PipelineError(error, "".join(stdout_lines)) from error
+    stdout = "".join(stdout_lines)
+    returncode = groups[-1].returncode if groups else 0
+    return returncode, stdout.strip(), ""
+
+
+class CommandStream:
+    """
+    Lines of the standard output of a command, without line endings, yielded while the
+    command is producing them. Close the stream, or use it as a context manager, to reap
+    the processes when it is not exhausted.
+
+    Attributes:
+        returncode: return code of the last stage, None until the stream is exhausted or closed
+        stderr: standard error of the last stage, set with the return code
+
+    Example usage:
+    >>> with stream_pipeline("rpm -qai|grep .src.rpm") as stream:
+    ...     packages = [line.split(":")[1].strip() for line in stream]
+    >>> print(stream.returncode)
+    0
+    """
+
+    def __init__(self, lines: Iterable[str], finish: Callable[[bool, int], Tuple[int, str]], count_bytes=False):
+        self._lines = iter(lines)
+        self._finish = finish
+        self._count_bytes = count_bytes
+        self._stdout_bytes = 0
+        self.returncode: Optional[int] = None
+        self.stderr = ""
+
+    @classmethod
+    def from_output(cls, returncode: int, stdout: str, stderr: str = "") -> "CommandStream":
+        """
+        Make a stream of output which has already been produced, e.g when the command can't be started.
+        """
+        return cls(stdout.splitlines(), lambda kill, stdout_bytes: (returncode, stderr))
+
+    def __iter__(self) -> "CommandStream":
+        return self
+
+    def __next__(self) -> str:
+        try:
+            line = next(self._lines)
+        except StopIteration:
+            self._close(kill=False)
+            raise
+        if self._count_bytes:
+            self._stdout_bytes += len(line.encode("utf-8"))
+        return line.rstrip("\n")
+
+    def __enter__(self) -> "CommandStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _close(self, kill: bool) -> None:
+        if self.returncode is None:
+            self.returncode, self.stderr = self._finish(kill, self._stdout_bytes)
+
+    def close(self) -> None:
+        """
+        Stop reading, processes which are still running are killed.
+        """
+        self._close(kill=True)
+
+
+def stream_pipeline(command: str, timeout: Optional[float] = None, **kwargs) -> CommandStream:
+    """
+    Execute a shell pipeline without buffering its output, see run_pipeline.
+
+    Args:
+        command(str): shell command, stages are separated by "|"
+        timeout(float): seconds after which the whole pipeline is terminated, None means no limit
+        **kwargs: keyword arguments used to start the processes, e.g env and cwd
+
+    Returns:
+        CommandStream: stdout lines of the pipeline, the return code is CommandExitCode.TIMEOUT
+        if the timeout expired before the stream is exhausted
+    """
+    if timeout is not None and timeout <= 0:
+        LOGGER.warning(f"Deadline exceeded before executing command: {command}")
+        return CommandStream.from_output(CommandExitCode.TIMEOUT, "", "deadline exceeded")
+
+    timer = CommandTimer()
+    source, groups = plan_pipeline(split_pipeline(command), kwargs.get("cwd"))
+    watchdog = ProcessWatchdog(timeout)
+    lines: Iterable[str] = [] if source is None else source
+    processes: List[ChildProcess] = []
+    # processes of every group, they are all reaped when the stream is finished
+    spawned: List[ChildProcess] = []
+    # stderr of the last process goes to a file, so that it can't block the process while stdout is read
+    stderr_file = None
+    try:
+        for index, group in enumerate(groups):
+            if isinstance(group, LineFilter):
+                lines = group(lines)
+                continue
+
+            is_last = index == len(groups) - 1
+            stdin = subprocess.DEVNULL if index == 0 and source is None else _feed_lines(lines)
+            if is_last:
+                stderr_file = tempfile.TemporaryFile("w+", encoding="utf-8")
+            try:
+                processes = _spawn_processes(
+                    group, stdin, stderr_file if is_last else subprocess.DEVNULL, watchdog, **kwargs
+                )
+            finally:
+                if stdin != subprocess.DEVNULL:
+                    os.close(stdin)
+            spawned.extend(processes)
+            lines = processes[-1].stdout if is_last else _iter_process_output(processes)
+    except BaseException:
+        watchdog.cancel(kill=True)
+        if stderr_file is not None:
+            stderr_file.close()
+        raise
+
+    def finish(kill: bool, stdout_bytes: int) -> Tuple[int, str]:
+        if kill:
+            watchdog.cancel(kill=True)
+        if hasattr(lines, "close"):
+            lines.close()
+        try:
+            # closing a trailing filter doesn't close the output of the processes before it
+            if processes:
+                processes[-1].stdout.close()
+            for process in spawned:
+                process.wait()
+            if groups and isinstance(groups[-1], LineFilter):
+                returncode, stderr = groups[-1].returncode, ""
+            elif processes:
+                stderr_file.seek(0)
+                returncode, stderr = processes[-1].returncode, stderr_file.read().strip()
+            else:
+                returncode, stderr = CommandExitCode.SUCCEED, ""
+        finally:
+            watchdog.cancel()
+            if stderr_file is not None:
+                stderr_file.close()
+        if watchdog.expired:
+            LOGGER.warning(f"Command timed out after {timeout:.1f}s: {command}")
+            returncode = CommandExitCode.TIMEOUT
+        COMMAND_LEDGER.record(
+            command, watchdog.processes, timer, returncode, stdout_bytes, len(stderr.encode("utf-8"))
+        )
+        return returncode, stderr
+
+    return CommandStream(lines, finish, count_bytes=COMMAND_LEDGER.enabled)
+
+
+def _feed_lines(lines: Iterable[str]) -> int:
+    """
+    Write lines produced in-process into a new pipe from a background thread, so that a
+    real process can read them from stdin without blocking the reader of its stdout.
+
+    Returns:
+        int: file descriptor of the read end of the pipe
+    """
+    read_fd, write_fd = os.pipe()
+
+    def write():
+        with open(write_fd, "w", encoding="utf-8") as pipe:
+            try:
+                for line in lines:
+                    pipe.write(line)
+            except BrokenPipeError:
+                pass
+
+    threading.Thread(target=write, daemon=True).start()
+    return read_fd
+
+
+def _iter_process_output(processes: List[ChildProcess]) -> Iterator[str]:
+    """
+    Yield the stdout lines of the last process and reap the whole chain afterwards.
+    """
+    try:
+        yield from processes[-1].stdout
+    finally:
+        processes[-1].stdout.close()
+        for process in processes:
+            process.wait()
+
+
+BATCH_SHELL = "/bin/sh"
+
+
+def run_batch(
+    commands: List[str], cache: Optional[CachePolicy] = None, timeout: Optional[float] = None, **kwargs
+) -> List[Tuple[int, str, str]]:
+    """
+    Execute independent read-only commands with a single helper process.
+
+    The first stage of every command which needs a process is run one after another by one
+    shell, its stdout and stderr are framed with a random boundary and split again into one
+    result per command. The following stages are run the same way as run_pipeline does with
+    the cached output of a first stage, first stages served from the command cache or read
+    in-process are not sent to the helper at all.
+
+    Args:
+        commands(list): shell commands, stages are separated by "|"
+        cache(CachePolicy): cache the output of the first stage of every command with this policy
+        timeout(float): seconds after which the whole batch is terminated, None means no limit
+        **kwargs: keyword arguments used to start the processes, they are shared by all commands
+
+    Returns:
+        list: (return code, standard output, standard error) of every command, in the order of
+        commands. commands which did not finish before the timeout get CommandExitCode.TIMEOUT.
+
+    Raises:
+        BatchError: the output of a command can't be read, e.g it is not valid utf-8
+    """
+    if timeout is not None and timeout <= 0:
+        LOGGER.warning(f"Deadline exceeded before executing commands: {commands}")
+        return [(CommandExitCode.TIMEOUT, "", "deadline exceeded")] * len(commands)
+
+    timer = CommandTimer()
+    watchdog = ProcessWatchdog(timeout)
+    # argument lists of the processes started by the helper, for the command ledger
+    helper_argv: List[List[str]] = []
+    try:
+        results = _run_batch(
+            [split_pipeline(command) for command in commands], cache, watchdog, helper_argv, **kwargs
+        )
+    except BaseException:
+        watchdog.cancel(kill=True)
+        raise
+    watchdog.cancel()
+
+    if watchdog.expired:
+        LOGGER.warning(f"Command batch timed out after {timeout:.1f}s: {commands}")
+    if COMMAND_LEDGER.enabled:
+        COMMAND_LEDGER.record(
+            "; ".join(commands),
+            watchdog.processes,
+            timer,
+            max((result[0] for result in results), default=CommandExitCode.SUCCEED),
+            sum(len(result[1].encode("utf-8")) for result in results),
+            sum(len(result[2].encode("utf-8")) for result in results),
+            argv=[list(process.args) for process in watchdog.processes] + helper_argv,
+        )
+    return results
+
+
+def _run_batch(
+    stages_list: List[List[List[str]]],
+    cache: Optional[CachePolicy],
+    watchdog: ProcessWatchdog,
+    helper_argv: List[List[str]],
+    **kwargs,
+) -> List[Tuple[int, str, str]]:
+    """
+    Execute the first stages of a batch, then the following stages of every command.
+    """
+    env = kwargs.get("env")
+    first_results: List[Optional[Tuple[int, str, str]]] = [None] * len(stages_list)
+    results: List[Optional[Tuple[int, str, str]]] = [None] * len(stages_list)
+    # index of the command whose output is being read, its partial output is kept on an error
+    current: Optional[int] = None
+    pending = {}
+    try:
+        for index, stages in enumerate(stages_list):
+            source = read_source_files(stages[0], kwargs.get("cwd"))
+            if source is not None:
+                current = index
+                groups = group_stages(stages[1:], has_input=True)
+                results[index] = _run_groups(source, groups, watchdog, **kwargs)
+                continue
+            if cache is not None:
+                first_results[index] = COMMAND_CACHE.get(stages[0], kwargs, cache)
+                if first_results[index] is not None:
+                    continue
+            try:
+                executable = find_executable(stages[0][0], os.environ if env is None else env)
+                pending[index] = [executable] + stages[0][1:]
+            except (FileNotFoundError, IndexError) as error:
+                LOGGER.error(error)
+                results[index] = CommandExitCode.FAIL, "", str(error)
+
+        if len(pending) == 1:
+            index, argv = next(iter(pending.items()))
+            current = index
+            first_results[index] = _communicate(
+                _spawn_processes([argv], subprocess.DEVNULL, subprocess.PIPE, watchdog, **kwargs)
+            )
+        elif pending:
+            current = None
+            helper_argv.extend(pending.values())
+            for index, result in zip(pending, _run_helper(list(pending.values()), watchdog, **kwargs)):
+                first_results[index] = result
+
+        for index, stages in enumerate(stages_list):
+            if results[index] is not None:
+                continue
+            first = first_results[index]
+            finished = first[0] != CommandExitCode.TIMEOUT or not watchdog.expired
+            if index in pending and cache is not None and finished:
+                COMMAND_CACHE.set(stages[0], kwargs, cache, first)
+            if len(stages) == 1 or not finished:
+                results[index] = first[0], first[1].strip(), first[2].strip()
+                continue
+            groups = group_stages(stages[1:], has_input=True)
+            current = index
+            returncode, stdout, stderr = _run_groups(first[1].splitlines(keepends=True), groups, watchdog, **kwargs)
+            results[index] = CommandExitCode.TIMEOUT if watchdog.expired else returncode, stdout, stderr
+    except Exception as error:
+        stdouts = ["" if result is None else result[1] for result in results]
+        if isinstance(error, BatchError):
+            # partial output of the first stages run by the helper
+            for index, stdout in zip(pending, error.stdouts):
+                stdouts[index] = stdout
+        elif isinstance(error, PipelineError) and current is not None:
+            stdouts[current] = error.stdout
+        raise BatchError(error, stdouts) from error
+    return results
+
+
+def _run_helper(
+    argv_list: List[List[str]], watchdog: ProcessWatchdog, **kwargs
+) -> List[Tuple[int, str, str]]:
+    """
+    Run commands one after another in one shell and split its framed output.
+
+    Every command writes "BOUNDARY INDEX" before its output and "BOUNDARY INDEX exit" after
+    it, on stdout and on stderr, the return code follows the end marker on stdout.
+
+    Returns:
+        list: unstripped (return code, standard output, standard error) of every command, a
+        command which was not finished gets CommandExitCode.TIMEOUT with its partial output
+    """
+    boundary = f"ceres-batch-{secrets.token_hex(16)}"
+    script = []
+    for index, argv in enumerate(argv_list):
+        begin, end = shlex.quote(f"{boundary} {index}"), shlex.quote(f"{boundary} {index} exit")
+        script.append(f"printf '%s\\n' {begin}; printf '%s\\n' {begin} >&2")
+        script.append(" ".join(shlex.quote(arg) for arg in argv))
+        script.append(f"printf '\\n%s %s\\n' {end} \"$?\"; printf '\\n%s\\n' {end} >&2")
+    processes = _spawn_processes(
+        [[BATCH_SHELL, "-c", "\n".join(script)]], subprocess.DEVNULL, subprocess.PIPE, watchdog, **kwargs
+    )
+    try:
+        _, stdout, stderr = _communicate(processes)
+    except PipelineError as error:
+        frames = _split_frames(error.stdout, boundary)
+        raise BatchError(error, [frames.get(index, ("", None))[0] for index in range(len(argv_list))]) from error
+    stdout_frames, stderr_frames = _split_frames(stdout, boundary), _split_frames(stderr, boundary)
+
+    results = []
+    for index in range(len(argv_list)):
+        output, returncode = stdout_frames.get(index, ("", None))
+        error = stderr_frames.get(index, ("", None))[0]
+        if returncode is None and watchdog.expired:
+            returncode = CommandExitCode.TIMEOUT
+            error = error if index in stdout_frames else "deadline exceeded"
+        elif returncode is None:
+            returncode, error = CommandExitCode.FAIL, error or "command batch helper exited early"
+        results.append((returncode, output, error))
+    return results
+
+
+def _split_frames(output: str, boundary: str) -> dict:
+    """
+    Split the framed output of the batch helper.
+
+    Returns:
+        dict: index of the command -> (output, return code), the return code is None if the
+        end marker is missing, it is also None on stderr which has no return code
+    """
+    frames = {}
+    for piece in output.split(f"{boundary} ")[1:]:
+        header, _, body = piece.partition("\n")
+        fields = header.split()
+        if not fields or not fields[0].isdigit():
+            continue
+        index = int(fields[0])
+        if len(fields) == 1:
+            # the helper adds a newline before the end marker, it is not part of the output
+            frames[index] = (body[:-1] if body.endswith("\n") else body, None)
+        elif index in frames and len(fields) == 3 and fields[2].lstrip("-").isdigit():
+            frames[index] = (frames[index][0], int(fields[2]))
+    return frames
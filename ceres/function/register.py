@@ -66,7 +66,7 @@ def register(register_info: dict) -> int:
         return PARAM_ERROR
 
     headers = {'content-type': 'application/json', "access_token": register_info.pop('access_token')}
-    register_info['host_ip'] = Collect.get_host_ip()
+    register_info['host_ip'] = Collect.get_host_ip(register_info['zeus_ip'])
     url = f'http://{register_info.pop("zeus_ip")}:{register_info.pop("zeus_port")}/manage/host/add'
     try:
         ret = requests.post(url, data=json.dumps(register_info), headers=headers, timeout=5)
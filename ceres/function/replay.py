@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Record/replay harness for executed commands.
+
+install_shims writes one shim executable per command, e.g dmidecode or dnf, into a shim
+directory. When the SHIM_DIR option of the command section of the configuration points to
+that directory, every command started by the agent whose name has a shim runs the shim
+instead of the real executable, whatever its PATH or env.
+
+- record: the shim runs the real executable and saves its output into a fixture corpus,
+  one JSON file per argument list. It is used on a real host to capture production outputs.
+- replay: the shim serves the saved output after a configurable latency and jitter, and
+  fails with a configurable probability, so that managers can be timed end to end and
+  regression-tested on a plain Linux box without dnf, dmidecode or syscare.
+
+Example usage:
+    python3 -m ceres.function.replay record --shim-dir /tmp/shims --corpus /tmp/fixtures dmidecode lscpu
+    python3 -m ceres.function.replay replay --shim-dir /tmp/shims --corpus /tmp/fixtures --latency 0.05 dnf
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+from typing import Dict, List, Optional
+
+from ceres.function import replay_shim
+from ceres.function.replay_shim import SETTINGS_FILE
+
+SHIM_MODES = ("record", "replay")
+
+
+def install_shims(
+    shim_dir: str,
+    names: List[str],
+    mode: str,
+    corpus: str,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    failure_rate: float = 0.0,
+    failure_code: int = 1,
+    overrides: Optional[Dict[str, dict]] = None,
+) -> None:
+    """
+    Write the shims of some commands and the settings they share.
+
+    Args:
+        shim_dir(str): directory of the shims, it is what SHIM_DIR must be set to
+        names(list): names of the shimmed commands, e.g ["dmidecode", "dnf"]
+        mode(str): record or replay
+        corpus(str): directory of the fixtures
+        latency(float): seconds a replayed command takes
+        jitter(float): the latency varies uniformly by up to this many seconds
+        failure_rate(float): probability that a replayed command fails
+        failure_code(int): return code of an injected failure
+        overrides(dict): latency, jitter, failure_rate or failure_code of some commands,
+            e.g {"dnf": {"latency": 2.0}}
+
+    Raises:
+        ValueError: the mode is unknown
+        FileNotFoundError: the real executable of a recorded command can not be found
+    """
+    if mode not in SHIM_MODES:
+        raise ValueError(f"unknown shim mode {mode}, it should be one of {SHIM_MODES}")
+
+    shim_dir = os.path.abspath(shim_dir)
+    search_path = os.pathsep.join(
+        path for path in os.environ.get("PATH", os.defpath).split(os.pathsep) if os.path.abspath(path) != shim_dir
+    )
+    executables = {}
+    if mode == "record":
+        for name in names:
+            executables[name] = shutil.which(name, path=search_path)
+            if executables[name] is None:
+                raise FileNotFoundError(f"the real executable of {name} is not found")
+
+    os.makedirs(shim_dir, exist_ok=True)
+    settings = {
+        "mode": mode,
+        "corpus": os.path.abspath(corpus),
+        "executables": executables,
+        "defaults": {"latency": latency, "jitter": jitter, "failure_rate": failure_rate, "failure_code": failure_code},
+        "commands": overrides or {},
+    }
+    with open(os.path.join(shim_dir, SETTINGS_FILE), "w", encoding="utf-8") as file:
+        json.dump(settings, file, indent=4)
+
+    with open(replay_shim.__file__, "r", encoding="utf-8") as file:
+        # -I keeps the shim away from the environment of the agent, -S skips site for a fast start
+        source = f"#!{sys.executable} -IS\n" + file.read().split("\n", 1)[1]
+    for name in names:
+        shim_path = os.path.join(shim_dir, name)
+        with open(shim_path, "w", encoding="utf-8") as file:
+            file.write(source)
+        os.chmod(shim_path, 0o755)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="install record/replay shims of commands")
+    parser.add_argument("mode", choices=SHIM_MODES)
+    parser.add_argument("names", nargs="+", help="names of the shimmed commands, e.g dmidecode dnf")
+    parser.add_argument("--shim-dir", required=True, help="directory of the shims, set shim_dir to it")
+    parser.add_argument("--corpus", required=True, help="directory of the fixtures")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds a replayed command takes")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum variation of the latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability of an injected failure")
+    parser.add_argument("--failure-code", type=int, default=1, help="return code of an injected failure")
+    args = parser.parse_args()
+    install_shims(
+        args.shim_dir,
+        args.names,
+        args.mode,
+        args.corpus,
+        args.latency,
+        args.jitter,
+        args.failure_rate,
+        args.failure_code,
+    )
+    print(f"set shim_dir={os.path.abspath(args.shim_dir)} in the command section of ceres.conf")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Shim executable of the record/replay harness, see ceres.function.replay.
+
+This file is copied into the shim directory once per shimmed command, e.g as "dmidecode", so
+it only depends on the standard library. The settings written by install_shims are read
+from harness.json next to it.
+
+In record mode the real executable is run, its output is passed through and saved into the
+fixture corpus. In replay mode the saved output is served after the configured latency,
+and a failure is injected with the configured probability.
+"""
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from typing import List, Optional
+
+SETTINGS_FILE = "harness.json"
+MISSING_FIXTURE_CODE = 127
+
+
+def fixture_key(argv: List[str]) -> str:
+    """
+    Get the name of the fixture of an invocation, the path of the executable is ignored.
+
+    Returns:
+        str: e.g dmidecode-1f0e6bd5c3a9d4e2
+    """
+    name = os.path.basename(argv[0])
+    digest = hashlib.sha1(json.dumps([name] + list(argv[1:])).encode("utf-8")).hexdigest()
+    return f"{name}-{digest[:16]}"
+
+
+def read_fixture(corpus: str, argv: List[str]) -> Optional[dict]:
+    """
+    Read the recorded result of an invocation.
+
+    Returns:
+        dict: argv, returncode, stdout and stderr, None if it has not been recorded
+    """
+    try:
+        with open(os.path.join(corpus, fixture_key(argv) + ".json"), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_fixture(corpus: str, argv: List[str], returncode: int, stdout: bytes, stderr: bytes) -> None:
+    """
+    Save the result of an invocation, bytes which are not utf-8 are kept with surrogateescape.
+    """
+    # imported here, a replaying shim never needs them and starts faster without them
+    import tempfile
+
+    fixture = {
+        "argv": [os.path.basename(argv[0])] + list(argv[1:]),
+        "returncode": returncode,
+        "stdout": stdout.decode("utf-8", "surrogateescape"),
+        "stderr": stderr.decode("utf-8", "surrogateescape"),
+    }
+    os.makedirs(corpus, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=corpus, prefix=".fixture.")
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        json.dump(fixture, file, indent=4)
+        file.write("\n")
+    os.replace(tmp_path, os.path.join(corpus, fixture_key(argv) + ".json"))
+
+
+def _write(stream, text: str) -> None:
+    stream.buffer.write(text.encode("utf-8", "surrogateescape"))
+    stream.flush()
+
+
+def record(settings: dict, name: str, argv: List[str]) -> int:
+    """
+    Run the real executable, pass its output through and save it.
+    """
+    import subprocess
+
+    executable = settings["executables"].get(name)
+    if executable is None:
+        _write(sys.stderr, f"{name}: command not found\n")
+        return MISSING_FIXTURE_CODE
+    result = subprocess.run([executable] + argv[1:], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    sys.stdout.buffer.write(result.stdout)
+    sys.stdout.flush()
+    sys.stderr.buffer.write(result.stderr)
+    sys.stderr.flush()
+    returncode = result.returncode if result.returncode >= 0 else 128 - result.returncode
+    write_fixture(settings["corpus"], argv, returncode, result.stdout, result.stderr)
+    return returncode
+
+
+def replay(settings: dict, name: str, argv: List[str]) -> int:
+    """
+    Serve the saved output of an invocation with injected latency and failures.
+    """
+    options = dict(settings.get("defaults", {}))
+    options.update(settings.get("commands", {}).get(name, {}))
+    jitter = options.get("jitter", 0)
+    time.sleep(max(0.0, options.get("latency", 0) + random.uniform(-jitter, jitter)))
+    if random.random() < options.get("failure_rate", 0):
+        _write(sys.stderr, f"{name}: injected failure\n")
+        return options.get("failure_code", 1)
+
+    fixture = read_fixture(settings["corpus"], argv)
+    if fixture is None:
+        _write(sys.stderr, f"{name}: no recording for {argv[1:]}\n")
+        return MISSING_FIXTURE_CODE
+    _write(sys.stdout, fixture["stdout"])
+    _write(sys.stderr, fixture["stderr"])
+    return fixture["returncode"]
+
+
+def main() -> int:
+    shim_path = os.path.abspath(__file__)
+    with open(os.path.join(os.path.dirname(shim_path), SETTINGS_FILE), "r", encoding="utf-8") as file:
+        settings = json.load(file)
+    name = os.path.basename(shim_path)
+    argv = [name] + sys.argv[1:]
+    if settings["mode"] == "record":
+        return record(settings, name, argv)
+    return replay(settings, name, argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Reader of the installed rpm packages.
+
+The sqlite rpm database of openEuler 22.03 and later is read directly: every row of its
+Packages table is the header blob of a package, only the few tags needed are decoded from
+it. The older Berkeley DB database can not be read natively, rpm -qa is executed with a
+query format printing the same tags instead, one line per package.
+"""
+import os
+import shlex
+import struct
+import urllib.parse
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+
+from ceres.conf.constant import CommandExitCode
+from ceres.function.facts import root_path
+from ceres.function.log import LOGGER
+from ceres.function.util import stream_shell_command
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+RPMDB_SQLITE_PATHS = ("/var/lib/rpm/rpmdb.sqlite", "/usr/lib/sysimage/rpm/rpmdb.sqlite")
+RPMDB_DIRS = ("/var/lib/rpm", "/usr/lib/sysimage/rpm")
+# the files written by a transaction: the Berkeley DB Packages file, or the sqlite database and
+# its write-ahead log. The sqlite shared memory file is written by the readers too.
+RPMDB_FILES = ("Packages", "rpmdb.sqlite", "rpmdb.sqlite-wal")
+
+RPMTAG_NAME = 1000
+RPMTAG_VERSION = 1001
+RPMTAG_RELEASE = 1002
+RPMTAG_EPOCH = 1003
+RPMTAG_ARCH = 1022
+RPMTAG_SOURCERPM = 1044
+RPM_INT32_TYPE = 4
+RPM_STRING_TYPES = (6, 8, 9)
+_HEADER_TAGS = (RPMTAG_NAME, RPMTAG_VERSION, RPMTAG_RELEASE, RPMTAG_EPOCH, RPMTAG_ARCH, RPMTAG_SOURCERPM)
+
+RPM_QUERY_COMMAND = (
+    "rpm -qa --qf '%{NAME}\\t%{EPOCH}\\t%{VERSION}\\t%{RELEASE}\\t%{ARCH}\\t%{SOURCERPM}\\n'"
+)
+
+
+@dataclass(frozen=True)
+class RpmPackage:
+    """
+    An installed binary package and the source package it was built from.
+
+    Attributes:
+        source_name: None for the packages without source rpm, such as gpg-pubkey
+        source_rpm: e.g bash-5.1.8-6.oe2203.src.rpm
+    """
+
+    name: str
+    epoch: Optional[int]
+    version: str
+    release: str
+    arch: Optional[str]
+    source_name: Optional[str]
+    source_rpm: Optional[str]
+
+
+def parse_source_rpm(source_rpm: Optional[str]) -> Optional[str]:
+    """
+    Get the name of a source package from its file name, e.g bash-5.1.8-6.oe2203.src.rpm -> bash
+    """
+    if not source_rpm or source_rpm == "(none)":
+        return None
+    parts = source_rpm.rsplit("-", 2)
+    return parts[0] if len(parts) == 3 else None
+
+
+def _make_package(tags: Dict[int, Union[int, str, None]]) -> RpmPackage:
+    source_rpm = tags.get(RPMTAG_SOURCERPM)
+    return RpmPackage(
+        name=tags.get(RPMTAG_NAME) or "",
+        epoch=tags.get(RPMTAG_EPOCH),
+        version=tags.get(RPMTAG_VERSION) or "",
+        release=tags.get(RPMTAG_RELEASE) or "",
+        arch=tags.get(RPMTAG_ARCH),
+        source_name=parse_source_rpm(source_rpm),
+        source_rpm=source_rpm or None,
+    )
+
+
+def parse_header_blob(blob: bytes, tags: Iterable[int] = _HEADER_TAGS) -> Dict[int, Union[int, str]]:
+    """
+    Decode some tags of the header blob of a package, other tags and types are skipped.
+
+    The blob starts with the number of index entries and the size of the data store, then the
+    index entries (tag, type, offset, count), all of them big endian, then the data store.
+
+    Returns:
+        dict: tag -> value, the first string of a string array, e.g {1000: "bash", 1003: 1}
+    """
+    wanted = set(tags)
+    index_count, data_size = struct.unpack_from(">ii", blob, 0)
+    data_start = 8 + index_count * 16
+    if index_count < 0 or data_size < 0 or data_start + data_size > len(blob):
+        raise ValueError("truncated rpm header")
+    values = {}
+    for tag, tag_type, offset, _ in struct.iter_unpack(">iiii", blob[8:data_start]):
+        if tag not in wanted or not 0 <= offset < data_size:
+            continue
+        if tag_type == RPM_INT32_TYPE:
+            values[tag] = struct.unpack_from(">i", blob, data_start + offset)[0]
+        elif tag_type in RPM_STRING_TYPES:
+            end = blob.index(b"\x00", data_start + offset)
+            values[tag] = blob[data_start + offset:end].decode("utf-8", "replace")
+    return values
+
+
+def read_sqlite_rpmdb(path: str) -> Optional[List[RpmPackage]]:
+    """
+    Read the packages of a sqlite rpm database, it is opened read only.
+
+    Returns:
+        list: installed packages, None if the database can not be read
+    """
+    if sqlite3 is None:
+        return None
+    try:
+        # the path of a container root may contain characters which have a meaning in a URI, such as ? or #
+        connection = sqlite3.connect(f"file:{urllib.parse.quote(path)}?mode=ro", uri=True)
+    except sqlite3.Error as error:
+        LOGGER.debug(f"Failed to open rpm database {path}: {error}")
+        return None
+    try:
+        return [_make_package(parse_header_blob(blob)) for (blob,) in connection.execute("SELECT blob FROM Packages")]
+    except (sqlite3.Error, struct.error, ValueError) as error:
+        LOGGER.debug(f"Failed to read rpm database {path}: {error}")
+        return None
+    finally:
+        connection.close()
+
+
+def _parse_query_line(line: str) -> Optional[RpmPackage]:
+    fields = line.rstrip("\n").split("\t")
+    if len(fields) != 6:
+        return None
+    name, epoch, version, release, arch, source_rpm = fields
+    return RpmPackage(
+        name=name,
+        epoch=int(epoch) if epoch.isdigit() else None,
+        version=version,
+        release=release,
+        arch=None if arch == "(none)" else arch,
+        source_name=parse_source_rpm(source_rpm),
+        source_rpm=None if source_rpm == "(none)" else source_rpm,
+    )
+
+
+def query_rpm_packages(root: str = "/") -> Optional[List[RpmPackage]]:
+    """
+    Get the installed packages with one rpm -qa, the output is read line by line.
+
+    Args:
+        root(str): the root directory of the rpm database, e.g the root filesystem of a container
+
+    Returns:
+        list: installed packages, None if rpm failed
+    """
+    command = RPM_QUERY_COMMAND
+    if root != "/":
+        command = command.replace("rpm ", f"rpm --root {shlex.quote(root)} ", 1)
+    with stream_shell_command(command) as stream:
+        packages = [package for package in map(_parse_query_line, stream) if package is not None]
+    if stream.returncode != CommandExitCode.SUCCEED:
+        LOGGER.error(f"Failed to query installed packages: {stream.stderr}")
+        return None
+    return packages
+
+
+def get_rpmdb_fingerprint(root: str = "/") -> Optional[list]:
+    """
+    Get the size and mtime of the files of the rpm database, they change with every transaction.
+    The roots of the containers made from the same image layer have the same fingerprint.
+
+    Args:
+        root(str): the root directory of the rpm database
+
+    Returns:
+        list: e.g [["/var/lib/rpm/rpmdb.sqlite", 4247552, 1665452399651432011]], the paths are
+            relative to the root, None if there is no rpm database
+    """
+    fingerprint = []
+    for rpmdb_dir in RPMDB_DIRS:
+        for name in RPMDB_FILES:
+            path = os.path.join(rpmdb_dir, name)
+            try:
+                stat = os.stat(root_path(root, path) or "")
+            except OSError:
+                continue
+            fingerprint.append([path, stat.st_size, stat.st_mtime_ns])
+    return fingerprint or None
+
+
+def get_installed_rpm_packages(root: str = "/") -> Optional[List[RpmPackage]]:
+    """
+    Get the installed packages from the sqlite rpm database, or from rpm -qa if there is none.
+
+    Args:
+        root(str): the root directory of the rpm database, e.g the root filesystem of a container
+
+    Returns:
+        list: installed packages, None if neither can be read
+    """
+    for path in RPMDB_SQLITE_PATHS:
+        path = root_path(root, path)
+        packages = read_sqlite_rpmdb(path) if path else None
+        if packages is not None:
+            return packages
+    return query_rpm_packages(root)
@@ -10,8 +10,12 @@
 # PURPOSE.
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
+from ceres.conf.constant import HOST_COLLECT_INFO_OPTIONAL, HOST_COLLECT_INFO_SUPPORT, INVENTORY_FIELDS
+
 STRING_ARRAY = {"type": "array", "items": {"type": "string", "minLength": 1}, "minItems": 1}
 
+ROOTS_SCHEMA = {"type": "array", "items": {"type": "string", "pattern": "^/"}, "minItems": 1, "uniqueItems": True}
+
 CHANGE_COLLECT_ITEMS_SCHEMA = {
     "type": "object",
     "additionalProperties": {"type": "object", "additionalProperties": {"enum": ["on", "off", "auto"]}},
@@ -67,6 +71,8 @@ CVE_SCAN_SCHEMA = {
         "check_items": {"type": "array", "items": {"type": "string"}},
         "check": {"enum": [True, False]},
         "basic": {"enum": [True, False]},
+        "package_generation": {"type": "integer", "minimum": 0},
+        "roots": ROOTS_SCHEMA,
     },
 }
 
@@ -91,7 +97,11 @@ CVE_FIX_SCHEMA = {
     },
 }
 
-HOST_INFO_SCHEMA = {"type": "array", "items": {"enum": ["os", "cpu", "memory", "disk"]}}
+HOST_INFO_SCHEMA = {"type": "array", "items": {"enum": HOST_COLLECT_INFO_SUPPORT + HOST_COLLECT_INFO_OPTIONAL}}
+
+INVENTORY_SCHEMA = {"type": "array", "items": {"enum": INVENTORY_FIELDS}}
+
+KNOWN_HASHES_SCHEMA = {"type": "object", "additionalProperties": {"type": "string", "pattern": "^[0-9a-f]{64}$"}}
 
 CVE_ROLLBACK_SCHEMA = {
     "type": "object",
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Persistent snapshot of the host info.
+
+The sections of the host info hardly change while the host is up, so the last collected value
+of each section is saved with the boot id and a fingerprint made of a few cheap reads:
+
+    os: DMI modalias, kernel release and mtime of the os release file
+    cpu: DMI modalias and online cpus
+    memory: DMI modalias and memory blocks
+    disk: DMI modalias and the listing of /sys/block
+
+A section is served from the snapshot while the boot id and its fingerprint are unchanged. The
+perf section has no fingerprint, its tunables may change at any time, so it is always collected.
+"""
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from ceres.function import facts
+from ceres.function.cache import _read_boot_id
+from ceres.function.log import LOGGER
+
+
+def _list_dir(path: str) -> List[str]:
+    try:
+        return sorted(os.listdir(path))
+    except OSError:
+        return []
+
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _memory_blocks() -> int:
+    return sum(1 for name in _list_dir(facts.MEMORY_SYSFS_DIR) if name.startswith("memory"))
+
+
+def get_section_fingerprint(info_name: str) -> Optional[list]:
+    """
+    Get the fingerprint of a section of the host info.
+
+    Args:
+        info_name(str): e.g cpu
+
+    Returns:
+        list: values which change when the section may have changed, None if the section is unknown
+    """
+    modalias = facts.read_text(os.path.join(facts.DMI_ID_DIR, "modalias"))
+    if info_name == "os":
+        return [modalias, facts.get_kernel_release(), [_mtime(path) for path in facts.OS_RELEASE_PATHS]]
+    if info_name == "cpu":
+        return [modalias, facts.read_text(os.path.join(facts.CPU_SYSFS_DIR, "online"))]
+    if info_name == "memory":
+        return [modalias, _memory_blocks()]
+    if info_name == "disk":
+        return [modalias, _list_dir(facts.BLOCK_SYSFS_DIR)]
+    return None
+
+
+class HostSnapshot:
+    """
+    Sections of the host info saved by the last collection of the current boot.
+    """
+
+    def __init__(self, snapshot_file: Optional[str]):
+        self._snapshot_file = snapshot_file
+        self._boot_id = _read_boot_id()
+        self._sections: Dict[str, dict] = {}
+        self._changed = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self._snapshot_file or not os.path.exists(self._snapshot_file):
+            return
+        try:
+            with open(self._snapshot_file, "r", encoding="utf-8") as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError) as error:
+            LOGGER.debug(f"Failed to load host snapshot: {error}")
+            return
+        if isinstance(snapshot, dict) and snapshot.get("boot_id") == self._boot_id:
+            self._sections = snapshot.get("sections") or {}
+
+    def save(self) -> None:
+        """
+        Write the snapshot to its file if a section changed, it is replaced atomically.
+        """
+        if not self._snapshot_file or not self._changed:
+            return
+        try:
+            snapshot_dir = os.path.dirname(self._snapshot_file)
+            os.makedirs(snapshot_dir, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, prefix=".host_snapshot.")
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump({"boot_id": self._boot_id, "sections": self._sections}, file)
+            os.replace(tmp_path, self._snapshot_file)
+            self._changed = False
+        except OSError as error:
+            LOGGER.debug(f"Failed to save host snapshot: {error}")
+
+    def get(self, info_name: str, fingerprint: Optional[list]) -> Any:
+        """
+        Get the saved value of a section.
+
+        Returns:
+            the value of the section, None if it is not saved or its fingerprint changed
+        """
+        section = self._sections.get(info_name)
+        if fingerprint is None or section is None or section["fingerprint"] != fingerprint:
+            return None
+        return section["value"]
+
+    def set(self, info_name: str, fingerprint: Optional[list], value: Any) -> None:
+        """
+        Save the value of a section, a failed section or a section without fingerprint is dropped.
+        """
+        if fingerprint is None or value is None:
+            if self._sections.pop(info_name, None) is not None:
+                self._changed = True
+            return
+        # json turns tuples into lists, save the section as it will be compared after loading
+        section = json.loads(json.dumps({"fingerprint": fingerprint, "value": value}))
+        if self._sections.get(info_name) != section:
+            self._sections[info_name] = section
+            self._changed = True
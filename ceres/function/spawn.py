@@ -0,0 +1,382 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Process launchers used by the pipeline engine.
+
+Forking the agent copies the page tables of an interpreter which has requests, jsonschema
+and libconf imported, only to exec a small command right after. The SPAWNER option in the
+command section of the configuration chooses how children are started:
+
+    posix_spawn: os.posix_spawn, which uses vfork semantics, it is the default. Children
+        which need a working directory are started with subprocess instead.
+    fork_server: a small helper interpreter, started once without site packages, forks the
+        children for the agent, it receives launch requests and stdio over a unix socket.
+    popen: subprocess.Popen.
+
+Every child leads its own process group, so that the deadline watchdog can kill it with
+its descendants, and is returned as a ChildProcess whose resource usage is kept when it
+is reaped.
+"""
+import array
+import errno
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from ceres.conf import configuration
+from ceres.conf.constant import CommandExitCode
+from ceres.function.log import LOGGER
+
+SPAWNERS = ("posix_spawn", "fork_server", "popen")
+DEFAULT_SPAWNER = "posix_spawn"
+
+
+class ChildProcess:
+    """
+    A started child, stdout and stderr are set by the caller when it reads them.
+
+    Attributes:
+        args: argument list of the child
+        pid: process id, it is also the id of the process group of the child
+        returncode: None until the child is reaped, a negative value is the signal which killed it
+        rusage: resource usage of the child when it is reaped, e.g ru_utime, ru_stime and ru_maxrss
+    """
+
+    def __init__(self, args: List[str], pid: int):
+        self.args = args
+        self.pid = pid
+        self.stdout = None
+        self.stderr = None
+        self.returncode: Optional[int] = None
+        self.rusage = None
+        # a stage may be waited by the thread feeding the next stage and by the one finishing the command
+        self._wait_lock = threading.Lock()
+
+    def wait(self) -> int:
+        """
+        Wait for the child to exit and reap it with os.wait4.
+
+        Returns:
+            int: return code
+        """
+        with self._wait_lock:
+            if self.returncode is None:
+                try:
+                    _, status, self.rusage = os.wait4(self.pid, 0)
+                    self.returncode = os.waitstatus_to_exitcode(status)
+                except ChildProcessError:
+                    # reaped by someone else, the same as subprocess does
+                    self.returncode = 0
+        return self.returncode
+
+
+class PopenProcess(ChildProcess):
+    """
+    A child started by subprocess.Popen and reaped by os.wait4.
+    """
+
+    def __init__(self, args: List[str], popen: subprocess.Popen):
+        super().__init__(args, popen.pid)
+        self._popen = popen
+
+    def wait(self) -> int:
+        returncode = super().wait()
+        # let Popen know that the child is reaped, it would try to reap it again otherwise
+        self._popen.returncode = returncode
+        return returncode
+
+
+def _popen(argv: List[str], stdin: int, stdout: int, stderr: int, **kwargs) -> ChildProcess:
+    popen = subprocess.Popen(argv, stdin=stdin, stdout=stdout, stderr=stderr, start_new_session=True, **kwargs)
+    return PopenProcess(argv, popen)
+
+
+def find_executable(name: str, env) -> str:
+    """
+    Search the executable in the PATH of the child environment, the same as subprocess does.
+    A shim of the record/replay harness is used instead when SHIM_DIR is configured, see
+    ceres.function.replay.
+    """
+    shim_dir = configuration.command.get("SHIM_DIR")
+    if shim_dir:
+        shim_path = os.path.join(shim_dir, os.path.basename(name))
+        if os.access(shim_path, os.X_OK):
+            return shim_path
+    if os.sep in name:
+        return name
+    for directory in os.get_exec_path(env):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
+    raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), name)
+
+
+def _stdio_action(fd: int, target: int) -> tuple:
+    if fd == subprocess.DEVNULL:
+        return os.POSIX_SPAWN_OPEN, target, os.devnull, os.O_RDONLY if target == 0 else os.O_WRONLY, 0
+    return os.POSIX_SPAWN_DUP2, fd, target
+
+
+def _posix_spawn(argv: List[str], stdin: int, stdout: int, stderr: int, env=None) -> ChildProcess:
+    env = os.environ if env is None else env
+    pid = os.posix_spawn(
+        find_executable(argv[0], env),
+        argv,
+        env,
+        file_actions=[_stdio_action(fd, target) for target, fd in enumerate((stdin, stdout, stderr))],
+        setpgroup=0,
+        # python ignores SIGPIPE, children must get it to stop when their reader exits
+        setsigdef=(signal.SIGPIPE, signal.SIGXFSZ),
+    )
+    return ChildProcess(argv, pid)
+
+
+# The fork server runs in an interpreter without site packages, so forking it is cheap. It
+# receives a JSON request with the three stdio descriptors, forks and execs the child and
+# answers with its pid, then reports the exit status and resource usage of every child.
+_FORK_SERVER_SOURCE = r'''
+import array, json, os, select, signal, socket, sys
+
+sock = socket.socket(fileno=int(sys.argv[1]))
+wakeup_read, wakeup_write = os.pipe()
+os.set_blocking(wakeup_write, False)
+signal.set_wakeup_fd(wakeup_write)
+signal.signal(signal.SIGCHLD, lambda *args: None)
+
+
+def reap():
+    while True:
+        try:
+            pid, status, usage = os.wait4(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        sock.send(json.dumps({"exit": pid, "status": status,
+                              "rusage": [usage.ru_utime, usage.ru_stime, usage.ru_maxrss]}).encode())
+
+
+def launch(request, fds):
+    error_read, error_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.setpgid(0, 0)
+            signal.set_wakeup_fd(-1)
+            for signum in (signal.SIGPIPE, signal.SIGXFSZ, signal.SIGCHLD):
+                signal.signal(signum, signal.SIG_DFL)
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+            # the control socket and the received descriptors must not leak into the child, the
+            # error pipe is closed on exec
+            os.closerange(3, error_write)
+            os.closerange(error_write + 1, os.sysconf("SC_OPEN_MAX"))
+            if request["cwd"]:
+                os.chdir(request["cwd"])
+            os.execve(request["executable"], request["argv"], os.environ if request["env"] is None else request["env"])
+        except OSError as error:
+            os.write(error_write, json.dumps([error.errno, error.strerror]).encode())
+        finally:
+            os._exit(127)
+    os.close(error_write)
+    for fd in fds:
+        os.close(fd)
+    with os.fdopen(error_read, "rb") as error_pipe:
+        error = error_pipe.read()
+    if error:
+        os.waitpid(pid, 0)
+        sock.send(json.dumps({"id": request["id"], "error": json.loads(error)}).encode())
+    else:
+        sock.send(json.dumps({"id": request["id"], "pid": pid}).encode())
+
+
+while True:
+    readable = select.select([sock, wakeup_read], [], [])[0]
+    if wakeup_read in readable:
+        os.read(wakeup_read, 512)
+    if sock in readable:
+        fds = array.array("i")
+        message, ancdata, _, _ = sock.recvmsg(1 << 20, socket.CMSG_SPACE(3 * fds.itemsize))
+        if not message:
+            break
+        for _, _, data in ancdata:
+            fds.frombytes(data[:len(data) - len(data) % fds.itemsize])
+        launch(json.loads(message), list(fds))
+    reap()
+'''
+
+
+class ForkServerProcess(ChildProcess):
+    """
+    A child forked by the fork server, it is reaped by the server which reports its exit.
+    """
+
+    def __init__(self, args: List[str], pid: int, server: "ForkServer", sock: socket.socket):
+        super().__init__(args, pid)
+        self._server = server
+        self._sock = sock
+
+    def wait(self) -> int:
+        with self._wait_lock:
+            if self.returncode is None:
+                try:
+                    status, self.rusage = self._server.wait_exit(self.pid, self._sock)
+                    self.returncode = os.waitstatus_to_exitcode(status)
+                except ChildProcessError:
+                    LOGGER.error(f"Exit of {self.args[0]} is lost, the fork server exited.")
+                    self.returncode = CommandExitCode.FAIL
+        return self.returncode
+
+
+class ForkServer:
+    """
+    Client of the fork server, the server is started on the first launch and exits when
+    this process closes its socket.
+    """
+
+    def __init__(self):
+        self._sock: Optional[socket.socket] = None
+        self._server_pid: Optional[int] = None
+        self._send_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._replies: Dict[int, dict] = {}
+        self._exits: Dict[int, Tuple[int, SimpleNamespace]] = {}
+        self._next_id = 0
+
+    def _start(self) -> None:
+        client, server = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            self._server_pid = os.posix_spawn(
+                sys.executable,
+                [sys.executable, "-I", "-S", "-c", _FORK_SERVER_SOURCE, "3"],
+                os.environ,
+                file_actions=[
+                    (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+                    (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+                    (os.POSIX_SPAWN_DUP2, server.fileno(), 3),
+                ],
+            )
+        finally:
+            server.close()
+        self._sock = client
+        threading.Thread(target=self._read_replies, args=(client,), daemon=True).start()
+
+    def _read_replies(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                message = sock.recv(1 << 16)
+            except OSError:
+                message = b""
+            with self._condition:
+                if not message:
+                    LOGGER.warning("Fork server exited.")
+                    self._sock = None
+                    self._condition.notify_all()
+                    return
+                reply = json.loads(message)
+                if "exit" in reply:
+                    utime, stime, maxrss = reply["rusage"]
+                    rusage = SimpleNamespace(ru_utime=utime, ru_stime=stime, ru_maxrss=maxrss)
+                    self._exits[reply["exit"]] = reply["status"], rusage
+                else:
+                    self._replies[reply["id"]] = reply
+                self._condition.notify_all()
+
+    def _wait_reply(self, key, replies: dict, sock: socket.socket):
+        with self._condition:
+            while key not in replies:
+                if self._sock is not sock:
+                    raise ChildProcessError(errno.ECHILD, "fork server exited")
+                self._condition.wait()
+            return replies.pop(key)
+
+    def spawn(self, argv: List[str], stdin: int, stdout: int, stderr: int, env=None, cwd=None) -> ChildProcess:
+        """
+        Launch a child through the fork server.
+        """
+        opened = []
+        try:
+            fds = []
+            for target, fd in enumerate((stdin, stdout, stderr)):
+                if fd == subprocess.DEVNULL:
+                    fd = os.open(os.devnull, os.O_RDONLY if target == 0 else os.O_WRONLY)
+                    opened.append(fd)
+                fds.append(fd)
+            with self._send_lock:
+                if self._sock is None:
+                    self._start()
+                sock = self._sock
+                self._next_id += 1
+                request_id = self._next_id
+                request = {
+                    "id": request_id,
+                    "executable": find_executable(argv[0], os.environ if env is None else env),
+                    "argv": argv,
+                    "env": None if env is None else dict(env),
+                    "cwd": cwd,
+                }
+                sock.sendmsg(
+                    [json.dumps(request).encode()], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))]
+                )
+        finally:
+            for fd in opened:
+                os.close(fd)
+
+        reply = self._wait_reply(request_id, self._replies, sock)
+        if "error" in reply:
+            error_number, strerror = reply["error"]
+            raise OSError(error_number, strerror, argv[0])
+        return ForkServerProcess(argv, reply["pid"], self, sock)
+
+    def wait_exit(self, pid: int, sock: socket.socket) -> Tuple[int, SimpleNamespace]:
+        """
+        Wait for the server which launched a child to report its exit.
+
+        Returns:
+            int: wait status
+            SimpleNamespace: resource usage
+        """
+        return self._wait_reply(pid, self._exits, sock)
+
+
+FORK_SERVER = ForkServer()
+
+
+def spawn_process(argv: List[str], stdin: int, stdout: int, stderr: int, **kwargs) -> ChildProcess:
+    """
+    Start a child in its own process group with the configured spawner.
+
+    Args:
+        argv(list): argument list of the child
+        stdin(int): file descriptor, or subprocess.DEVNULL
+        stdout(int): file descriptor, or subprocess.DEVNULL
+        stderr(int): file descriptor, or subprocess.DEVNULL
+        **kwargs: keyword arguments used to create Popen object, env and cwd are supported by
+            every spawner, other options are only supported by subprocess
+
+    Returns:
+        ChildProcess
+    """
+    spawner = configuration.command.get("SPAWNER", DEFAULT_SPAWNER)
+    options = set(kwargs) - {"env", "cwd"}
+    if spawner == "fork_server" and not options and sys.executable:
+        return FORK_SERVER.spawn(argv, stdin, stdout, stderr, kwargs.get("env"), kwargs.get("cwd"))
+    if spawner == "posix_spawn" and not options and kwargs.get("cwd") is None and hasattr(os, "posix_spawn"):
+        return _posix_spawn(argv, stdin, stdout, stderr, kwargs.get("env"))
+    return _popen([find_executable(argv[0], kwargs.get("env"))] + argv[1:], stdin, stdout, stderr, **kwargs)
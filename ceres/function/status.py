@@ -27,6 +27,7 @@ NO_COMMAND = "No.Command"
 NOT_PATCH = "Not.Patch"
 
 COMMAND_EXEC_ERROR = "Command.Error"
+COMMAND_TIMEOUT = "Command.Timeout"
 
 
 class StatusCode:
@@ -49,6 +50,7 @@ class StatusCode:
         NO_COMMAND: {"msg": "command not found"},
         NOT_PATCH: {"msg": "no valid hot patch is matched"},
         COMMAND_EXEC_ERROR: {"msg": "the input command is incorrect"},
+        COMMAND_TIMEOUT: {"msg": "the command did not finish before its deadline"},
     }
 
     @classmethod
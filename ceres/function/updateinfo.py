@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Reader of the updateinfo metadata of a repo and matching of installed packages with it.
+
+The updateinfo file of the repo cached by dnf is parsed once per process, the fixed versions
+of the security advisories are then compared with the packages installed in any number of
+roots without running dnf again:
+
+    <update type="security">
+        <references><reference id="CVE-2022-3080" type="cve"/></references>
+        <pkglist><collection>
+            <package name="bind-libs" epoch="32" version="9.16.23" release="11.oe2203" arch="aarch64"/>
+        </collection></pkglist>
+    </update>
+"""
+import bz2
+import glob
+import gzip
+import lzma
+import os
+import xml.etree.ElementTree as ElementTree
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ceres.conf.constant import CommandExitCode
+from ceres.function.evr import compare_evr, compare_evr_matrix
+from ceres.function.log import LOGGER
+from ceres.function.rpmdb import RpmPackage
+from ceres.function.util import execute_shell_command
+
+DNF_CACHE_DIR = "/var/cache/dnf"
+_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open, ".xml": open}
+
+# (name, arch) -> [((epoch, version, release), (cve id, ...))]
+Advisories = Dict[Tuple[str, str], List[Tuple[Tuple[int, str, str], Tuple[str, ...]]]]
+
+
+def find_updateinfo(repo_id: str) -> Optional[str]:
+    """
+    Find the updateinfo file of a repo in the cache of dnf, the latest one if there are several.
+
+    Returns:
+        str: e.g /var/cache/dnf/aops-update-f9a1b7c2a0d35b13/repodata/<checksum>-updateinfo.xml.gz
+    """
+    pattern = os.path.join(DNF_CACHE_DIR, f"{glob.escape(repo_id)}-*", "repodata", "*updateinfo.xml*")
+    paths = [path for path in glob.glob(pattern) if os.path.splitext(path)[1] in _OPENERS]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+@lru_cache(maxsize=4)
+def _parse_updateinfo(path: str, mtime: float) -> Advisories:
+    advisories = {}
+    with _OPENERS[os.path.splitext(path)[1]](path, "rb") as file:
+        for _, update in ElementTree.iterparse(file):
+            if update.tag != "update":
+                continue
+            cve_ids = tuple(
+                reference.get("id")
+                for reference in update.iter("reference")
+                if reference.get("type") == "cve" and reference.get("id")
+            )
+            for package in update.iter("package"):
+                if not cve_ids or package.get("arch") == "src":
+                    continue
+                evr = (int(package.get("epoch") or 0), package.get("version", ""), package.get("release", ""))
+                advisories.setdefault((package.get("name"), package.get("arch")), []).append((evr, cve_ids))
+            update.clear()
+    return advisories
+
+
+def load_advisories(repo_id: str) -> Optional[Advisories]:
+    """
+    Get the fixed versions of the CVEs of a repo, the metadata of the repo is downloaded by dnf
+    if it is not cached yet.
+
+    Returns:
+        dict: (name, arch) -> [((epoch, version, release), (cve id, ...))], None if the metadata of
+            the repo can not be read
+    """
+    path = find_updateinfo(repo_id)
+    if path is None:
+        code, _, stderr = execute_shell_command(f"dnf makecache --repo {repo_id}")
+        if code != CommandExitCode.SUCCEED:
+            LOGGER.error(f"Failed to download the metadata of repo {repo_id}: {stderr}")
+            return None
+        path = find_updateinfo(repo_id)
+    if path is None:
+        LOGGER.error(f"Failed to find the updateinfo of repo {repo_id}")
+        return None
+    try:
+        return _parse_updateinfo(path, os.path.getmtime(path))
+    except (OSError, EOFError, lzma.LZMAError, ElementTree.ParseError) as error:
+        LOGGER.error(f"Failed to parse the updateinfo of repo {repo_id}: {error}")
+        return None
+
+
+def match_advisories(packages: Iterable[RpmPackage], advisories: Advisories) -> Dict[str, List[str]]:
+    """
+    Find the CVEs fixed and not fixed yet by the installed packages. As dnf does, only the newest
+    installed version of a package is compared, and a CVE is fixed once every package of it is.
+
+    Returns:
+        dict: e.g {"unfixed_cves": ["CVE-2022-3080"], "fixed_cves": ["CVE-2021-32675"]}
+    """
+    newest = {}
+    for package in packages:
+        key = (package.name, package.arch)
+        evr = (package.epoch or 0, package.version, package.release)
+        if key in advisories and (key not in newest or compare_evr(evr, newest[key]) > 0):
+            newest[key] = evr
+    unfixed, fixed = set(), set()
+    for key, evr in newest.items():
+        fixed_evrs = advisories[key]
+        results = compare_evr_matrix([evr], [fixed_evr for fixed_evr, _ in fixed_evrs])[0]
+        for (_, cve_ids), result in zip(fixed_evrs, results):
+            (unfixed if result < 0 else fixed).update(cve_ids)
+    return {"unfixed_cves": sorted(unfixed), "fixed_cves": sorted(fixed - unfixed)}
@@ -13,15 +13,17 @@
 import configparser
 import json
 import os
-import shlex
-import subprocess
-from typing import Any, Tuple, NoReturn
+from typing import Any, List, Optional, Tuple, NoReturn
 
 from libconf import load, ConfigParseError, AttrDict
 from jsonschema import validate, ValidationError
 
-from ceres.conf.constant import INFORMATION_ABOUT_RPM_SERVICE, CommandExitCode
+from ceres.conf.constant import BASE_SERVICE_PATH, INFORMATION_ABOUT_RPM_SERVICE, CommandExitCode
+from ceres.function.aio import get_command_semaphore, run_pipeline_async
+from ceres.function.cache import CachePolicy
+from ceres.function.deadline import command_timeout
 from ceres.function.log import LOGGER
+from ceres.function.pipeline import CommandStream, run_batch, run_pipeline, stream_pipeline
 from ceres.function.status import PARAM_ERROR
 
 
@@ -63,58 +65,122 @@ def validate_data(data: Any, schema: dict) -> bool:
         return False
 
 
-def execute_shell_command(command: str, **kwargs) -> Tuple[int, str, str]:
+def execute_shell_command(
+    command: str, cache: Optional[CachePolicy] = None, timeout: Optional[float] = None, **kwargs
+) -> Tuple[int, str, str]:
     """
-    execute shell commands
+    execute shell commands, simple filter stages such as grep, awk '{print$N}', wc -l and
+    "cat FILE" are run in-process instead of forking a new process.
 
     Args:
         command(str): shell command which needs to execute
+        cache(CachePolicy): opt in to cache the output of the first stage of the command, it
+            should only be used for read-only commands
+        timeout(float): seconds the command may run, the configured default timeout if None,
+            no limit if NO_TIMEOUT, it is capped by the budget of the current operation deadline
         **kwargs: keyword arguments, it is used to create Popen object.supported options: env, cwd, bufsize, group and
         so on. you can see more options information in annotation of Popen obejct.
 
     Returns:
         Tuple[int, str, str]
         a tuple containing three elements (return code, standard output, standard error).
+        the return code is CommandExitCode.TIMEOUT and the output is partial if the command timed out.
 
     Example usage:
     >>> return_code, stdout, stderr = execute_shell_command("ls -al|wc -l", **{"env": {"LANG": "en_US.utf-8"}})
     >>> print(return_code, stdout, stderr)
     0, 42, ""
     """
-    commands = command.split('|')
-    process = None
-    stdout_data = ""
-    stderr_data = ""
+    try:
+        return run_pipeline(command, cache, command_timeout(timeout), **kwargs)
+    except Exception as error:
+        LOGGER.error(error)
+        # keep the output read before the error, callers may log or parse it
+        return CommandExitCode.FAIL, getattr(error, "stdout", "").strip(), str(error)
 
+
+def execute_shell_commands(
+    commands: List[str], cache: Optional[CachePolicy] = None, timeout: Optional[float] = None, **kwargs
+) -> List[Tuple[int, str, str]]:
+    """
+    execute several independent read-only shell commands with one helper process instead of
+    starting one process per command, e.g the commands needed by one collector.
+
+    Args:
+        commands(list): shell commands which need to execute, they must not depend on each other
+        cache(CachePolicy): opt in to cache the output of the first stage of every command
+        timeout(float): seconds the whole batch may run, see execute_shell_command
+        **kwargs: keyword arguments shared by all commands, e.g env and cwd
+
+    Returns:
+        list: (return code, standard output, standard error) of every command, in the same order
+
+    Example usage:
+    >>> (_, lsmem_info, _), (_, memory_data, _) = execute_shell_commands(["lsmem", "dmidecode -t memory"])
+    """
     try:
-        for index, cmd in enumerate(commands):
-            cmd_list = shlex.split(cmd)
-            if index == 0:
-                process = subprocess.Popen(
-                    cmd_list,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    stdin=subprocess.PIPE,
-                    encoding='utf-8',
-                    **kwargs,
-                )
-            else:
-                process = subprocess.Popen(
-                    cmd_list,
-                    stdin=process.stdout,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    encoding='utf-8',
-                    **kwargs,
-                )
-        stdout, stderr = process.communicate()
-        stderr_data += stderr
-        stdout_data += stdout
-        return process.returncode, stdout_data.strip(), stderr_data.strip()
+        return run_batch(commands, cache, command_timeout(timeout), **kwargs)
+    except Exception as error:
+        LOGGER.error(error)
+        stdouts = getattr(error, "stdouts", None) or [""] * len(commands)
+        return [(CommandExitCode.FAIL, stdout.strip(), str(error)) for stdout in stdouts]
+
+
+def stream_shell_command(command: str, timeout: Optional[float] = None, **kwargs) -> CommandStream:
+    """
+    execute shell commands and read their output line by line while it is produced, it should
+    be used instead of execute_shell_command for commands with large output.
 
+    Args:
+        command(str): shell command which needs to execute
+        timeout(float): seconds the command may run, see execute_shell_command
+        **kwargs: keyword arguments, it is used to create Popen object
+
+    Returns:
+        CommandStream: iterator of stdout lines, the return code and standard error are set
+        when it is exhausted or closed
+
+    Example usage:
+    >>> with stream_shell_command("dnf updateinfo list cves --installed") as stream:
+    ...     cves = [line.split()[0] for line in stream if line.startswith("CVE-")]
+    >>> print(stream.returncode, cves)
+    0, ["CVE-2022-3080"]
+    """
+    try:
+        return stream_pipeline(command, command_timeout(timeout), **kwargs)
     except Exception as error:
         LOGGER.error(error)
-        return CommandExitCode.FAIL, stdout_data, str(error)
+        return CommandStream.from_output(CommandExitCode.FAIL, "", str(error))
+
+
+async def async_execute_shell_command(
+    command: str, cache: Optional[CachePolicy] = None, timeout: Optional[float] = None, **kwargs
+) -> Tuple[int, str, str]:
+    """
+    execute shell commands with asyncio, it is the async sibling of execute_shell_command.
+    at most MAX_CONCURRENCY commands are running at the same time on one event loop.
+
+    Args:
+        command(str): shell command which needs to execute
+        cache(CachePolicy): opt in to cache the output of the first stage of the command
+        timeout(float): seconds the command may run once it has started, see execute_shell_command
+        **kwargs: keyword arguments, it is used to create asyncio subprocess.supported options: env, cwd and so on.
+
+    Returns:
+        Tuple[int, str, str]
+        a tuple containing three elements (return code, standard output, standard error).
+
+    Example usage:
+    >>> return_code, stdout, stderr = asyncio.run(async_execute_shell_command("ls -al|wc -l"))
+    >>> print(return_code, stdout, stderr)
+    0, 42, ""
+    """
+    async with get_command_semaphore():
+        try:
+            return await run_pipeline_async(command, cache, command_timeout(timeout), **kwargs)
+        except Exception as error:
+            LOGGER.error(error)
+            return CommandExitCode.FAIL, "", str(error)
 
 
 def load_gopher_config(gopher_config_path: str) -> AttrDict:
@@ -139,6 +205,24 @@ def load_gopher_config(gopher_config_path: str) -> AttrDict:
     return cfg
 
 
+def service_status_cache_policy(service_name: str) -> CachePolicy:
+    """
+    get cache policy for "systemctl status", the result is shared by the status, pid and
+    install queries of one service and invalidated when its unit file changes
+
+    Args:
+        service_name(str)
+
+    Returns:
+        CachePolicy
+    """
+    return CachePolicy(
+        ttl=10,
+        depends_on=(os.path.join(BASE_SERVICE_PATH, f"{service_name}.service"),),
+        success_codes=(CommandExitCode.SUCCEED, 3, 4),
+    )
+
+
 def plugin_status_judge(plugin_name: str) -> str:
     """
     judge if the plugin is installed
@@ -153,7 +237,32 @@ def plugin_status_judge(plugin_name: str) -> str:
     if service_name is None:
         LOGGER.warning(f"Fail to get service name about {plugin_name}")
         return ""
-    return_code, stdout, _ = execute_shell_command(f"systemctl status {service_name}|grep Active")
+    return_code, stdout, _ = execute_shell_command(
+        f"systemctl status {service_name}|grep Active", cache=service_status_cache_policy(service_name)
+    )
+
+    if return_code == CommandExitCode.SUCCEED:
+        return stdout
+    return ""
+
+
+async def async_plugin_status_judge(plugin_name: str) -> str:
+    """
+    judge if the plugin is installed, it is the async sibling of plugin_status_judge
+
+    Args:
+        plugin_name(str)
+
+    Returns:
+        str: plugin running status
+    """
+    service_name = INFORMATION_ABOUT_RPM_SERVICE.get(plugin_name, {}).get('service_name')
+    if service_name is None:
+        LOGGER.warning(f"Fail to get service name about {plugin_name}")
+        return ""
+    return_code, stdout, _ = await async_execute_shell_command(
+        f"systemctl status {service_name}|grep Active", cache=service_status_cache_policy(service_name)
+    )
 
     if return_code == CommandExitCode.SUCCEED:
         return stdout
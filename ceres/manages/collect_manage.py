@@ -10,15 +10,26 @@
 # PURPOSE.
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
+import asyncio
 import grp
 import json
 import os
 import pwd
 import re
-from socket import AF_INET, SOCK_DGRAM, socket
-from typing import Any, Dict, List, Union
-
+import stat
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from ceres.conf import configuration
 from ceres.conf.constant import (
+    COLLECT_FILE_BYTE_BUDGET,
+    COLLECT_FILE_MAX_SIZE,
+    COLLECT_FILE_READ_SIZE,
     HOST_COLLECT_INFO_SUPPORT,
     INFORMATION_ABOUT_RPM_SERVICE,
     INSTALLABLE_PLUGIN,
@@ -26,23 +37,123 @@ from ceres.conf.constant import (
     SCANNED_APPLICATION,
     CommandExitCode,
 )
+from ceres.function.cache import CachePolicy
+from ceres.function.facts import (
+    DmiRecord,
+    async_get_dmi_facts,
+    async_get_dmi_table,
+    format_size,
+    get_cpu_topology,
+    get_block_devices,
+    get_dmi_facts,
+    get_dmi_table,
+    get_kernel_release,
+    get_online_memory,
+    read_cpuinfo,
+    read_os_release,
+    report_source_failure,
+    track_source_failures,
+)
 from ceres.function.log import LOGGER
-from ceres.function.util import execute_shell_command, plugin_status_judge
+from ceres.function.netinfo import get_interface_addresses, get_source_address
+from ceres.function.perf_facts import (
+    get_cpufreq_policies,
+    get_hugepage_pools,
+    get_io_schedulers,
+    get_nic_irq_affinity,
+    get_numa_nodes,
+    get_transparent_hugepage,
+)
+from ceres.function.package_index import PackageIndex
+from ceres.function.rpmdb import get_installed_rpm_packages, get_rpmdb_fingerprint
+from ceres.function.snapshot import HostSnapshot, get_section_fingerprint
+from ceres.function.util import (
+    async_execute_shell_command,
+    async_plugin_status_judge,
+    execute_shell_command,
+    plugin_status_judge,
+)
 from ceres.manages import plugin_manage
 from ceres.manages.resource_manage import Resource
 
+# hardware facts only change across reboots, disks may be hot-plugged
+HARDWARE_INFO_CACHE = CachePolicy(ttl=3600, per_boot=True)
+DISK_INFO_CACHE = CachePolicy(ttl=300, per_boot=True)
+
+
+@lru_cache(maxsize=1024)
+def _get_user_name(uid: int) -> str:
+    try:
+        return pwd.getpwuid(uid)[0]
+    except KeyError:
+        return str(uid)
+
+
+@lru_cache(maxsize=1024)
+def _get_group_name(gid: int) -> str:
+    try:
+        return grp.getgrgid(gid)[0]
+    except KeyError:
+        return str(gid)
+
+
+class ByteBudget:
+    """
+    Bytes which may still be read by a collection, shared by the threads reading the files
+    """
+
+    def __init__(self, size: int):
+        self._left = size
+        self._lock = threading.Lock()
+
+    def reserve(self, size: int) -> bool:
+        """
+        take some bytes from the budget
+
+        Returns:
+            bool: False if there are not enough bytes left, nothing is taken then
+        """
+        with self._lock:
+            if size > self._left:
+                return False
+            self._left -= size
+            return True
+
+    def release(self, size: int) -> None:
+        """
+        give back bytes taken from the budget which were not kept
+        """
+        with self._lock:
+            self._left += size
+
 
 class Collect:
     """
     Provides functions to collect information.
+
+    Attributes:
+        section_times: seconds spent collecting each section of the last host info,
+            e.g {"cpu": 0.002, "disk": 0.31}
+        section_failures: sources which could not be read by each degraded section of the last
+            host info, e.g {"memory": ["dmidecode"]}
     """
 
-    def get_host_info(self, info_type: List[str]) -> dict:
+    def __init__(self):
+        self.section_times: Dict[str, float] = {}
+        self.section_failures: Dict[str, List[str]] = {}
+
+    def get_host_info(self, info_type: List[str], refresh: bool = False) -> dict:
         """
-        get basic info about machine
+        get basic info about machine, the sections are collected concurrently by a pool of at most
+        MAX_CONCURRENCY threads, a section which fails is None and does not affect the others.
+        A section whose fingerprint is unchanged since the last collection of the current boot is
+        read from the host snapshot instead, a section collected while one of its sources could
+        not be read is returned but never saved to the snapshot.
 
         Args:
-            info_type(list): e.g [memory, os, cpu, disk]
+            info_type(list): e.g [memory, os, cpu, disk], default: HOST_COLLECT_INFO_SUPPORT, perf is only
+                collected when it is requested
+            refresh(bool): collect every section again whatever the snapshot
 
         Returns:
             int: status code
@@ -63,7 +174,10 @@ class Collect:
                                 "l1d_cache": string,
                                 "l1i_cache": string,
                                 "l2_cache": string,
-                                "l3_cache": string
+                                "l3_cache": string,
+                                "sockets": string,
+                                "cores_per_socket": string,
+                                "threads_per_core": string
                                 },
                             'memory':{
                             "size": "xx GB",
@@ -82,39 +196,121 @@ class Collect:
                                 {
                                   "capacity": xx GB,
                                   "model": "string",
+                                  "vendor": "string",
+                                  "name": "string",
+                                  "rotational": bool,
+                                  "nvme": bool,
                                 }
-                            ]
+                            ],
+                            'perf': the same as _get_perf_info
                         }
                 }
         """
-        host_info = {}
         if not info_type:
             info_type = HOST_COLLECT_INFO_SUPPORT
+        self.section_times = {}
+        self.section_failures = {}
+        snapshot = HostSnapshot(configuration.command.get("SNAPSHOT_FILE"))
+        fingerprints = {info_name: get_section_fingerprint(info_name) for info_name in info_type}
+        host_info = {}
         for info_name in info_type:
-            func_name = getattr(self, f"_get_{info_name}_info")
-            host_info[info_name] = func_name()
+            value = None if refresh else snapshot.get(info_name, fingerprints[info_name])
+            if value is not None:
+                host_info[info_name] = value
+        stale_sections = [info_name for info_name in info_type if info_name not in host_info]
+        if stale_sections:
+            max_workers = min(len(stale_sections), configuration.command.get("MAX_CONCURRENCY"))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collect") as pool:
+                futures = [pool.submit(self._collect_section, info_name) for info_name in stale_sections]
+            for info_name, future in zip(stale_sections, futures):
+                host_info[info_name] = future.result()
+                degraded = info_name in self.section_failures
+                snapshot.set(info_name, fingerprints[info_name], None if degraded else host_info[info_name])
+            snapshot.save()
+        # the sections keep the requested order whatever order they finish in
+        return {info_name: host_info[info_name] for info_name in info_type}
+
+    def _collect_section(self, info_name: str) -> Any:
+        """
+        collect one section of the host info and measure it
 
+        Args:
+            info_name(str): e.g cpu
+
+        Returns:
+            the result of _get_{info_name}_info, None if it raised an error
+        """
+        start = time.monotonic()
+        try:
+            with track_source_failures() as failures:
+                return getattr(self, f"_get_{info_name}_info")()
+        except Exception as error:
+            LOGGER.error(f"Failed to collect {info_name} info: {error}")
+            failures.append(type(error).__name__)
+            return None
+        finally:
+            if failures:
+                self.section_failures[info_name] = failures
+            self.section_times[info_name] = time.monotonic() - start
+            LOGGER.debug(f"Collected {info_name} info in {self.section_times[info_name]:.3f}s")
+
+    async def async_get_host_info(self, info_type: List[str]) -> dict:
+        """
+        get basic info about machine, the commands of all sections are executed concurrently, a
+        section which fails is None and does not affect the others
+
+        Args:
+            info_type(list): e.g [memory, os, cpu, disk]
+
+        Returns:
+            dict: the same as get_host_info
+        """
+        if not info_type:
+            info_type = HOST_COLLECT_INFO_SUPPORT
+        loop = asyncio.get_running_loop()
+        tasks = []
+        for info_name in info_type:
+            async_func = getattr(self, f"_async_get_{info_name}_info", None)
+            if async_func is not None:
+                tasks.append(async_func())
+            else:
+                tasks.append(loop.run_in_executor(None, getattr(self, f"_get_{info_name}_info")))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        host_info = {}
+        for info_name, result in zip(info_type, results):
+            if isinstance(result, Exception):
+                LOGGER.error(f"Failed to collect {info_name} info: {result}")
+                result = None
+            host_info[info_name] = result
         return host_info
 
     @staticmethod
     def get_os_version() -> str:
         """
-            get system name and its version
+            get system name and its version from /etc/os-release
 
         Returns:
-            str: e.g openEuler 21.09
+            str: e.g openEuler-21.09
         """
-        _, stdout, _ = execute_shell_command("cat /etc/os-release")
-        res = re.search('(?=PRETTY_NAME=).+', stdout)
-
-        if res:
-            return res.group()[12:].strip('"').replace(' ', '-')
+        pretty_name = read_os_release().get("PRETTY_NAME")
+        if pretty_name:
+            return pretty_name.replace(' ', '-')
         LOGGER.warning('Failed to get os version info, ' 'please check file /etc/os-release and try it again')
         return ''
 
+    @staticmethod
+    async def async_get_os_version() -> str:
+        """
+            get system name and its version, reading /etc/os-release never blocks for long
+
+        Returns:
+            str: e.g openEuler-21.09
+        """
+        return Collect.get_os_version()
+
     def _get_os_info(self) -> Dict[str, str]:
         """
-            get os info
+            get os info, dmidecode is only executed if the bios version is missing from sysfs
 
         Returns:
                 {
@@ -130,42 +326,61 @@ class Collect:
         }
         return res
 
+    async def _async_get_os_info(self) -> Dict[str, str]:
+        """
+            get os info, dmidecode is only executed if the bios version is missing from sysfs
+
+        Returns:
+            dict: the same as _get_os_info
+        """
+        dmi_facts = await async_get_dmi_facts(["bios_version"])
+        return {
+            'os_version': self.get_os_version(),
+            'bios_version': self._check_bios_version(dmi_facts["bios_version"]),
+            'kernel': self.__get_kernel_version(),
+        }
+
     @staticmethod
     def __get_bios_version() -> str:
         """
-            get bios version number
+            get bios version number from /sys/class/dmi/id, or the DMI table of dmidecode
 
         Returns:
             str
         """
-        _, stdout, _ = execute_shell_command("dmidecode -t bios")
+        return Collect._check_bios_version(get_dmi_facts(["bios_version"])["bios_version"])
 
-        res = re.search('(?=Version:).+', stdout)
-        if res:
-            return res.group()[8:].strip()
-        LOGGER.warning('Failed to get bios version, please check dmidecode and try it again')
-        return ''
+    @staticmethod
+    def _check_bios_version(bios_version: str) -> str:
+        if not bios_version:
+            LOGGER.warning('Failed to get bios version, please check dmidecode and try it again')
+        return bios_version
 
     @staticmethod
     def __get_kernel_version() -> str:
         """
-            get kernel version number
+            get kernel version number of the running kernel
 
         Returns:
-            str
+            str: e.g 5.10.0-60.18.0.50
         """
-        _, stdout, _ = execute_shell_command("dmidecode -t bios")
+        return Collect._parse_kernel_version(get_kernel_release())
 
-        res = re.search(r'[\d\.]+-[\d\.]+[\d]', stdout)
+    @staticmethod
+    def _parse_kernel_version(release: str) -> str:
+        """
+            parse kernel version number from the kernel release, e.g 5.10.0-60.18.0.50.oe2203.x86_64
+        """
+        res = re.search(r'[\d\.]+-[\d\.]+[\d]', release)
         if res:
             return res.group()
-        LOGGER.warning('Failed to get kernel version, please check dmidecode and try it again')
+        LOGGER.warning('Failed to get kernel version, please check the kernel release and try it again')
         return ''
 
     @staticmethod
     def _get_cpu_info() -> Dict[str, str]:
         """
-        get cpu info by command lscpu
+        get cpu info from /proc/cpuinfo and sysfs, lscpu is only executed if sysfs can not be read
 
         Returns:
             dict: e.g
@@ -177,15 +392,69 @@ class Collect:
                     "l1d_cache": string,
                     "l1i_cache": string,
                     "l2_cache": string,
-                    "l3_cache": string
+                    "l3_cache": string,
+                    "sockets": string,
+                    "cores_per_socket": string,
+                    "threads_per_core": string
                 }
         """
-        _, stdout, _ = execute_shell_command("lscpu", **{"env": {"LANG": "en_US.utf-8"}})
+        topology = get_cpu_topology()
+        if topology is not None:
+            return Collect._build_cpu_info(read_cpuinfo(), topology)
+        _, stdout, _ = execute_shell_command("lscpu", cache=HARDWARE_INFO_CACHE, **{"env": {"LANG": "en_US.utf-8"}})
+        return Collect._parse_cpu_info(stdout)
 
+    @staticmethod
+    async def _async_get_cpu_info() -> Dict[str, str]:
+        """
+        get cpu info from /proc/cpuinfo and sysfs, lscpu is only executed if sysfs can not be read
+
+        Returns:
+            dict: the same as _get_cpu_info
+        """
+        topology = get_cpu_topology()
+        if topology is not None:
+            return Collect._build_cpu_info(read_cpuinfo(), topology)
+        _, stdout, _ = await async_execute_shell_command(
+            "lscpu", cache=HARDWARE_INFO_CACHE, **{"env": {"LANG": "en_US.utf-8"}}
+        )
+        return Collect._parse_cpu_info(stdout)
+
+    @staticmethod
+    def _build_cpu_info(cpuinfo: Dict[str, str], topology: dict) -> Dict[str, str]:
+        """
+        build cpu info from the fields of /proc/cpuinfo and the topology of sysfs, the values
+        are formatted the way lscpu prints them
+
+        Args:
+            cpuinfo(dict): fields of the first processor of /proc/cpuinfo
+            topology(dict): cpus, sockets, cores_per_socket, threads_per_core and caches, see get_cpu_topology
+        """
+        caches = topology["caches"]
+        return {
+            "architecture": os.uname().machine,
+            "core_count": str(topology["cpus"]),
+            "model_name": cpuinfo.get("model name"),
+            "vendor_id": cpuinfo.get("vendor_id"),
+            "l1d_cache": format_size(caches["L1d"]) if "L1d" in caches else None,
+            "l1i_cache": format_size(caches["L1i"]) if "L1i" in caches else None,
+            "l2_cache": format_size(caches["L2"]) if "L2" in caches else None,
+            "l3_cache": format_size(caches["L3"]) if "L3" in caches else None,
+            "sockets": str(topology["sockets"]),
+            "cores_per_socket": str(topology["cores_per_socket"]),
+            "threads_per_core": str(topology["threads_per_core"]),
+        }
+
+    @staticmethod
+    def _parse_cpu_info(stdout: str) -> Dict[str, str]:
+        """
+        parse cpu info from the output of lscpu
+        """
         info_list = re.findall('.+:.+', stdout)
 
         if not info_list:
             LOGGER.warning('Failed to read cpu info by lscpu, please check it and try again.')
+            report_source_failure("lscpu")
 
         cpu_info = {}
         for info in info_list:
@@ -201,6 +470,9 @@ class Collect:
             "l1i_cache": cpu_info.get('L1i cache'),
             "l2_cache": cpu_info.get('L2 cache'),
             "l3_cache": cpu_info.get('L3 cache'),
+            "sockets": cpu_info.get('Socket(s)'),
+            "cores_per_socket": cpu_info.get('Core(s) per socket'),
+            "threads_per_core": cpu_info.get('Thread(s) per core'),
         }
 
         return res
@@ -208,22 +480,22 @@ class Collect:
     @staticmethod
     def __get_total_online_memory() -> str:
         """
-        get memory size by lsmem
+        get the size of the online memory from sysfs, it is formatted the way lsmem prints it
 
         Returns:
-            str: memory size
+            str: memory size, e.g 48G
         """
-        _, stdout, _ = execute_shell_command("lsmem")
-
-        res = re.search("(?=Total online memory:).+", stdout)
-        if res:
-            return res.group()[20:].strip()
-        LOGGER.warning('Failed to get total online memory, please check lsmem and try it again')
+        size = get_online_memory()
+        if size is not None:
+            return format_size(size, short=True)
+        LOGGER.warning('Failed to get total online memory, please check /sys/devices/system/memory and try it again')
+        report_source_failure("online memory")
         return ''
 
     def _get_memory_info(self) -> Dict[str, Union[int, List[Dict[str, Any]]]]:
         """
-        get memory detail info and memory stick count
+        get memory detail info and memory stick count, the memory devices are read from the DMI
+        table shared with the other collectors, no process is started when sysfs is readable
 
         Returns:
             dict: e.g
@@ -242,39 +514,43 @@ class Collect:
                 }
 
         """
-        res = {'size': self.__get_total_online_memory() or None, "total": None, "info": []}
-
-        code, memory_data, _ = execute_shell_command("dmidecode -t memory")
-
-        # dmidecode -t memory
-        # e.g
-        # dmidecode 3.2
-        # Getting SMBIOS data from sysfs.
-        # SMBIOS 2.8 present.
-        #
-        # Physical Memory Array
-        #       Location: Other
-        #       Use: System Memory
-        #       ...
-        # Memory Device
-        #       Array Handle
-        #       ...
-        # Memory Device
-        #       Array Handle
-        #       ...
-        if code != CommandExitCode.SUCCEED or len(memory_data.split('Memory Device')) == 1:
+        return self._parse_memory_info(self.__get_total_online_memory(), get_dmi_table().find(17))
+
+    async def _async_get_memory_info(self) -> Dict[str, Union[int, List[Dict[str, Any]]]]:
+        """
+        get memory detail info and memory stick count, dmidecode is executed without blocking
+        the event loop when the DMI table of sysfs is not readable
+
+        Returns:
+            dict: the same as _get_memory_info
+        """
+        dmi_table = await async_get_dmi_table()
+        return self._parse_memory_info(self.__get_total_online_memory(), dmi_table.find(17))
+
+    @staticmethod
+    def _parse_memory_info(size: str, memory_devices: List[DmiRecord]) -> Dict[str, Union[int, List[Dict[str, Any]]]]:
+        """
+        parse memory detail info from the memory devices of the DMI table
+
+        Args:
+            size(str): total online memory
+            memory_devices(list): structures of DMI type 17, e.g
+                Handle 0x0014, DMI type 17, 84 bytes
+                Memory Device
+                        Size: 32 GB
+                        Type: DDR4
+                        Speed: 2933 MT/s
+                        Manufacturer: Samsung
+        """
+        res = {'size': size or None, "total": None, "info": []}
+
+        if not memory_devices:
             LOGGER.warning('Failed to read memory info by dmidecode')
             return res
 
         info = []
-        for module in memory_data.split('Memory Device'):
-            module_info_list = re.findall('.+:.+', module)
-
-            module_info_dict = {}
-            for module_info in module_info_list:
-                part_info = module_info.split(':')
-                module_info_dict[part_info[0].strip()] = part_info[1].strip()
-
+        for device in memory_devices:
+            module_info_dict = device.fields
             if module_info_dict.get('Size') is None or module_info_dict.get('Size') == 'No Module Installed':
                 continue
 
@@ -294,7 +570,7 @@ class Collect:
     @staticmethod
     def _get_disk_info() -> List[dict]:
         """
-            get disk capacity and model
+            get disk capacity and model from /sys/block, lshw is only executed if sysfs can not be read
 
         Returns:
             list: e.g
@@ -302,12 +578,55 @@ class Collect:
                     {
                       "capacity": string,
                       "model": "string",
+                      "vendor": "string",
+                      "name": "sda",
+                      "rotational": bool,
+                      "nvme": bool
                     }
                 ]
         """
-        code, stdout, _ = execute_shell_command("lshw -json -c disk")
+        block_devices = get_block_devices()
+        if block_devices is not None:
+            return [Collect._build_disk_info(device) for device in block_devices]
+        code, stdout, _ = execute_shell_command("lshw -json -c disk", cache=DISK_INFO_CACHE)
+        return Collect._parse_disk_info(code, stdout)
+
+    @staticmethod
+    async def _async_get_disk_info() -> List[dict]:
+        """
+            get disk capacity and model from /sys/block, lshw is only executed if sysfs can not be read
+
+        Returns:
+            list: the same as _get_disk_info
+        """
+        block_devices = get_block_devices()
+        if block_devices is not None:
+            return [Collect._build_disk_info(device) for device in block_devices]
+        code, stdout, _ = await async_execute_shell_command("lshw -json -c disk", cache=DISK_INFO_CACHE)
+        return Collect._parse_disk_info(code, stdout)
+
+    @staticmethod
+    def _build_disk_info(device: Dict[str, Any]) -> dict:
+        """
+            build disk info from a block device of sysfs, the capacity is counted in GB as lshw does
+        """
+        return {
+            "model": device["model"],
+            "capacity": f"{device['size'] // 10 ** 9}GB",
+            "vendor": device["vendor"],
+            "name": device["name"],
+            "rotational": device["rotational"],
+            "nvme": device["nvme"],
+        }
+
+    @staticmethod
+    def _parse_disk_info(code: int, stdout: str) -> List[dict]:
+        """
+            parse disk capacity and model from the output of lshw
+        """
         if code != CommandExitCode.SUCCEED:
             LOGGER.error(stdout)
+            report_source_failure("lshw")
             return []
 
         # Convert the command result to a json string
@@ -318,22 +637,67 @@ class Collect:
             disk_info_list = json.loads(lshw_data)
         except json.decoder.JSONDecodeError:
             LOGGER.warning("Json conversion error, " "please check command 'lshw -json -c disk'")
+            report_source_failure("lshw")
             disk_info_list = []
 
         res = []
         if disk_info_list:
             for disk_info in disk_info_list:
-                tmp = {"model": disk_info.get('product'), "capacity": f"{disk_info.get('size', 0) // 10 ** 9}GB"}
+                name = os.path.basename(disk_info.get('logicalname') or '') or None
+                tmp = {
+                    "model": disk_info.get('product'),
+                    "capacity": f"{disk_info.get('size', 0) // 10 ** 9}GB",
+                    "vendor": disk_info.get('vendor'),
+                    "name": name,
+                    "rotational": None,
+                    "nvme": bool(name and name.startswith("nvme")),
+                }
                 res.append(tmp)
 
         return res
 
     @staticmethod
-    def get_file_info(file_path: str) -> dict:
+    def _get_perf_info() -> Dict[str, Any]:
+        """
+            get the performance tuning state of the host from sysfs and procfs, no process is started
+
+        Returns:
+            dict: e.g
+                {
+                    "numa": [{"node": 0, "cpus": "0-63", "memory": 270039130112}],
+                    "transparent_hugepage": {"enabled": "madvise", "defrag": "madvise"},
+                    "hugepages": [{"size": 2097152, "total": 1024, "free": 1000}],
+                    "cpufreq": [
+                        {
+                            "policy": 0,
+                            "cpus": "0-3",
+                            "governor": "performance",
+                            "min_freq": 1000000,
+                            "max_freq": 2600000
+                        }
+                    ],
+                    "io_scheduler": {"nvme0n1": "none", "sda": "mq-deadline"},
+                    "nic_irq_affinity": [{"name": "eth0", "irqs": 33, "cpus": "0-31"}]
+                }
+        """
+        return {
+            "numa": get_numa_nodes(),
+            "transparent_hugepage": get_transparent_hugepage(),
+            "hugepages": get_hugepage_pools(),
+            "cpufreq": get_cpufreq_policies(),
+            "io_scheduler": get_io_schedulers(),
+            "nic_irq_affinity": get_nic_irq_affinity(),
+        }
+
+    @staticmethod
+    def get_file_info(file_path: str, byte_budget: Optional[ByteBudget] = None) -> dict:
         """
-            get file content and attribute
+            get file content and attribute, the file is opened once and its attributes are read
+            from the open descriptor
         Args:
             file_path(str): file absolute path
+            byte_budget(ByteBudget): bytes left for the collection the file is part of, the bytes
+                actually read are taken from it, default: only the size of the file is limited
 
         Returns:
             dict: { path: file_path,
@@ -343,27 +707,71 @@ class Collect:
                     group: group},
                     content: content}
         """
-        if os.access(file_path, os.X_OK):
-            LOGGER.warning(f"{file_path} is an executable file")
+        try:
+            # a fifo must not block the collection, O_NONBLOCK does not affect regular files
+            fd = os.open(file_path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        except OSError:
+            LOGGER.error(f"file {file_path} cannot be found or is not a file")
             return {}
-
-        if os.path.getsize(file_path) > 1024 * 1024 * 1:
+        if byte_budget is None:
+            byte_budget = ByteBudget(COLLECT_FILE_MAX_SIZE + 1)
+        reserved = 0
+        try:
+            file_attr = os.fstat(fd)
+            if not stat.S_ISREG(file_attr.st_mode):
+                LOGGER.error(f"file {file_path} cannot be found or is not a file")
+                return {}
+            if file_attr.st_mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH):
+                LOGGER.warning(f"{file_path} is an executable file")
+                return {}
+            if file_attr.st_size > COLLECT_FILE_MAX_SIZE:
+                LOGGER.warning(f"{file_path} is too large")
+                return {}
+            if not byte_budget.reserve(file_attr.st_size):
+                LOGGER.warning(f"{file_path} is not collected, the files to collect are too large")
+                return {}
+            reserved = file_attr.st_size
+            data = b""
+            while len(data) <= COLLECT_FILE_MAX_SIZE:
+                # the size of procfs and sysfs files is 0 and a file may grow after fstat, the
+                # bytes read beyond the reserved size are taken from the budget as they come
+                read_size = max(reserved + 1 - len(data), COLLECT_FILE_READ_SIZE)
+                chunk = os.read(fd, min(read_size, COLLECT_FILE_MAX_SIZE + 1 - len(data)))
+                if not chunk:
+                    break
+                data += chunk
+                if len(data) > reserved:
+                    if not byte_budget.reserve(len(data) - reserved):
+                        byte_budget.release(reserved)
+                        LOGGER.warning(f"{file_path} is not collected, the files to collect are too large")
+                        return {}
+                    reserved = len(data)
+        except OSError as error:
+            LOGGER.error(f"Failed to read {file_path}: {error}")
+            byte_budget.release(reserved)
+            return {}
+        finally:
+            os.close(fd)
+        if len(data) > COLLECT_FILE_MAX_SIZE:
             LOGGER.warning(f"{file_path} is too large")
+            byte_budget.release(reserved)
             return {}
-
         try:
-            with open(file_path, 'r', encoding='utf8') as f:
-                content = f.read()
+            # the newlines are translated as a file opened in text mode does
+            content = data.decode("utf8").replace("\r\n", "\n").replace("\r", "\n")
         except UnicodeDecodeError:
             LOGGER.error(f'{file_path} may not be a text file')
+            byte_budget.release(reserved)
             return {}
-        file_attr = os.stat(file_path)
-        file_mode = oct(file_attr.st_mode)[4:]
-        file_owner = pwd.getpwuid(file_attr.st_uid)[0]
-        file_group = grp.getgrgid(file_attr.st_gid)[0]
+        # a file which shrank after fstat only keeps the bytes it is made of
+        byte_budget.release(reserved - len(data))
         info = {
             'path': file_path,
-            'file_attr': {'mode': file_mode, 'owner': file_owner, 'group': file_group},
+            'file_attr': {
+                'mode': oct(file_attr.st_mode)[4:],
+                'owner': _get_user_name(file_attr.st_uid),
+                'group': _get_group_name(file_attr.st_gid),
+            },
             'content': content,
         }
         return info
@@ -371,38 +779,54 @@ class Collect:
     @staticmethod
     def get_uuid() -> str:
         """
-            get uuid about disk
+            get the system uuid from /sys/class/dmi/id, or the DMI table of dmidecode
+
+        Returns:
+            uuid(str): e.g 3F2C9A1E8B4D11EC9A6F0242AC130003
+        """
+        return get_dmi_facts(["product_uuid"])["product_uuid"].replace("-", "")
+
+    @staticmethod
+    async def async_get_uuid() -> str:
+        """
+            get the system uuid from /sys/class/dmi/id, or the DMI table of dmidecode
 
         Returns:
             uuid(str)
         """
-        code, stdout, _ = execute_shell_command("dmidecode|grep UUID")
-        if code == CommandExitCode.SUCCEED:
-            return stdout.replace("-", "").split(':')[1].strip()
-        return ""
+        return (await async_get_dmi_facts(["product_uuid"]))["product_uuid"].replace("-", "")
 
     @staticmethod
-    def get_host_ip() -> str:
+    def get_host_ip(destination: Optional[str] = None) -> str:
         """
-            get host ip by create udp package
+            get the host ip facing a destination from the route table, or the ip of the interface
+            set in the network section of the configuration, no packet is sent
+
+        Args:
+            destination(str): ip of the peer, e.g the zeus ip, default: the default route
+
         Returns:
             host ip(str)
         """
-        sock = socket(AF_INET, SOCK_DGRAM)
-        try:
-            sock.connect(('8.8.8.8', 80))
-            host_ip = sock.getsockname()[0]
-        except OSError:
-            LOGGER.error("Failed to get host ip, please check internet and try again.")
-            host_ip = ''
-        finally:
-            sock.close()
+        host_ip = get_source_address(destination, configuration.network.get("INTERFACE") or None)
+        if not host_ip:
+            LOGGER.error("Failed to get host ip, please check the network interfaces and try again.")
         return host_ip
 
+    @staticmethod
+    def get_host_ips() -> List[str]:
+        """
+            get every ip of the host, loopback and link-local addresses excepted
+
+        Returns:
+            list: e.g ["192.168.1.2", "10.0.0.2", "fd00::2"]
+        """
+        return [address.address for address in get_interface_addresses()]
+
     @staticmethod
     def get_installed_packages():
         """
-        query installed packages
+        query installed source packages from the rpm database
 
         Returns:
             list: list of dict, each dict is package_name and package_version. e.g
@@ -411,18 +835,77 @@ class Collect:
                     "version": "4.19.90-2022.1.1"
                 }]
         """
+        package_index = Collect.get_package_index()
+        return package_index.get_packages() if package_index is not None else []
 
-        code, source_name_info, _ = execute_shell_command("rpm -qai|grep .src.rpm")
-        if code != CommandExitCode.SUCCEED:
+    @staticmethod
+    def get_package_index() -> Optional[PackageIndex]:
+        """
+        get the index of the installed source packages, the rpm database is only read again when
+        it changed since the index was saved
+
+        Returns:
+            PackageIndex: None if the installed packages can not be queried
+        """
+        package_index = PackageIndex(configuration.command.get("PACKAGE_INDEX_FILE"))
+        if not package_index.refresh(get_rpmdb_fingerprint(), Collect._query_installed_packages):
+            LOGGER.error("Failed to query installed packages.")
+            return None
+        package_index.save()
+        return package_index
+
+    @staticmethod
+    def _query_installed_packages() -> Optional[List[Dict[str, str]]]:
+        packages = get_installed_rpm_packages()
+        if packages is None:
+            return None
+        return Collect._parse_installed_packages(package.source_rpm for package in packages)
+
+    @staticmethod
+    async def async_get_installed_packages() -> list:
+        """
+        query installed source packages, the rpm database is read without blocking the event loop
+
+        Returns:
+            list: the same as get_installed_packages
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, Collect.get_installed_packages)
+
+    @staticmethod
+    def get_rpm_packages() -> List[Dict[str, Any]]:
+        """
+        query installed binary packages with the source package they were built from
+
+        Returns:
+            list: e.g
+                [{
+                    "name": "bash",
+                    "epoch": None,
+                    "version": "5.1.8",
+                    "release": "6.oe2203",
+                    "arch": "x86_64",
+                    "source_name": "bash",
+                    "source_rpm": "bash-5.1.8-6.oe2203.src.rpm"
+                }]
+        """
+        packages = get_installed_rpm_packages()
+        if packages is None:
             LOGGER.error("Failed to query installed packages.")
             return []
+        return [asdict(package) for package in packages]
 
+    @staticmethod
+    def _parse_installed_packages(source_rpms: Iterable[Optional[str]]) -> list:
+        """
+        parse source package name and version from the file names of the source rpms, e.g
+        bash-5.1.8-6.oe2203.src.rpm, the distribution suffix of the release is dropped
+        """
         package_info_dict = {}
-        for package_source_name in source_name_info.splitlines():
-            package_info = package_source_name.rsplit("-", 2)
-            if len(package_info) == 1:
+        for source_rpm in source_rpms:
+            package_info = (source_rpm or "").rsplit("-", 2)
+            if len(package_info) != 3:
                 continue
-            package = package_info[0].split(':')[1].strip()
+            package = package_info[0]
             pkg_version = f"{package_info[1]}-{package_info[-1].split('.')[0]}"
             key = package + pkg_version
             if key not in package_info_dict:
@@ -441,17 +924,45 @@ class Collect:
         running_apps = []
         for application_name in SCANNED_APPLICATION:
             status_info = plugin_status_judge(application_name)
-            if status_info != '':
-                status = re.search(r':.+\(', status_info).group()[1:-1].strip()
-                if status == 'active':
-                    running_apps.append(application_name)
+            if Collect._is_active(status_info):
+                running_apps.append(application_name)
         return running_apps
 
     @staticmethod
-    def get_plugin_info():
+    async def async_get_application_info() -> list:
+        """
+            get the running applications in the target list, all services are queried concurrently
+
+        Returns:
+            List[str]:applications which is running
+        """
+        status_infos = await asyncio.gather(
+            *(async_plugin_status_judge(application_name) for application_name in SCANNED_APPLICATION)
+        )
+        return [
+            application_name
+            for application_name, status_info in zip(SCANNED_APPLICATION, status_infos)
+            if Collect._is_active(status_info)
+        ]
+
+    @staticmethod
+    def _is_active(status_info: str) -> bool:
+        """
+            judge whether the Active line of systemctl status means the service is active
+        """
+        if status_info == '':
+            return False
+        return re.search(r':.+\(', status_info).group()[1:-1].strip() == 'active'
+
+    @staticmethod
+    def get_plugin_info(unit_states: Optional[Dict[str, str]] = None) -> list:
         """
         get all plugin info about ceres
 
+        Args:
+            unit_states(dict): the Active line of systemctl status of the plugins which is already
+                known, e.g {"gala-gopher": "Active: active (running) since ..."}, the others are queried
+
         Returns:
             a list which contains cpu,memory,collect items of plugin,running status and so on.
             for example
@@ -479,7 +990,11 @@ class Collect:
         for plugin_name in plugin_list:
             plugin_running_info = {"plugin_name": plugin_name, "collect_items": [], "status": None, "resource": []}
 
-            if not plugin_status_judge(plugin_name):
+            if unit_states is not None and plugin_name in unit_states:
+                status_info = unit_states[plugin_name]
+            else:
+                status_info = plugin_status_judge(plugin_name)
+            if not status_info:
                 plugin_running_info["is_installed"] = False
                 res.append(plugin_running_info)
                 continue
@@ -488,7 +1003,7 @@ class Collect:
             service_name = INFORMATION_ABOUT_RPM_SERVICE.get(plugin_name).get("service_name")
             plugin = plugin_manage.Plugin(service_name)
 
-            status = plugin.get_plugin_status()
+            status = plugin._parse_plugin_status(CommandExitCode.SUCCEED, status_info)
             if status == "active":
                 pid = plugin_manage.Plugin.get_pid(service_name)
                 cpu_current = Resource.get_current_cpu(service_name, pid)
@@ -517,20 +1032,94 @@ class Collect:
             res.append(plugin_running_info)
         return res
 
+    @staticmethod
+    async def async_get_plugin_info() -> list:
+        """
+        get all plugin info about ceres, plugins and their independent queries are executed concurrently
+
+        Returns:
+            list: the same as get_plugin_info
+        """
+        return list(
+            await asyncio.gather(*(Collect._async_get_plugin_running_info(name) for name in INSTALLABLE_PLUGIN))
+        )
+
+    @staticmethod
+    async def _async_get_plugin_running_info(plugin_name: str) -> dict:
+        """
+        get running info about one plugin
+
+        Args:
+            plugin_name(str)
+
+        Returns:
+            dict: item of the list returned by get_plugin_info
+        """
+        plugin_running_info = {"plugin_name": plugin_name, "collect_items": [], "status": None, "resource": []}
+        if not await async_plugin_status_judge(plugin_name):
+            plugin_running_info["is_installed"] = False
+            return plugin_running_info
+        plugin_running_info["is_installed"] = True
+
+        service_name = INFORMATION_ABOUT_RPM_SERVICE.get(plugin_name).get("service_name")
+        plugin = plugin_manage.Plugin(service_name)
+        status = await plugin.async_get_plugin_status()
+        if status == "active":
+            pid = await plugin_manage.Plugin.async_get_pid(service_name)
+            cpu_current, memory_current = await asyncio.gather(
+                Resource.async_get_current_cpu(service_name, pid), Resource.async_get_current_memory(pid)
+            )
+        else:
+            cpu_current = None
+            memory_current = None
+
+        collect_items_status = []
+        plugin_class_name = PLUGIN_WITH_CLASS.get(plugin_name, '')
+        if hasattr(plugin_manage, plugin_class_name):
+            plugin_obj = getattr(plugin_manage, plugin_class_name)
+            if hasattr(plugin_obj, "get_collect_status"):
+                collect_items_status = plugin_obj.get_collect_status()
+
+        plugin_running_info["status"] = status
+        plugin_running_info["collect_items"] = collect_items_status
+        plugin_running_info["resource"] = [
+            {"name": "cpu", "current_value": cpu_current, "limit_value": Resource.get_cpu_limit(service_name)},
+            {"name": "memory", "current_value": memory_current, "limit_value": Resource.get_memory_limit(service_name)},
+        ]
+        return plugin_running_info
+
     @staticmethod
     def collect_file(config_path_list: list) -> dict:
-        result = {"success_files": [], "fail_files": [], "infos": []}
+        """
+        get the content and attributes of files, they are read concurrently by a pool of at most
+        MAX_CONCURRENCY threads and the files read in total may not exceed COLLECT_FILE_BYTE_BUDGET
 
-        for file_path in config_path_list:
-            if not os.path.exists(file_path) or not os.path.isfile(file_path):
-                result['fail_files'].append(file_path)
-                LOGGER.error(f"file {file_path} cannot be found or is not a file")
-                continue
+        Args:
+            config_path_list(list): file absolute paths
 
-            info = Collect.get_file_info(file_path)
+        Returns:
+            dict: e.g {"success_files": [path], "fail_files": [path], "infos": [file info of get_file_info]},
+                the files are in the order of config_path_list
+        """
+        result = {"success_files": [], "fail_files": [], "infos": []}
+
+        def add_file_info(file_path: str, info: dict) -> None:
             if not info:
                 result['fail_files'].append(file_path)
-                continue
+                return
             result['success_files'].append(file_path)
             result['infos'].append(info)
+
+        byte_budget = ByteBudget(COLLECT_FILE_BYTE_BUDGET)
+        max_workers = configuration.command.get("MAX_CONCURRENCY")
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collect_file") as pool:
+            for file_path in config_path_list:
+                # at most two files per thread are queued, a long list is not submitted at once
+                if len(pending) >= max_workers * 2:
+                    queued_path, future = pending.popleft()
+                    add_file_info(queued_path, future.result())
+                pending.append((file_path, pool.submit(Collect.get_file_info, file_path, byte_budget)))
+            for queued_path, future in pending:
+                add_file_info(queued_path, future.result())
         return result
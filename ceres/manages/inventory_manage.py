@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+from typing import Dict, List, Optional
+
+from ceres.conf import configuration
+from ceres.conf.constant import INVENTORY_FIELDS, SCANNED_APPLICATION
+from ceres.function.fact_graph import FactDefinition, FactGraph
+from ceres.function.util import plugin_status_judge
+from ceres.manages.collect_manage import Collect
+
+
+def _get_unit_states() -> Dict[str, str]:
+    """
+    get the Active line of systemctl status of every scanned application, the plugins are part of them
+    """
+    return {application_name: plugin_status_judge(application_name) for application_name in SCANNED_APPLICATION}
+
+
+def _get_application_info(_unit_states: Dict[str, str]) -> List[str]:
+    return [name for name, status_info in _unit_states.items() if Collect._is_active(status_info)]
+
+
+# the facts whose name starts with an underscore are shared by the others but never output. The
+# DMI table is not a fact: it is only read when sysfs misses a DMI fact, and the one dmidecode
+# it may need is shared through the command cache.
+HOST_FACTS = {
+    "_unit_states": FactDefinition(_get_unit_states),
+    "os_version": FactDefinition(Collect.get_os_version),
+    "uuid": FactDefinition(Collect.get_uuid),
+    "host_ip": FactDefinition(Collect.get_host_ip),
+    "host_ips": FactDefinition(Collect.get_host_ips),
+    "os": FactDefinition(lambda: Collect()._get_os_info()),
+    "cpu": FactDefinition(lambda: Collect._get_cpu_info()),
+    "memory": FactDefinition(lambda: Collect()._get_memory_info()),
+    "disk": FactDefinition(lambda: Collect._get_disk_info()),
+    "perf": FactDefinition(lambda: Collect._get_perf_info()),
+    "application": FactDefinition(_get_application_info, ("_unit_states",)),
+    "plugin": FactDefinition(lambda _unit_states: Collect.get_plugin_info(_unit_states), ("_unit_states",)),
+    "_package_index": FactDefinition(Collect.get_package_index),
+    # a package index which can not be built is a failed fact, not a host without packages
+    "installed_packages": FactDefinition(
+        lambda _package_index: _package_index.get_packages() if _package_index is not None else None,
+        ("_package_index",),
+    ),
+}
+
+
+class HostInventory(FactGraph):
+    """
+    Facts of the host shared by the collect and apollo commands, each one is computed at most once
+    """
+
+    def __init__(self):
+        super().__init__(HOST_FACTS)
+
+    def get_inventory(self, fields: Optional[List[str]] = None) -> dict:
+        """
+        get the facts of the host in one pass, the independent facts are computed concurrently
+
+        Args:
+            fields(list): e.g ["os", "uuid"], default: every field of INVENTORY_FIELDS
+
+        Returns:
+            dict: field -> value, a fact which failed is None, e.g
+                {
+                    "os_version": "openEuler-22.03-LTS",
+                    "uuid": "3F2C9A1E8B4D11EC9A6F0242AC130003",
+                    "host_ip": "192.168.1.2",
+                    "host_ips": ["192.168.1.2", "10.0.0.2"],
+                    "os": {...},
+                    "cpu": {...},
+                    "memory": {...},
+                    "disk": [...],
+                    "perf": {...},
+                    "application": ["mysql"],
+                    "plugin": [...],
+                    "installed_packages": [...]
+                }
+        """
+        return self.get_many(fields or INVENTORY_FIELDS, configuration.command.get("MAX_CONCURRENCY"))
@@ -19,9 +19,16 @@ import libconf
 
 from ceres.conf import configuration
 from ceres.conf.constant import INSTALLABLE_PLUGIN, CommandExitCode
+from ceres.function.cache import COMMAND_CACHE
 from ceres.function.log import LOGGER
 from ceres.function.status import SUCCESS, FAIL
-from ceres.function.util import execute_shell_command, load_gopher_config, plugin_status_judge
+from ceres.function.util import (
+    async_execute_shell_command,
+    execute_shell_command,
+    load_gopher_config,
+    plugin_status_judge,
+    service_status_cache_policy,
+)
 
 
 @dataclass
@@ -53,6 +60,7 @@ class Plugin:
             return SUCCESS
 
         code, _, _ = execute_shell_command(f"systemctl start {self.rpm_name}")
+        COMMAND_CACHE.invalidate(["systemctl", "status", self.rpm_name])
         if code != CommandExitCode.SUCCEED:
             return FAIL
         return SUCCESS
@@ -69,6 +77,7 @@ class Plugin:
             return SUCCESS
 
         code, _, _ = execute_shell_command(f"systemctl stop {self.rpm_name}")
+        COMMAND_CACHE.invalidate(["systemctl", "status", self.rpm_name])
         if code != CommandExitCode.SUCCEED:
             return FAIL
         return SUCCESS
@@ -100,7 +109,28 @@ class Plugin:
             str: dead or running
 
         """
-        code, stdout, _ = execute_shell_command(f"systemctl status {self.rpm_name}|grep Active")
+        code, stdout, _ = execute_shell_command(
+            f"systemctl status {self.rpm_name}|grep Active", cache=service_status_cache_policy(self.rpm_name)
+        )
+        return self._parse_plugin_status(code, stdout)
+
+    async def async_get_plugin_status(self) -> str:
+        """
+        Get plugin running status which is installed
+
+        Returns:
+            str: dead or running
+
+        """
+        code, stdout, _ = await async_execute_shell_command(
+            f"systemctl status {self.rpm_name}|grep Active", cache=service_status_cache_policy(self.rpm_name)
+        )
+        return self._parse_plugin_status(code, stdout)
+
+    def _parse_plugin_status(self, code: int, stdout: str) -> str:
+        """
+        Parse plugin running status from the Active line of systemctl status
+        """
         if code == CommandExitCode.SUCCEED:
             return re.search(r':.+\(', stdout).group()[1:-1].strip()
         LOGGER.error(f'Failed to get service {self.rpm_name} status!')
@@ -114,7 +144,29 @@ class Plugin:
         Returns:
             The str type of main process id
         """
-        code, main_pid_info, _ = execute_shell_command(f"systemctl status {rpm_name}|grep Main")
+        code, main_pid_info, _ = execute_shell_command(
+            f"systemctl status {rpm_name}|grep Main", cache=service_status_cache_policy(rpm_name)
+        )
+        return cls._parse_pid(rpm_name, code, main_pid_info)
+
+    @classmethod
+    async def async_get_pid(cls, rpm_name) -> str:
+        """
+        Get main process id when plugin is running
+
+        Returns:
+            The str type of main process id
+        """
+        code, main_pid_info, _ = await async_execute_shell_command(
+            f"systemctl status {rpm_name}|grep Main", cache=service_status_cache_policy(rpm_name)
+        )
+        return cls._parse_pid(rpm_name, code, main_pid_info)
+
+    @staticmethod
+    def _parse_pid(rpm_name: str, code: int, main_pid_info: str) -> str:
+        """
+        Parse main process id from the Main PID line of systemctl status
+        """
         if code == CommandExitCode.SUCCEED:
             return re.search("[0-9]+[0-9]", main_pid_info).group()
         LOGGER.error(f"Failed to get {rpm_name} pid")
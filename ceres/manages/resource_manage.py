@@ -15,7 +15,7 @@ import os
 
 from ceres.conf.constant import BASE_SERVICE_PATH, CommandExitCode
 from ceres.function.log import LOGGER
-from ceres.function.util import load_conf, execute_shell_command
+from ceres.function.util import load_conf, async_execute_shell_command, execute_shell_command
 
 
 class Resource:
@@ -33,6 +33,25 @@ class Resource:
             str:The memory value which has used
         """
         code, stdout, _ = execute_shell_command(f"cat /proc/{pid}/status|grep VmRSS")
+        return cls._parse_current_memory(pid, code, stdout)
+
+    @classmethod
+    async def async_get_current_memory(cls, pid: str) -> str:
+        """
+        Get memory value which plugin has used
+        Args:
+            pid(str): main process id about running plugin
+        Returns:
+            str:The memory value which has used
+        """
+        code, stdout, _ = await async_execute_shell_command(f"cat /proc/{pid}/status|grep VmRSS")
+        return cls._parse_current_memory(pid, code, stdout)
+
+    @staticmethod
+    def _parse_current_memory(pid: str, code: int, stdout: str) -> str:
+        """
+        Parse the memory value from the VmRSS line of the status of the process
+        """
         if code == CommandExitCode.SUCCEED:
             return stdout.split(":")[1].strip()
         LOGGER.error(f'Failed to get memory info of process {pid}!')
@@ -81,6 +100,28 @@ class Resource:
             str: cpu usage
         """
         code, stdout, _ = execute_shell_command(f"ps -aux|grep -w {rpm_name}|grep {pid}|awk {{print$3}}")
+        return Resource._parse_current_cpu(rpm_name, code, stdout)
+
+    @staticmethod
+    async def async_get_current_cpu(rpm_name: str, pid: str) -> str:
+        """
+        Get cpu usage by process id
+
+        Args:
+            rpm_name(str): rpm package name
+            pid(str): main process id about running plugin
+
+        Returns:
+            str: cpu usage
+        """
+        code, stdout, _ = await async_execute_shell_command(f"ps -aux|grep -w {rpm_name}|grep {pid}|awk {{print$3}}")
+        return Resource._parse_current_cpu(rpm_name, code, stdout)
+
+    @staticmethod
+    def _parse_current_cpu(rpm_name: str, code: int, stdout: str) -> str:
+        """
+        Parse the cpu usage from the output of ps
+        """
         if code == CommandExitCode.SUCCEED:
             return f'{stdout.strip()}%'
         LOGGER.error(f'Failed to get plugin cpu info about {rpm_name}.')
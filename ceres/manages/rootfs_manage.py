@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from ceres.conf import configuration
+from ceres.function.facts import read_os_release, root_path
+from ceres.function.log import LOGGER
+from ceres.function.rpmdb import get_installed_rpm_packages, get_rpmdb_fingerprint
+from ceres.function.status import FILE_NOT_FOUND, REPO_NOT_SET, SUCCESS, UNKNOWN_ERROR
+from ceres.function.updateinfo import Advisories, load_advisories, match_advisories
+from ceres.manages.collect_manage import Collect
+
+LAYER_KEY_CHUNK_SIZE = 1024 * 1024
+
+
+class RootfsInventory:
+    """
+    Packages and CVEs of alternate roots, such as the root filesystems of containers
+    """
+
+    def __init__(self, roots: List[str]):
+        self._roots = roots
+
+    @staticmethod
+    def _get_layer_key(root: str) -> str:
+        """
+        the roots made from the same image layer share the content of their rpm database, they are
+        read once. The size and mtime of the files are not enough, two layers built in the same
+        second may have databases of the same size. A root without rpm database is never shared.
+        """
+        fingerprint = get_rpmdb_fingerprint(root)
+        if not fingerprint:
+            return f"root:{root}"
+        digest = hashlib.sha256()
+        try:
+            for path, _, _ in fingerprint:
+                digest.update(f"{path}\0".encode("utf-8"))
+                with open(root_path(root, path) or "", "rb") as file:
+                    for chunk in iter(lambda: file.read(LAYER_KEY_CHUNK_SIZE), b""):
+                        digest.update(chunk)
+        except OSError as error:
+            LOGGER.debug(f"Failed to read the rpm database of root {root}: {error}")
+            return f"root:{root}"
+        return digest.hexdigest()
+
+    @staticmethod
+    def _inventory_layer(root: str, advisories: Optional[Advisories]) -> dict:
+        packages = get_installed_rpm_packages(root)
+        if packages is None:
+            LOGGER.error(f"Failed to query installed packages of root {root}.")
+            return {"status": FILE_NOT_FOUND}
+        result = {
+            "status": SUCCESS,
+            "installed_packages": Collect._parse_installed_packages(package.source_rpm for package in packages),
+        }
+        if advisories is not None:
+            cves = match_advisories(packages, advisories)
+            result["unfixed_cves"] = [{"cve_id": cve_id, "support_hp": False} for cve_id in cves["unfixed_cves"]]
+            result["fixed_cves"] = [{"cve_id": cve_id, "fixed_by_hp": False} for cve_id in cves["fixed_cves"]]
+        return result
+
+    def _get_inventory(self, advisories: Optional[Advisories]) -> Dict[str, dict]:
+        layers = {}
+        for root in self._roots:
+            if os.path.isdir(root):
+                layers.setdefault(self._get_layer_key(root), []).append(root)
+        inventory = {root: {"status": FILE_NOT_FOUND} for root in self._roots}
+        if not layers:
+            return inventory
+        max_workers = min(len(layers), configuration.command.get("MAX_CONCURRENCY"))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rootfs") as pool:
+            futures = {
+                pool.submit(self._inventory_layer, roots[0], advisories): roots for roots in layers.values()
+            }
+        for future, roots in futures.items():
+            error = future.exception()
+            if error is not None:
+                LOGGER.error(f"Failed to get the inventory of roots {roots}: {error}")
+            for root in roots:
+                if error is not None:
+                    inventory[root] = {"status": UNKNOWN_ERROR}
+                    continue
+                pretty_name = read_os_release(root).get("PRETTY_NAME")
+                inventory[root] = dict(future.result(), os_version=pretty_name.replace(" ", "-") if pretty_name else "")
+        return inventory
+
+    def get_inventory(self) -> Dict[str, dict]:
+        """
+        get the installed packages of every root, the roots are read concurrently
+
+        Returns:
+            dict: root -> inventory, e.g
+                {
+                    "/var/lib/containers/storage/overlay/<id>/merged": {
+                        "status": "Succeed",
+                        "os_version": "openEuler-22.03-(LTS)",
+                        "installed_packages": [{"name": "bash", "version": "5.1.8-6"}]
+                    },
+                    "/nonexistent": {"status": "File.Not.Found"}
+                }
+        """
+        return self._get_inventory(None)
+
+    def scan_cves(self, repo_id: str) -> Dict[str, dict]:
+        """
+        get the installed packages and the CVEs of every root, the updateinfo of the repo is parsed
+        once and matched with the packages of each root
+
+        Args:
+            repo_id(str): the repo the fixed versions of the CVEs are read from
+
+        Returns:
+            dict: root -> inventory, the same as get_inventory with the CVEs of the root, e.g
+                {
+                    "/var/lib/containers/storage/overlay/<id>/merged": {
+                        "status": "Succeed",
+                        "os_version": "openEuler-22.03-(LTS)",
+                        "installed_packages": [{"name": "bash", "version": "5.1.8-6"}],
+                        "unfixed_cves": [{"cve_id": "CVE-2022-3715", "support_hp": False}],
+                        "fixed_cves": [{"cve_id": "CVE-2022-1271", "fixed_by_hp": False}]
+                    }
+                }
+        """
+        advisories = load_advisories(repo_id)
+        inventory = self._get_inventory(advisories)
+        if advisories is None:
+            for root_inventory in inventory.values():
+                if root_inventory["status"] == SUCCESS:
+                    root_inventory.update(status=REPO_NOT_SET, unfixed_cves=[], fixed_cves=[])
+        return inventory
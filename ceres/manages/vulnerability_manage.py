@@ -10,12 +10,16 @@
 # PURPOSE.
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
+import asyncio
+import itertools
 import os
 import re
 from collections import defaultdict
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
 
-from ceres.conf.constant import REPO_ID_FOR_CVE_MANAGE, CommandExitCode
+from ceres.conf.constant import CVE_FIX_TIMEOUT, CVE_SCAN_TIMEOUT, REPO_ID_FOR_CVE_MANAGE, CommandExitCode
+from ceres.function.cache import CachePolicy
+from ceres.function.deadline import NO_TIMEOUT, budget_share, operation_deadline
 from ceres.function.log import LOGGER
 from ceres.function.status import (
     NOT_PATCH,
@@ -25,9 +29,13 @@ from ceres.function.status import (
     SERVICE_NOT_EXIST,
     SUCCESS,
     StatusCode,
-    COMMAND_EXEC_ERROR
+    COMMAND_EXEC_ERROR,
+    COMMAND_TIMEOUT,
 )
-from ceres.function.util import execute_shell_command
+from ceres.function.util import async_execute_shell_command, execute_shell_command, stream_shell_command
+
+# the repo info only changes when a repo file is added, removed or modified
+REPO_INFO_CACHE = CachePolicy(ttl=600, depends_on=("/etc/yum.repos.d",))
 
 
 class VulnerabilityManage:
@@ -79,7 +87,21 @@ class VulnerabilityManage:
         Returns:
             bool
         """
-        code, _, _ = execute_shell_command(f"yum repoinfo --repo {repo_id}")
+        code, _, _ = execute_shell_command(f"yum repoinfo --repo {repo_id}", cache=REPO_INFO_CACHE)
+        return code == CommandExitCode.SUCCEED
+
+    @staticmethod
+    async def _async_validate_repo_source(repo_id: str) -> bool:
+        """
+        A sample validate which repo can used by yum.
+
+        Args:
+            repo_id(str): repo id
+
+        Returns:
+            bool
+        """
+        code, _, _ = await async_execute_shell_command(f"yum repoinfo --repo {repo_id}", cache=REPO_INFO_CACHE)
         return code == CommandExitCode.SUCCEED
 
     def cve_scan(self, cve_scan_args: dict) -> Tuple[int, dict]:
@@ -115,10 +137,32 @@ class VulnerabilityManage:
                         ]
                 }
         """
-        if self._validate_repo_source(REPO_ID_FOR_CVE_MANAGE):
-            if cve_scan_args.get('basic') is True:
-                return self._check_cve_by_dnf(REPO_ID_FOR_CVE_MANAGE)
-            return SERVICE_NOT_EXIST, {}
+        with operation_deadline(CVE_SCAN_TIMEOUT):
+            if self._validate_repo_source(REPO_ID_FOR_CVE_MANAGE):
+                if cve_scan_args.get('basic') is True:
+                    return self._check_cve_by_dnf(REPO_ID_FOR_CVE_MANAGE)
+                return SERVICE_NOT_EXIST, {}
+
+        LOGGER.warning(f'Failed to query repo basic info '
+                       f'which repo id is {REPO_ID_FOR_CVE_MANAGE}.')
+        return REPO_NOT_SET, {}
+
+    async def async_cve_scan(self, cve_scan_args: dict) -> Tuple[int, dict]:
+        """
+        Scan CVEs in the machine, the independent dnf queries are executed concurrently
+
+        Args:
+            cve_scan_args(dict): the same as cve_scan
+
+        Returns:
+            int: status code
+            dict: the same as cve_scan
+        """
+        with operation_deadline(CVE_SCAN_TIMEOUT):
+            if await self._async_validate_repo_source(REPO_ID_FOR_CVE_MANAGE):
+                if cve_scan_args.get('basic') is True:
+                    return await self._async_check_cve_by_dnf(REPO_ID_FOR_CVE_MANAGE)
+                return SERVICE_NOT_EXIST, {}
 
         LOGGER.warning(f'Failed to query repo basic info '
                        f'which repo id is {REPO_ID_FOR_CVE_MANAGE}.')
@@ -127,7 +171,9 @@ class VulnerabilityManage:
     @staticmethod
     def _check_cve_by_dnf(repo_id: str) -> Tuple[int, dict]:
         """
-        Detect which CVEs can be fixed from the update source
+        Detect which CVEs can be fixed from the update source, the output of the dnf queries is
+        parsed while it is streamed, and the budget of the current operation deadline is shared
+        by the queries which are left
 
         Args:
             repo_id(str): repo id
@@ -152,59 +198,150 @@ class VulnerabilityManage:
         """
         result_dict = {"unfixed_cves": [], "fixed_cves": []}
 
-        is_hp_command = True
-        code, stdout, _ = execute_shell_command("dnf hot-updateinfo list cves")
+        with stream_shell_command("dnf hot-updateinfo list cves", timeout=budget_share(3)) as stream:
+            unfixed_cves = VulnerabilityManage._parse_unfixed_cves(stream, is_hp_command=True)
+        if stream.returncode != CommandExitCode.SUCCEED:
+            with stream_shell_command(f"dnf updateinfo list cves --repo {repo_id}", timeout=budget_share(3)) as stream:
+                unfixed_cves = VulnerabilityManage._parse_unfixed_cves(stream, is_hp_command=False)
+        result_dict["unfixed_cves"] = unfixed_cves
+
+        # Get fixed CVE
+        # cold patch
+        with stream_shell_command("dnf updateinfo list cves --installed", timeout=budget_share(2)) as stream:
+            cold_patch_fixed_cves = VulnerabilityManage._parse_cold_patch_fixed_cves(stream)
+        if stream.returncode != CommandExitCode.SUCCEED:
+            LOGGER.error("Failed to get cold patch fixed cve from dnf")
+            return VulnerabilityManage._command_error_status(stream.returncode), result_dict
+        result_dict["fixed_cves"].extend(cold_patch_fixed_cves)
+
+        # hotpatch
+        with stream_shell_command("dnf hotpatch --list cves", timeout=budget_share(1)) as stream:
+            hotpatch_fixed_cves = VulnerabilityManage._parse_hotpatch_fixed_cves(stream)
+        if stream.returncode != CommandExitCode.SUCCEED:
+            LOGGER.error("Failed to get hotpatch fixed cve from dnf")
+            return VulnerabilityManage._command_error_status(stream.returncode), result_dict
+        result_dict["fixed_cves"].extend(hotpatch_fixed_cves)
+
+        return SUCCESS, result_dict
+
+    @staticmethod
+    async def _async_check_cve_by_dnf(repo_id: str) -> Tuple[int, dict]:
+        """
+        Detect which CVEs can be fixed from the update source, the dnf queries are executed concurrently
+        and half of the operation budget is kept for the fallback query
+
+        Args:
+            repo_id(str): repo id
+
+        Returns:
+            int: status code
+            dict: the same as _check_cve_by_dnf
+        """
+        result_dict = {"unfixed_cves": [], "fixed_cves": []}
+
+        (code, stdout, _), cold_patch_result, hotpatch_result = await asyncio.gather(
+            async_execute_shell_command("dnf hot-updateinfo list cves", timeout=budget_share(2)),
+            async_execute_shell_command("dnf updateinfo list cves --installed", timeout=budget_share(2)),
+            async_execute_shell_command("dnf hotpatch --list cves", timeout=budget_share(2)),
+        )
+        is_hp_command = code == CommandExitCode.SUCCEED
+        if not is_hp_command:
+            _, stdout, _ = await async_execute_shell_command(
+                f"dnf updateinfo list cves --repo {repo_id}", timeout=budget_share(1)
+            )
+        result_dict["unfixed_cves"] = VulnerabilityManage._parse_unfixed_cves(stdout.splitlines(), is_hp_command)
+
+        code, cold_patch_fixed_result, _ = cold_patch_result
+        if code != CommandExitCode.SUCCEED:
+            LOGGER.error("Failed to get cold patch fixed cve from dnf")
+            return VulnerabilityManage._command_error_status(code), result_dict
+        result_dict["fixed_cves"].extend(
+            VulnerabilityManage._parse_cold_patch_fixed_cves(cold_patch_fixed_result.splitlines())
+        )
+
+        code, stdout, _ = hotpatch_result
         if code != CommandExitCode.SUCCEED:
-            _, stdout, _ = execute_shell_command(f"dnf updateinfo list cves --repo {repo_id}")
-            is_hp_command = False
+            LOGGER.error("Failed to get hotpatch fixed cve from dnf")
+            return VulnerabilityManage._command_error_status(code), result_dict
+        result_dict["fixed_cves"].extend(VulnerabilityManage._parse_hotpatch_fixed_cves(stdout.splitlines()))
+
+        return SUCCESS, result_dict
+
+    @staticmethod
+    def _command_error_status(code: int) -> str:
+        """
+        Get the status code of a failed dnf query, a query killed at its deadline is reported apart
+        """
+        return COMMAND_TIMEOUT if code == CommandExitCode.TIMEOUT else COMMAND_EXEC_ERROR
 
+    @staticmethod
+    def _parse_unfixed_cves(lines: Iterable[str], is_hp_command: bool) -> List[dict]:
+        """
+        Parse unfixed CVEs from the output of dnf hot-updateinfo or dnf updateinfo
+
+        Args:
+            lines(Iterable[str]): command output lines
+            is_hp_command(bool): whether the output comes from dnf hot-updateinfo
+
+        Returns:
+            list: e.g [{"cve_id": "CVE-1-1", "support_hp": True}]
+        """
+        unfixed_cves = []
         # unfixed_cves e.g.
         # Last metadata expiration check: 4:31:51 ago on Tue 09 May 2023 05:50:28 AM CST.
         # CVE-2021-32675 Low/sec.- -
-        for scan_info in stdout.strip().split("\n"):
+        for scan_info in lines:
+            scan_info = scan_info.rstrip()
             # The standard data format is CVE-2021-32675 Low/sec. --
             if scan_info[:4] == "CVE-":
                 cve = re.findall(r"CVE-[\d]{4}-[\d]+", scan_info)[0]
-                result_dict["unfixed_cves"].append({
+                unfixed_cves.append({
                     "cve_id": cve,
                     "support_hp": scan_info[-1] != "-" if is_hp_command else False
                 })
+        return unfixed_cves
 
-        # Get fixed CVE
-        # cold patch
-        code, cold_patch_fixed_result, _ = execute_shell_command("dnf updateinfo list cves --installed")
-        if code != CommandExitCode.SUCCEED:
-            LOGGER.error("Failed to get cold patch fixed cve from dnf")
-            return COMMAND_EXEC_ERROR, result_dict
+    @staticmethod
+    def _parse_cold_patch_fixed_cves(lines: Iterable[str]) -> List[dict]:
+        """
+        Parse CVEs fixed by cold patch from the output lines of dnf updateinfo list cves --installed
+
+        Returns:
+            list: e.g [{"cve_id": "CVE-1-1", "fixed_by_hp": False}]
+        """
+        fixed_cves = []
         # cold_patch_fixed_result e.g.
         # Last metadata expiration check: 0:04:47 ago on Fri 12 May 2023 09:19:38 AM CST.
         # CVE-2022-3080   Important/Sec. bind-libs-9.16.23-11.oe2203.aarch64
-        for cold_patch_fixed in cold_patch_fixed_result.strip().split("\n")[1:]:
+        for cold_patch_fixed in itertools.islice((line for line in lines if line.strip()), 1, None):
             cold_patch_fixed_split = cold_patch_fixed.split(" ")
-            result_dict["fixed_cves"].append({
+            fixed_cves.append({
                 "cve_id": cold_patch_fixed_split[0],
                 "fixed_by_hp": False
             })
+        return fixed_cves
 
-        # hotpatch
-        code, stdout, _ = execute_shell_command("dnf hotpatch --list cves")
-        if code != CommandExitCode.SUCCEED:
-            LOGGER.error("Failed to get hotpatch fixed cve from dnf")
-            return COMMAND_EXEC_ERROR, result_dict
+    @staticmethod
+    def _parse_hotpatch_fixed_cves(lines: Iterable[str]) -> List[dict]:
+        """
+        Parse CVEs fixed by hotpatch from the output lines of dnf hotpatch --list cves
 
+        Returns:
+            list: e.g [{"cve_id": "CVE-1-1", "fixed_by_hp": True, "hp_status": "ACTIVED"}]
+        """
+        fixed_cves = []
         # hotpatch_fixed_result e.g.
         # Last metadata expiration check: 0:04:47 ago on Fri 12 May 2023 09:19:38 AM CST.
         # CVE-2022-3080   A-1.1-1/HP3    ACTIVED
-        for hotpatch_fixed in stdout.strip().split("\n")[1:]:
-            hotpatch_fixed_split = hotpatch_fixed.split(" ")
+        for hotpatch_fixed in itertools.islice((line for line in lines if line.strip()), 1, None):
+            hotpatch_fixed_split = hotpatch_fixed.rstrip().split(" ")
             if hotpatch_fixed_split[-1] in ["ACTIVED", "ACCEPTED"]:
-                result_dict["fixed_cves"].append({
+                fixed_cves.append({
                     "cve_id": hotpatch_fixed_split[0],
                     "fixed_by_hp": True,
                     "hp_status": hotpatch_fixed_split[-1]
                 })
-
-        return SUCCESS, result_dict
+        return fixed_cves
 
     def cve_fix(self, cves: List[dict]) -> Tuple[int, list]:
         """
@@ -271,8 +408,14 @@ class VulnerabilityManage:
         else:
             command = f"dnf update --cve={cve.get('cve_id')} -y"
 
-        code, stdout, stderr = execute_shell_command(command)
-        res = stdout if code == CommandExitCode.SUCCEED else stderr
+        code, stdout, stderr = execute_shell_command(command, timeout=CVE_FIX_TIMEOUT)
+        if code == CommandExitCode.TIMEOUT:
+            LOGGER.error(f"Failed to fix {cve.get('cve_id')} before its deadline")
+            return False, "\n".join(filter(None, [stdout, stderr, "command timed out"]))
+        if code != CommandExitCode.SUCCEED:
+            LOGGER.error(f"Failed to fix {cve.get('cve_id')}")
+            return False, stderr
+        res = stdout
 
         if hotpatch:
             hot_pkg = self._hotpatch_list_cve_with_cveid(cve.get('cve_id'))
@@ -375,22 +518,23 @@ class VulnerabilityManage:
         # CVE id   base-pkg/hotpatch  status
         # CVE-1        A-1.1-1/HP1    ACTIVED
         # CVE-2        A-1.1-1/HP1    ACTIVED
-        code, hotpatch_list_output, _ = execute_shell_command(f"dnf hotpatch --list cve")
-        if code != CommandExitCode.SUCCEED:
+        hotpatch_list = defaultdict(list)
+        has_header = False
+        with stream_shell_command("dnf hotpatch --list cve") as stream:
+            for hotpatch_info in stream:
+                has_header = has_header or "base-pkg/hotpatch" in hotpatch_info
+                if not hotpatch_info.startswith("CVE"):
+                    continue
+                cve_id, base_pkg, status = [info.strip() for info in hotpatch_info.split()]
+                if status != "ACTIVED" and status != "ACCEPTED":
+                    continue
+                hotpatch_list[base_pkg].append(cve_id)
+        if stream.returncode != CommandExitCode.SUCCEED:
             LOGGER.error(f"Failed to hotpatch list cve.")
             return None
-            
-        if not re.search("base-pkg/hotpatch", hotpatch_list_output):
-            return None
-        hotpatch_list = defaultdict(list)
-        for hotpatch_info in [line for line in hotpatch_list_output.split(os.linesep) if line]:
-            if not hotpatch_info.startswith("CVE"):
-                continue
-            cve_id, base_pkg, status = [info.strip() for info in hotpatch_info.split()]
-            if status != "ACTIVED" and status != "ACCEPTED":
-                continue
-            hotpatch_list[base_pkg].append(cve_id)
 
+        if not has_header:
+            return None
         return hotpatch_list
 
     @staticmethod
@@ -420,14 +564,17 @@ class VulnerabilityManage:
         """
 
         """
-        operate_code, _, _ = execute_shell_command("syscare save")
-        if operate_code == CommandExitCode.FAIL:
+        # a command killed at its timeout may have left the patches half changed, it fails as well
+        operate_code, _, _ = execute_shell_command("syscare save", timeout=CVE_FIX_TIMEOUT)
+        if operate_code != CommandExitCode.SUCCEED:
             LOGGER.error(f"syscare save failed")
-        operate_code, _, _ = execute_shell_command(f"syscare {operate} {patch_name}")
-        if operate_code == CommandExitCode.FAIL:
+            return False
+        operate_code, _, _ = execute_shell_command(f"syscare {operate} {patch_name}", timeout=CVE_FIX_TIMEOUT)
+        if operate_code != CommandExitCode.SUCCEED:
             LOGGER.error(f"syscare {operate} {patch_name} failed,start roll back")
-            execute_shell_command("syscare restore")
-            if operate_code == CommandExitCode.FAIL:
+            # the rollback of a failed operation must not be interrupted
+            restore_code, _, _ = execute_shell_command("syscare restore", timeout=NO_TIMEOUT)
+            if restore_code != CommandExitCode.SUCCEED:
                 LOGGER.error(f"syscare restore failed,status roll back failed")
             else:
                 LOGGER.info(f"syscare restore success")
@@ -467,8 +614,11 @@ class VulnerabilityManage:
 
         hotpatch_name = "patch-%s-%s-%s-%s" % tuple(base_pkg_hotpatch.split("/") + list(hotpatch_release_info.values()))
 
-        _, stdout, stderr = execute_shell_command(f"dnf remove {hotpatch_name} -y")
-        return True, stdout + stderr 
+        code, stdout, stderr = execute_shell_command(f"dnf remove {hotpatch_name} -y", timeout=CVE_FIX_TIMEOUT)
+        if code == CommandExitCode.TIMEOUT:
+            LOGGER.error(f"Failed to remove {hotpatch_name} before its deadline")
+            return False, "\n".join(filter(None, [stdout, stderr, "command timed out"]))
+        return code == CommandExitCode.SUCCEED, stdout + stderr
 
     @staticmethod
     def _hotpatch_info(base_pkg_hotpatch: str) -> Tuple[bool, dict]:
@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Cost budgets of the CLI operations.
+
+Every operation runs the aops-ceres CLI in a new interpreter with the commands replayed from
+the fixtures directory, and measures:
+
+    processes: processes started for the operation, taken from the command ledger, the
+        commands run by the batch helper are counted too
+    wall_time_ms: wall time of the whole CLI invocation
+    peak_rss_kb: max RSS of the CLI process
+    import_time_ms: time spent importing the CLI before parsing the arguments
+
+The measures are compared to budgets.json, --check exits with 1 if one of them is over its
+budget. The number of processes does not depend on the host, the other budgets have room
+for slower hosts.
+
+Example usage:
+    python3 -m ceres.tests.benchmark.cli_benchmark --iterations 5 --check
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from ceres.function.replay import install_shims
+from ceres.tests.benchmark.replay_benchmark import FIXTURE_DIR, fixture_commands
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budgets.json")
+
+OPERATIONS: Dict[str, List[str]] = {
+    "collect_host": ["collect", "--host", '["os", "cpu", "memory", "disk"]'],
+    "collect_file": ["collect", "--file", '["/etc/os-release", "/etc/passwd"]'],
+    "collect_application": ["collect", "--application"],
+    "collect_all": ["collect", "--all"],
+    "plugin_info": ["plugin", "--info"],
+    "apollo_scan": ["apollo", "--scan", '{"check": false, "check_items": [], "basic": true}'],
+    "apollo_fix": [
+        "apollo",
+        "--fix",
+        '{"check": false, "check_items": [], "cves": [{"cve_id": "CVE-2022-3000", "hotpatch": false}, '
+        '{"cve_id": "CVE-2022-3100", "hotpatch": true}]}',
+    ],
+    "apollo_rollback": ["apollo", "--rollback", '{"cves": [{"cve_id": "CVE-2022-3100", "hotpatch": true}]}'],
+}
+
+# run in the child interpreter: point the agent to the shims, keep the command cache, the host
+# snapshot and the package index in memory, and report the import time and the peak RSS of the CLI
+_RUNNER = """
+import atexit, json, resource, sys, time
+start = time.perf_counter()
+shim_dir, report_file, ledger_file = sys.argv[1:4]
+from ceres.conf import configuration
+configuration.command.update(SHIM_DIR=shim_dir, CACHE_FILE="", SNAPSHOT_FILE="", PACKAGE_INDEX_FILE="", LEDGER_FILE="")
+import ceres.__main__ as cli
+report = {"import_time": time.perf_counter() - start}
+
+def write_report():
+    report["peak_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(report_file, "w") as file:
+        json.dump(report, file)
+
+atexit.register(write_report)
+sys.argv = ["aops-ceres", "--ledger-file", ledger_file] + sys.argv[4:]
+cli.main()
+"""
+
+
+def run_operation(name: str, shim_dir: str, work_dir: str) -> Dict[str, float]:
+    """
+    Run one CLI operation in a new interpreter and measure it.
+
+    Returns:
+        dict: processes, wall_time_ms, peak_rss_kb, import_time_ms and the returncode of the CLI
+    """
+    report_file, ledger_file = os.path.join(work_dir, "report.json"), os.path.join(work_dir, "ledger.jsonl")
+    for path in (report_file, ledger_file):
+        if os.path.exists(path):
+            os.remove(path)
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", _RUNNER, shim_dir, report_file, ledger_file] + OPERATIONS[name],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        check=False,
+    )
+    wall_time = time.perf_counter() - start
+
+    with open(report_file, "r", encoding="utf-8") as file:
+        report = json.load(file)
+    processes = 0
+    if os.path.exists(ledger_file):
+        with open(ledger_file, "r", encoding="utf-8") as file:
+            processes = sum(len(json.loads(line)["argv"]) for line in file if line.strip())
+    return {
+        "processes": processes,
+        "wall_time_ms": round(wall_time * 1000, 1),
+        "peak_rss_kb": report["peak_rss"],
+        "import_time_ms": round(report["import_time"] * 1000, 1),
+        "returncode": result.returncode,
+    }
+
+
+def run_benchmark(operations: List[str], iterations: int, corpus: str = FIXTURE_DIR) -> Dict[str, dict]:
+    """
+    Measure every operation, the median of the iterations is kept for each measure but the
+    returncode, which is the one of the first failed iteration if any failed.
+
+    Returns:
+        dict: operation name -> measures
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="ceres-cli-benchmark-") as work_dir:
+        shim_dir = os.path.join(work_dir, "shims")
+        install_shims(shim_dir, fixture_commands(corpus), "replay", corpus)
+        for name in operations:
+            runs = [run_operation(name, shim_dir, work_dir) for _ in range(iterations)]
+            results[name] = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            results[name]["returncode"] = next((run["returncode"] for run in runs if run["returncode"]), 0)
+    return results
+
+
+def load_budgets(budget_file: str = BUDGET_FILE) -> Dict[str, dict]:
+    with open(budget_file, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def over_budget(results: Dict[str, dict], budgets: Dict[str, dict]) -> List[str]:
+    """
+    Compare the measures to their budgets, an operation which failed is over budget whatever its
+    measures, since a CLI which stops early starts fewer processes.
+
+    Returns:
+        list: e.g ["plugin_info: processes 12 > 10", "host_info: returncode 1 != 0"]
+    """
+    failures = []
+    for name, measures in results.items():
+        if measures["returncode"] != 0:
+            failures.append(f"{name}: returncode {measures['returncode']} != 0")
+        for key, budget in budgets.get(name, {}).items():
+            if measures[key] > budget:
+                failures.append(f"{name}: {key} {measures[key]} > {budget}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="measure the cost of the CLI operations with replayed commands")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--operation", action="append", choices=sorted(OPERATIONS), help="default: all operations")
+    parser.add_argument(
+        "--check", action="store_true", help="exit with 1 if an operation failed or a measure is over its budget"
+    )
+    args = parser.parse_args()
+    results = run_benchmark(args.operation or list(OPERATIONS), args.iterations)
+    print(json.dumps(results, indent=4))
+    if args.check:
+        failures = over_budget(results, load_budgets())
+        for failure in failures:
+            print(f"over budget: {failure}", file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
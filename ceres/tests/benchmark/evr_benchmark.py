@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Benchmark of the batch EVR comparison.
+
+The EVRs of the rpm -qa fixture, repeated --scale times with shifted versions, are compared
+with as many advisory fixed EVRs, every installed package with every advisory:
+
+    reference: rpmvercmp ported to python, called for the version and the release of each pair
+    matrix_cold: compare_evr_matrix with empty parse caches, the EVRs are tokenized first
+    matrix_warm: compare_evr_matrix with the EVRs already in the caches
+
+Example usage:
+    python3 -m ceres.tests.benchmark.evr_benchmark --iterations 5 --scale 4 --advisories 1000
+"""
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ceres.function.evr import compare_evr_matrix, parse_evr, version_key
+from ceres.tests.benchmark.replay_benchmark import FIXTURE_DIR, _summary
+from ceres.tests.benchmark.rpmdb_benchmark import _fixture_packages
+from ceres.tests.function.test_evr import reference_rpmvercmp
+
+Evr = Tuple[int, str, str]
+
+
+def _make_evrs(corpus: str, scale: int, advisories: int) -> Tuple[List[Evr], List[Evr]]:
+    generator = random.Random(2203)
+    installed = []
+    for shift in range(scale):
+        for _, epoch, version, release, _, _ in _fixture_packages(corpus):
+            installed.append((epoch or 0, f"{version}.{shift}", release))
+    fixed = []
+    for _ in range(advisories):
+        version = f"{generator.randint(0, 9)}.{generator.randint(0, 20)}.{generator.randint(0, 9)}"
+        fixed.append((0, version, f"{generator.randint(1, 9)}.oe2203"))
+    return installed, fixed
+
+
+def _reference_matrix(rows: List[Evr], columns: List[Evr]) -> List[List[int]]:
+    matrix = []
+    for row in rows:
+        line = []
+        for column in columns:
+            result = (row[0] > column[0]) - (row[0] < column[0])
+            result = result or reference_rpmvercmp(row[1], column[1]) or reference_rpmvercmp(row[2], column[2])
+            line.append(result)
+        matrix.append(line)
+    return matrix
+
+
+def _clear_caches() -> None:
+    parse_evr.cache_clear()
+    version_key.cache_clear()
+
+
+def _time(
+    func: Callable[[], List[List[int]]], iterations: int, before: Optional[Callable[[], None]] = None
+) -> Dict[str, float]:
+    samples, comparisons = [], 0
+    for _ in range(iterations):
+        if before:
+            before()
+        start = time.perf_counter()
+        comparisons = sum(len(line) for line in func())
+        samples.append((time.perf_counter() - start) * 1000)
+    summary = _summary(samples)
+    return dict(summary, comparisons_per_second=int(comparisons / summary["mean_ms"] * 1000))
+
+
+def run_benchmark(iterations: int, scale: int, advisories: int, corpus: str = FIXTURE_DIR) -> Dict[str, dict]:
+    """
+    Time the reference and the batch comparison of every installed EVR with every advisory EVR.
+
+    Returns:
+        dict: path name -> latency summary and comparisons per second
+    """
+    installed, fixed = _make_evrs(corpus, scale, advisories)
+    if _reference_matrix(installed, fixed) != compare_evr_matrix(installed, fixed):
+        raise AssertionError("the batch comparison differs from rpmvercmp")
+    return {
+        "reference": _time(lambda: _reference_matrix(installed, fixed), 1),
+        "matrix_cold": _time(lambda: compare_evr_matrix(installed, fixed), iterations, _clear_caches),
+        "matrix_warm": _time(lambda: compare_evr_matrix(installed, fixed), iterations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark of the batch EVR comparison")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--scale", type=int, default=4, help="times the fixture packages are installed")
+    parser.add_argument("--advisories", type=int, default=1000, help="number of advisory fixed EVRs")
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.iterations, args.scale, args.advisories), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+End to end benchmark of the managers with the replay harness.
+
+The outputs of dmidecode, lscpu, lsmem, lshw, rpm, systemctl, ps, yum and dnf recorded in
+the fixtures directory are served by replay shims, so the managers run unchanged on a box
+without those commands. The command cache is emptied before every run, so that each run
+executes all of its commands.
+
+Example usage:
+    python3 -m ceres.tests.benchmark.replay_benchmark --iterations 20 --latency 0.01 --jitter 0.005
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+from unittest import mock
+
+from ceres.function.cache import CommandCache
+from ceres.function.replay import install_shims
+from ceres.manages.collect_manage import Collect
+from ceres.manages.plugin_manage import GalaGopher, Plugin
+from ceres.manages.resource_manage import Resource
+from ceres.manages.vulnerability_manage import VulnerabilityManage
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+OPERATIONS: Dict[str, Callable[[], object]] = {
+    "collect_host_info": lambda: Collect().get_host_info([]),
+    "collect_uuid": Collect.get_uuid,
+    "collect_installed_packages": Collect.get_installed_packages,
+    "collect_application_info": Collect.get_application_info,
+    "collect_plugin_info": Collect.get_plugin_info,
+    "plugin_status": lambda: GalaGopher("gala-gopher").get_plugin_status(),
+    "plugin_pid": lambda: Plugin.get_pid("gala-gopher"),
+    "resource_cpu": lambda: Resource.get_current_cpu("gala-gopher", "749"),
+    "cve_scan": lambda: VulnerabilityManage().cve_scan({"basic": True}),
+}
+
+
+def fixture_commands(corpus: str) -> List[str]:
+    """
+    Get the names of the commands recorded in a corpus.
+    """
+    return sorted({name.rsplit("-", 1)[0] for name in os.listdir(corpus) if name.endswith(".json")})
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[max(int(len(samples) * 0.95) - 1, 0)], 3),
+    }
+
+
+def run_benchmark(
+    operations: List[str], iterations: int, corpus: str, latency: float, jitter: float, failure_rate: float
+) -> Dict[str, dict]:
+    """
+    Time every operation with the commands replayed from the corpus.
+
+    Returns:
+        dict: operation name -> latency summary
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="ceres-shims-") as shim_dir:
+        install_shims(shim_dir, fixture_commands(corpus), "replay", corpus, latency, jitter, failure_rate)
+        command_config = {"SHIM_DIR": shim_dir, "SNAPSHOT_FILE": "", "PACKAGE_INDEX_FILE": ""}
+        with mock.patch.dict("ceres.function.spawn.configuration.command", command_config):
+            for name in operations:
+                samples = []
+                for _ in range(iterations):
+                    cache = CommandCache()
+                    with mock.patch("ceres.function.pipeline.COMMAND_CACHE", cache), mock.patch(
+                        "ceres.function.aio.COMMAND_CACHE", cache
+                    ):
+                        start = time.perf_counter()
+                        OPERATIONS[name]()
+                        samples.append((time.perf_counter() - start) * 1000)
+                results[name] = _summary(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="end to end benchmark of the managers with replayed commands")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--corpus", type=str, default=FIXTURE_DIR, help="directory of the fixtures")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every replayed command takes")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum variation of the latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability of an injected failure")
+    parser.add_argument("--operation", action="append", choices=sorted(OPERATIONS), help="default: all operations")
+    args = parser.parse_args()
+    results = run_benchmark(
+        args.operation or list(OPERATIONS), args.iterations, args.corpus, args.latency, args.jitter, args.failure_rate
+    )
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
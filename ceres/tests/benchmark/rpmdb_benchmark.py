@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Benchmark of the sources of the installed packages.
+
+Three paths are timed per invocation:
+
+    rpm_qai: rpm -qai|grep .src.rpm parsed line by line, the path before the rpmdb reader
+    rpm_qa_qf: rpm -qa with a query format, the fallback of the rpmdb reader
+    sqlite: the header blobs of rpmdb.sqlite decoded natively
+
+By default the rpm outputs are replayed from the fixtures directory and the sqlite database
+is generated with the packages of the rpm -qa fixture repeated --scale times, so the paths
+read the same packages. With --host the rpm command and the database of the host are used.
+
+Example usage:
+    python3 -m ceres.tests.benchmark.rpmdb_benchmark --iterations 20 --scale 20
+"""
+import argparse
+import json
+import os
+import shlex
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+from ceres.function.replay import install_shims
+from ceres.function.replay_shim import read_fixture
+from ceres.function.rpmdb import RPM_QUERY_COMMAND, RPMDB_SQLITE_PATHS, query_rpm_packages, read_sqlite_rpmdb
+from ceres.function.util import stream_shell_command
+from ceres.tests.benchmark.replay_benchmark import FIXTURE_DIR, _summary, fixture_commands
+from ceres.tests.function.test_rpmdb import make_sqlite_rpmdb
+
+
+def _legacy_installed_packages() -> list:
+    """
+    the path of Collect.get_installed_packages before the rpmdb reader
+    """
+    packages = {}
+    with stream_shell_command("rpm -qai|grep .src.rpm") as stream:
+        for line in stream:
+            package_info = line.rsplit("-", 2)
+            if len(package_info) == 1:
+                continue
+            package = package_info[0].split(':')[1].strip()
+            pkg_version = f"{package_info[1]}-{package_info[-1].split('.')[0]}"
+            packages.setdefault(package + pkg_version, {"name": package, "version": pkg_version})
+    return list(packages.values())
+
+
+def _fixture_packages(corpus: str) -> List[tuple]:
+    fixture = read_fixture(corpus, shlex.split(RPM_QUERY_COMMAND))
+    packages = []
+    for line in fixture["stdout"].splitlines():
+        name, epoch, version, release, arch, source_rpm = line.split("\t")
+        packages.append((name, int(epoch) if epoch.isdigit() else None, version, release, arch, source_rpm))
+    return packages
+
+
+def _time(func: Callable[[], Optional[list]], iterations: int) -> Dict[str, float]:
+    samples, count = [], 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        count = len(func() or [])
+        samples.append((time.perf_counter() - start) * 1000)
+    return dict(_summary(samples), packages=count)
+
+
+def run_benchmark(iterations: int, scale: int, corpus: str = FIXTURE_DIR, host: bool = False) -> Dict[str, dict]:
+    """
+    Time every source of the installed packages.
+
+    Returns:
+        dict: path name -> latency summary and number of packages read
+    """
+    if host:
+        database = next((path for path in RPMDB_SQLITE_PATHS if os.path.exists(path)), None)
+        return {
+            "rpm_qai": _time(_legacy_installed_packages, iterations),
+            "rpm_qa_qf": _time(query_rpm_packages, iterations),
+            "sqlite": _time(lambda: read_sqlite_rpmdb(database) if database else None, iterations),
+        }
+    with tempfile.TemporaryDirectory(prefix="ceres-rpmdb-") as work_dir:
+        database = os.path.join(work_dir, "rpmdb.sqlite")
+        make_sqlite_rpmdb(database, _fixture_packages(corpus) * scale)
+        shim_dir = os.path.join(work_dir, "shims")
+        install_shims(shim_dir, fixture_commands(corpus), "replay", corpus)
+        with mock.patch.dict("ceres.function.spawn.configuration.command", {"SHIM_DIR": shim_dir}):
+            return {
+                "rpm_qai": _time(_legacy_installed_packages, iterations),
+                "rpm_qa_qf": _time(query_rpm_packages, iterations),
+                "sqlite": _time(lambda: read_sqlite_rpmdb(database), iterations),
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark of the sources of the installed packages")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--scale", type=int, default=1, help="times the fixture packages are put in the database")
+    parser.add_argument("--host", action="store_true", help="read the rpm database of the host")
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.iterations, args.scale, host=args.host), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Benchmark of the process launchers.
+
+The latency of starting and reaping "true" is measured for every launcher while the agent
+holds a ballast of touched memory, so that the cost of copying page tables on fork shows
+up. fork_exec is the path of subprocess on python 3.9, it is the baseline.
+
+Example usage:
+    python3 -m ceres.tests.benchmark.spawn_benchmark --iterations 200 --ballast 0,256
+"""
+import argparse
+import json
+import mmap
+import os
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List
+
+from ceres.function import spawn
+
+LAUNCHERS = ("fork_exec", "popen", "posix_spawn", "fork_server")
+
+
+def _fork_exec(executable: str) -> None:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.execv(executable, [executable])
+        finally:
+            os._exit(127)
+    os.waitpid(pid, 0)
+
+
+def _make_launcher(name: str, executable: str) -> Callable[[], None]:
+    if name == "fork_exec":
+        return lambda: _fork_exec(executable)
+    if name == "popen":
+        return lambda: spawn._popen([executable], subprocess.DEVNULL, subprocess.DEVNULL, subprocess.DEVNULL).wait()
+    if name == "posix_spawn":
+        return lambda: spawn._posix_spawn(
+            [executable], subprocess.DEVNULL, subprocess.DEVNULL, subprocess.DEVNULL
+        ).wait()
+    return lambda: spawn.FORK_SERVER.spawn(
+        [executable], subprocess.DEVNULL, subprocess.DEVNULL, subprocess.DEVNULL
+    ).wait()
+
+
+def _measure(function: Callable[[], None], iterations: int) -> List[float]:
+    function()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _fork_only() -> None:
+    """
+    Fork and exit at once, the time is dominated by copying the page tables.
+    """
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+
+def _page_table_size() -> int:
+    """
+    Get the size of the page tables of this process in KiB.
+    """
+    with open("/proc/self/status", "r", encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("VmPTE:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def run_benchmark(iterations: int, ballasts_mb: List[int], executable: str) -> List[dict]:
+    """
+    Measure every launcher with every ballast size.
+
+    Returns:
+        list: one result per ballast size
+    """
+    results = []
+    for ballast_mb in ballasts_mb:
+        ballast = None
+        if ballast_mb:
+            ballast = mmap.mmap(-1, ballast_mb << 20)
+            for offset in range(0, len(ballast), mmap.PAGESIZE):
+                ballast[offset] = 1
+        result = {
+            "ballast_mb": ballast_mb,
+            "page_table_kb": _page_table_size(),
+            "fork_only": _summary(_measure(_fork_only, iterations)),
+        }
+        for name in LAUNCHERS:
+            result[name] = _summary(_measure(_make_launcher(name, executable), iterations))
+        results.append(result)
+        if ballast is not None:
+            ballast.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark of process launchers")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--ballast", type=str, default="0,256", help="comma separated ballast sizes in MiB")
+    parser.add_argument("--executable", type=str, default=spawn.find_executable("true", os.environ))
+    args = parser.parse_args()
+    ballasts = [int(size) for size in args.ballast.split(",")]
+    print(json.dumps(run_benchmark(args.iterations, ballasts, args.executable), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from ceres.conf.constant import CommandExitCode
+from ceres.function.aio import run_pipeline_async
+from ceres.function.util import async_execute_shell_command
+
+
+class TestAio(unittest.IsolatedAsyncioTestCase):
+    async def test_run_pipeline_async_should_apply_filters_when_they_follow_real_process(self):
+        res = await run_pipeline_async("printf 'a 1\\nb 2\\na 3\\n'|grep a|awk {print$2}")
+        self.assertEqual((0, "1\n3", ""), res)
+
+    async def test_run_pipeline_async_should_connect_real_processes_when_they_are_adjacent(self):
+        res = await run_pipeline_async("printf 'b\\na\\n'|sort|head -n 1")
+        self.assertEqual((0, "a", ""), res)
+
+    async def test_async_execute_shell_command_should_overlap_commands_when_executed_concurrently(self):
+        start = time.monotonic()
+        res = await asyncio.gather(*(async_execute_shell_command("sleep 0.3") for _ in range(3)))
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertEqual([(0, "", "")] * 3, res)
+
+    @mock.patch("ceres.function.aio.configuration")
+    async def test_async_execute_shell_command_should_limit_concurrency_when_limit_is_set(self, mock_config):
+        mock_config.command = {"MAX_CONCURRENCY": 1}
+        start = time.monotonic()
+        await asyncio.gather(*(async_execute_shell_command("sleep 0.2") for _ in range(2)))
+        self.assertGreaterEqual(time.monotonic() - start, 0.4)
+
+    async def test_async_execute_shell_command_should_return_fail_when_command_is_not_found(self):
+        code, stdout, _ = await async_execute_shell_command("mock_command_not_exist")
+        self.assertEqual((CommandExitCode.FAIL, ""), (code, stdout))
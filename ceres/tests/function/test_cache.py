@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from ceres.function.cache import CachePolicy, CommandCache
+from ceres.function.pipeline import run_pipeline
+
+
+class TestCommandCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.tmp_dir, "cache", "command_cache.json")
+        self.cache = CommandCache(self.cache_file)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def test_get_should_return_result_and_count_hit_when_entry_is_valid(self):
+        policy = CachePolicy(ttl=60)
+        self.cache.set(["lscpu"], {}, policy, (0, "mock", ""))
+        self.assertEqual((0, "mock", ""), self.cache.get(["lscpu"], {}, policy))
+        self.assertEqual({"hits": 1, "misses": 0, "entries": 1}, self.cache.stats)
+
+    def test_get_should_return_none_when_ttl_expired(self):
+        policy = CachePolicy(ttl=60)
+        self.cache.set(["lscpu"], {}, policy, (0, "mock", ""))
+        with mock.patch("ceres.function.cache.time.time", return_value=time.time() + 61):
+            self.assertIsNone(self.cache.get(["lscpu"], {}, policy))
+        self.assertEqual(1, self.cache.misses)
+
+    def test_get_should_return_none_when_dependent_file_is_modified(self):
+        repo_dir = os.path.join(self.tmp_dir, "yum.repos.d")
+        os.makedirs(repo_dir)
+        repo_file = os.path.join(repo_dir, "aops.repo")
+        with open(repo_file, "w", encoding="utf-8") as file:
+            file.write("[aops-update]")
+        policy = CachePolicy(ttl=60, depends_on=(repo_dir,))
+        self.cache.set(["yum", "repoinfo"], {}, policy, (0, "mock", ""))
+        os.utime(repo_file, ns=(0, 0))
+        self.assertIsNone(self.cache.get(["yum", "repoinfo"], {}, policy))
+
+    def test_set_should_not_save_result_when_return_code_is_not_cacheable(self):
+        policy = CachePolicy(ttl=60)
+        self.cache.set(["lscpu"], {}, policy, (1, "", "error"))
+        self.assertIsNone(self.cache.get(["lscpu"], {}, policy))
+
+    def test_get_should_return_result_from_file_when_cache_is_created_by_another_process(self):
+        policy = CachePolicy(ttl=60, per_boot=True)
+        self.cache.set(["dmidecode"], {}, policy, (0, "mock", ""))
+        self.cache.set(["lscpu"], {}, policy, (0, "mock", ""))
+        # the file is only written once, when the process exits
+        self.assertFalse(os.path.exists(self.cache_file))
+        self.cache.flush()
+        self.assertEqual((0, "mock", ""), CommandCache(self.cache_file).get(["dmidecode"], {}, policy))
+
+    def test_invalidate_should_drop_entries_of_command_when_entries_exist(self):
+        policy = CachePolicy(ttl=60)
+        self.cache.set(["systemctl", "status", "mock"], {"env": {"LANG": "C"}}, policy, (0, "mock", ""))
+        self.cache.invalidate(["systemctl", "status", "mock"])
+        self.assertIsNone(self.cache.get(["systemctl", "status", "mock"], {"env": {"LANG": "C"}}, policy))
+
+    @mock.patch("ceres.function.pipeline.COMMAND_CACHE")
+    def test_run_pipeline_should_share_first_stage_output_when_filters_differ(self, mock_cache):
+        mock_cache.get.side_effect = [None, (0, "Active: active (running)\nMain PID: 1 (mock)\n", "")]
+        policy = CachePolicy(ttl=60)
+        self.assertEqual((0, "Active: x", ""), run_pipeline("printf 'Active: x\\n'|grep Active", policy))
+        self.assertEqual((0, "Main PID: 1 (mock)", ""), run_pipeline("printf 'Active: x\\n'|grep Main", policy))
+        self.assertEqual(1, mock_cache.set.call_count)
@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import unittest
+
+from ceres.tests.benchmark.cli_benchmark import OPERATIONS, load_budgets, over_budget, run_benchmark
+
+
+class TestCliBudget(unittest.TestCase):
+    def test_cli_operations_should_not_start_more_processes_than_budget_when_commands_are_replayed(self):
+        # only the number of processes is checked here, the times depend on the host
+        budgets = {name: {"processes": budget["processes"]} for name, budget in load_budgets().items()}
+        self.assertEqual(sorted(OPERATIONS), sorted(budgets))
+        results = run_benchmark(list(OPERATIONS), 1)
+        # an operation which crashes early starts fewer processes, it must not pass the budget
+        returncodes = {name: result["returncode"] for name, result in results.items()}
+        self.assertEqual({name: 0 for name in OPERATIONS}, returncodes)
+        self.assertEqual([], over_budget(results, budgets))
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import time
+import unittest
+from unittest import mock
+
+from ceres.conf.constant import CommandExitCode
+from ceres.function.aio import run_pipeline_async
+from ceres.function.deadline import NO_TIMEOUT, budget_share, command_timeout, operation_deadline
+from ceres.function.pipeline import run_pipeline
+
+
+class TestDeadline(unittest.TestCase):
+    @mock.patch("ceres.function.deadline.configuration")
+    def test_command_timeout_should_return_configured_timeout_when_caller_gives_none(self, mock_config):
+        mock_config.command = {"TIMEOUT": 600}
+        self.assertEqual(command_timeout(), 600)
+
+    @mock.patch("ceres.function.deadline.configuration")
+    def test_command_timeout_should_prefer_caller_timeout_when_it_is_longer_than_default(self, mock_config):
+        mock_config.command = {"TIMEOUT": 600}
+        self.assertEqual(command_timeout(3600), 3600)
+
+    @mock.patch("ceres.function.deadline.configuration")
+    def test_command_timeout_should_be_capped_when_operation_budget_is_shorter(self, mock_config):
+        mock_config.command = {"TIMEOUT": 600}
+        with operation_deadline(10):
+            self.assertLessEqual(command_timeout(3600), 10)
+
+    @mock.patch("ceres.function.deadline.configuration")
+    def test_command_timeout_should_not_limit_command_when_caller_gives_no_timeout(self, mock_config):
+        mock_config.command = {"TIMEOUT": 600}
+        self.assertIsNone(command_timeout(NO_TIMEOUT))
+        with operation_deadline(10):
+            self.assertLessEqual(command_timeout(NO_TIMEOUT), 10)
+
+    def test_operation_deadline_should_keep_outer_budget_when_nested_budget_is_longer(self):
+        with operation_deadline(10):
+            with operation_deadline(100) as deadline:
+                self.assertLessEqual(deadline.remaining(), 10)
+
+    def test_budget_share_should_split_remaining_budget_when_operation_is_open(self):
+        self.assertIsNone(budget_share(2))
+        with operation_deadline(10):
+            self.assertLessEqual(budget_share(4), 2.5)
+
+    def test_run_pipeline_should_return_partial_output_when_timeout_expires(self):
+        start = time.monotonic()
+        code, stdout, _ = run_pipeline("sh -c 'echo partial; sleep 30'|cat -n", timeout=0.5)
+        self.assertEqual(code, CommandExitCode.TIMEOUT)
+        self.assertEqual(stdout, "1\tpartial")
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_run_pipeline_should_kill_whole_process_group_when_timeout_expires(self):
+        code, stdout, _ = run_pipeline("sh -c 'sleep 30 & echo $!; wait'", timeout=0.5)
+        self.assertEqual(code, CommandExitCode.TIMEOUT)
+        time.sleep(0.2)
+        self.assertFalse(self._is_running(int(stdout)))
+
+    @staticmethod
+    def _is_running(pid: int) -> bool:
+        try:
+            with open(f"/proc/{pid}/stat", "r", encoding="utf-8") as file:
+                return file.read().rsplit(")", 1)[1].split()[0] != "Z"
+        except FileNotFoundError:
+            return False
+
+    @mock.patch("ceres.function.pipeline.spawn_process")
+    def test_run_pipeline_should_not_start_command_when_deadline_is_exceeded(self, mock_spawn_process):
+        self.assertEqual(run_pipeline("sleep 1", timeout=0)[0], CommandExitCode.TIMEOUT)
+        mock_spawn_process.assert_not_called()
+
+
+class TestAsyncDeadline(unittest.IsolatedAsyncioTestCase):
+    async def test_run_pipeline_async_should_return_partial_output_when_timeout_expires(self):
+        code, stdout, _ = await run_pipeline_async("sh -c 'echo partial; sleep 30'", timeout=0.5)
+        self.assertEqual(code, CommandExitCode.TIMEOUT)
+        self.assertEqual(stdout, "partial")
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import argparse
+import contextlib
+import io
+import json
+import unittest
+from unittest import mock
+
+from ceres.function.command import collect_command_manage
+from ceres.function.delta import make_delta_response, section_hash
+
+
+class TestDelta(unittest.TestCase):
+    def test_section_hash_should_be_equal_when_keys_are_built_in_another_order(self):
+        self.assertEqual(
+            section_hash({"model": "MOCK", "capacity": "40GB", "name": "vda"}),
+            section_hash({"name": "vda", "capacity": "40GB", "model": "MOCK"}),
+        )
+        self.assertNotEqual(section_hash(["vda", "vdb"]), section_hash(["vdb", "vda"]))
+
+    def test_make_delta_response_should_only_keep_changed_sections_when_known_hashes_are_given(self):
+        os_info = {"os_version": "openEuler-22.03-LTS", "kernel": "5.10.0"}
+        disk_info = [{"capacity": "40GB", "name": "vda"}]
+        known_hashes = {"os": section_hash(os_info), "disk": section_hash([]), "unknown": section_hash(None)}
+        response = make_delta_response([("os", os_info), ("disk", disk_info), ("cpu", None)], known_hashes)
+        self.assertEqual(
+            {
+                "os": {"hash": section_hash(os_info), "not_modified": True},
+                "disk": {"hash": section_hash(disk_info), "data": disk_info},
+                "cpu": {"hash": section_hash(None), "data": None},
+            },
+            response,
+        )
+        self.assertEqual(["os", "disk", "cpu"], list(response))
+
+    @mock.patch('ceres.function.command.Collect.collect_file')
+    def test_collect_command_manage_should_make_one_section_per_file_when_known_hashes_are_given(
+        self, mock_collect_file
+    ):
+        hosts_info = {"path": "/etc/hosts", "content": "127.0.0.1 localhost\n"}
+        mock_collect_file.return_value = {
+            "success_files": ["/etc/hosts"],
+            "fail_files": ["/etc/missing"],
+            "infos": [hosts_info],
+        }
+        args = argparse.Namespace(
+            host=None,
+            application=False,
+            all=False,
+            roots=None,
+            file='["/etc/missing", "/etc/hosts"]',
+            known_hashes=json.dumps({"/etc/hosts": section_hash(hosts_info)}),
+        )
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            collect_command_manage(args)
+        self.assertEqual(
+            {
+                "/etc/missing": {"hash": section_hash(None), "data": None},
+                "/etc/hosts": {"hash": section_hash(hosts_info), "not_modified": True},
+            },
+            json.loads(stdout.getvalue()),
+        )
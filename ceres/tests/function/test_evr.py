@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import random
+import unittest
+
+from ceres.function.evr import compare_evr, compare_evr_matrix
+
+
+def reference_rpmvercmp(first: str, second: str) -> int:
+    """
+    line by line port of rpmvercmp of rpm 4.17, the oracle of the comparison keys
+    """
+    if first == second:
+        return 0
+    one, two = 0, 0
+    while one < len(first) or two < len(second):
+        while one < len(first) and not (first[one].isascii() and first[one].isalnum()) and first[one] not in "~^":
+            one += 1
+        while two < len(second) and not (second[two].isascii() and second[two].isalnum()) and second[two] not in "~^":
+            two += 1
+        char_one = first[one] if one < len(first) else ""
+        char_two = second[two] if two < len(second) else ""
+        if "~" in (char_one, char_two):
+            if char_one != "~":
+                return 1
+            if char_two != "~":
+                return -1
+            one, two = one + 1, two + 1
+            continue
+        if "^" in (char_one, char_two):
+            if not char_one:
+                return -1
+            if not char_two:
+                return 1
+            if char_one != "^":
+                return 1
+            if char_two != "^":
+                return -1
+            one, two = one + 1, two + 1
+            continue
+        if not (char_one and char_two):
+            break
+        is_number = char_one.isdigit()
+        matches = str.isdigit if is_number else (lambda char: char.isascii() and char.isalpha())
+        end_one, end_two = one, two
+        while end_one < len(first) and matches(first[end_one]):
+            end_one += 1
+        while end_two < len(second) and matches(second[end_two]):
+            end_two += 1
+        if end_two == two:
+            return 1 if is_number else -1
+        segment_one, segment_two = first[one:end_one], second[two:end_two]
+        if is_number:
+            segment_one, segment_two = segment_one.lstrip("0"), segment_two.lstrip("0")
+            if len(segment_one) != len(segment_two):
+                return 1 if len(segment_one) > len(segment_two) else -1
+        if segment_one != segment_two:
+            return 1 if segment_one > segment_two else -1
+        one, two = end_one, end_two
+    if one >= len(first) and two >= len(second):
+        return 0
+    return -1 if one >= len(first) else 1
+
+
+class TestEvr(unittest.TestCase):
+    def test_compare_evr_should_follow_rpmvercmp_when_versions_come_from_rpm_test_suite(self):
+        cases = [
+            ("1.0", "1.0", 0), ("1.0", "2.0", -1), ("2.0.1", "2.0", 1), ("2.0.1a", "2.0.1", 1),
+            ("5.5p1", "5.5p10", -1), ("10xyz", "10.1xyz", -1), ("xyz10.1", "xyz10", 1), ("1.0aa", "1.0a", 1),
+            ("10b2", "10a1", 1), ("1.0a", "1.0", 1), ("6.0.rc1", "6.0", 1), ("10.0001", "10.1", 0),
+            ("a+", "a_", 0), ("+", "_", 0), ("1.0~rc1", "1.0", -1), ("1.0~rc1", "1.0~rc1~git123", 1),
+            ("1.0^", "1.0", 1), ("1.0^git1", "1.01", -1), ("1.0^git1~pre", "1.0^git1", -1), ("1.0^", "1.0~", 1),
+        ]
+        for first, second, expected in cases:
+            with self.subTest(first=first, second=second):
+                self.assertEqual(expected, compare_evr((None, first, None), (None, second, None)))
+
+    def test_compare_evr_should_match_reference_rpmvercmp_when_versions_are_random(self):
+        generator = random.Random(2203)
+        alphabet = ["0", "1", "2", "01", "10", "a", "b", "rc", "~", "^", ".", "-", "_", "+"]
+        for _ in range(2000):
+            first = "".join(generator.choices(alphabet, k=generator.randint(0, 6))).replace("-", ".")
+            second = "".join(generator.choices(alphabet, k=generator.randint(0, 6))).replace("-", ".")
+            self.assertEqual(reference_rpmvercmp(first, second), compare_evr((0, first, ""), (0, second, "")))
+
+    def test_compare_evr_matrix_should_compare_epoch_first_and_skip_missing_release_when_evrs_are_strings(self):
+        installed = ["5.10.0-60.oe2203", "1:1.1.1f-13.oe2203", "2.4.51-9.oe2203"]
+        fixed = ["5.10.0-136.oe2203", "1.1.1m-2", "2.4.51"]
+        self.assertEqual([[-1, 1, 1], [1, 1, 1], [-1, 1, 0]], compare_evr_matrix(installed, fixed))
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import threading
+import time
+import unittest
+from unittest import mock
+
+from ceres.function.fact_graph import FactDefinition, FactGraph
+
+
+class TestFactGraph(unittest.TestCase):
+    def test_get_many_should_compute_shared_dependency_once_when_facts_are_computed_concurrently(self):
+        calls = []
+        lock = threading.Lock()
+
+        def slow_table():
+            with lock:
+                calls.append("table")
+            time.sleep(0.1)
+            return {"uuid": "3F2C9A1E", "bios": "1.57"}
+
+        graph = FactGraph(
+            {
+                "table": FactDefinition(slow_table),
+                "uuid": FactDefinition(lambda table: table["uuid"], ("table",)),
+                "bios": FactDefinition(lambda table: table["bios"], ("table",)),
+                "lazy": FactDefinition(mock.Mock(return_value="lazy")),
+            }
+        )
+        self.assertEqual({"uuid": "3F2C9A1E", "bios": "1.57"}, graph.get_many(["uuid", "bios"], max_workers=2))
+        self.assertEqual(["table"], calls)
+        graph._definitions["lazy"].func.assert_not_called()
+
+    def test_get_many_should_return_none_for_failed_fact_and_its_dependents_when_fact_raises(self):
+        failing = mock.Mock(side_effect=OSError("mock error"))
+        graph = FactGraph(
+            {
+                "units": FactDefinition(failing),
+                "application": FactDefinition(lambda units: units, ("units",)),
+                "os_version": FactDefinition(lambda: "openEuler-22.03-LTS"),
+            }
+        )
+        self.assertEqual(
+            {"application": None, "units": None, "os_version": "openEuler-22.03-LTS"},
+            graph.get_many(["application", "units", "os_version"], max_workers=1),
+        )
+        failing.assert_called_once()
+
+    def test_fact_graph_should_raise_value_error_when_dependencies_form_a_cycle(self):
+        definitions = {
+            "a": FactDefinition(lambda b: b, ("b",)),
+            "b": FactDefinition(lambda a: a, ("a",)),
+        }
+        with self.assertRaises(ValueError):
+            FactGraph(definitions)
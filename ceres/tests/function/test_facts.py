@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+from ceres.conf.constant import CommandExitCode
+from ceres.function.facts import get_cpu_topology, get_dmi_facts, get_dmi_table, parse_dmi_table, read_os_release
+
+DMIDECODE_OUTPUT = """# dmidecode 3.3
+Getting SMBIOS data from sysfs.
+SMBIOS 3.2.0 present.
+
+Handle 0x0000, DMI type 0, 26 bytes
+BIOS Information
+\tVendor: Huawei Corp.
+\tVersion: 1.57
+\tCharacteristics:
+\t\tPCI is supported
+\t\tUEFI is supported
+\tBIOS Revision: 6.57
+
+Handle 0x0001, DMI type 1, 27 bytes
+System Information
+\tManufacturer: Huawei
+\tUUID: 3F2C9A1E-8B4D-11EC-9A6F-0242AC130003
+
+Handle 0x0014, DMI type 17, 84 bytes
+Memory Device
+\tSize: 32 GB
+
+Handle 0x0015, DMI type 17, 84 bytes
+Memory Device
+\tSize: No Module Installed
+"""
+
+
+def make_cpu_sysfs(cpu_dir: str, sockets: int, cores: int, threads: int) -> None:
+    """
+    Write the topology and caches of cpus whose threads share L1 and L2, and whose sockets share L3
+    """
+    cpu_count = sockets * cores * threads
+    caches = [("1", "Data", "32K"), ("1", "Instruction", "64K"), ("2", "Unified", "512K"), ("3", "Unified", "32768K")]
+    for cpu in range(cpu_count):
+        socket, core = divmod(cpu // threads, cores)
+        files = {"topology/physical_package_id": str(socket), "topology/core_id": str(core)}
+        for index, (level, cache_type, size) in enumerate(caches):
+            first = socket * cores * threads if level == "3" else cpu - cpu % threads
+            last = first + (cores * threads if level == "3" else threads) - 1
+            files.update(
+                {
+                    f"cache/index{index}/level": level,
+                    f"cache/index{index}/type": cache_type,
+                    f"cache/index{index}/size": size,
+                    f"cache/index{index}/shared_cpu_list": f"{first}-{last}",
+                }
+            )
+        for name, content in files.items():
+            path = os.path.join(cpu_dir, f"cpu{cpu}", name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(content + "\n")
+    with open(os.path.join(cpu_dir, "online"), "w", encoding="utf-8") as file:
+        file.write(f"0-{cpu_count - 1}\n")
+
+
+class TestFacts(unittest.TestCase):
+    def test_parse_dmi_table_should_return_records_of_every_structure_when_output_is_correct(self):
+        table = parse_dmi_table(DMIDECODE_OUTPUT)
+        self.assertEqual(["0x0000", "0x0001", "0x0014", "0x0015"], [record.handle for record in table.records])
+        self.assertEqual(["PCI is supported", "UEFI is supported"], table.find(0)[0].fields["Characteristics"])
+        self.assertEqual("6.57", table.value(0, "BIOS Revision"))
+        self.assertEqual(["32 GB", "No Module Installed"], [record.fields["Size"] for record in table.find(17)])
+        self.assertIsNone(table.value(4, "Version"))
+
+    @mock.patch("ceres.function.facts.DMI_TABLES_DIR", "/nonexistent/dmi/tables")
+    @mock.patch("ceres.function.facts.execute_shell_command")
+    def test_get_dmi_facts_should_execute_dmidecode_once_when_some_facts_are_missing_from_sysfs(
+        self, mock_execute_shell_command
+    ):
+        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, DMIDECODE_OUTPUT, ""
+        with tempfile.TemporaryDirectory() as dmi_id_dir:
+            with open(os.path.join(dmi_id_dir, "sys_vendor"), "w", encoding="utf-8") as file:
+                file.write("Huawei Technologies\n")
+            with mock.patch("ceres.function.facts.DMI_ID_DIR", dmi_id_dir):
+                facts = get_dmi_facts(["sys_vendor", "bios_version", "product_uuid", "board_name"])
+        expected_facts = {
+            "sys_vendor": "Huawei Technologies",
+            "bios_version": "1.57",
+            "product_uuid": "3F2C9A1E-8B4D-11EC-9A6F-0242AC130003",
+            "board_name": "",
+        }
+        self.assertEqual(expected_facts, facts)
+        mock_execute_shell_command.assert_called_once()
+
+    def test_read_os_release_should_unquote_values_when_os_release_is_read(self):
+        content = "# comment\nNAME=\"openEuler\"\nVERSION_ID='22.03'\nPRETTY_NAME=\"openEuler 22.03 \\\"LTS\\\"\"\nBAD\n"
+        with tempfile.NamedTemporaryFile("w", suffix="os-release") as file:
+            file.write(content)
+            file.flush()
+            with mock.patch("ceres.function.facts.OS_RELEASE_PATHS", ("/nonexistent/os-release", file.name)):
+                os_release = read_os_release()
+        self.assertEqual(
+            {"NAME": "openEuler", "VERSION_ID": "22.03", "PRETTY_NAME": 'openEuler 22.03 "LTS"'}, os_release
+        )
+
+    def test_get_cpu_topology_should_count_shared_caches_once_when_cpus_share_them(self):
+        with tempfile.TemporaryDirectory() as cpu_dir:
+            make_cpu_sysfs(cpu_dir, sockets=2, cores=4, threads=2)
+            with mock.patch("ceres.function.facts.CPU_SYSFS_DIR", cpu_dir):
+                topology = get_cpu_topology()
+        expected_topology = {
+            "cpus": 16,
+            "sockets": 2,
+            "cores_per_socket": 4,
+            "threads_per_core": 2,
+            "caches": {"L1d": 8 * 32 * 1024, "L1i": 8 * 64 * 1024, "L2": 8 * 512 * 1024, "L3": 2 * 32 * 1024 * 1024},
+        }
+        self.assertEqual(expected_topology, topology)
+
+    @mock.patch("ceres.function.facts.execute_shell_command")
+    def test_get_dmi_table_should_decode_raw_table_when_sysfs_table_is_readable(self, mock_execute_shell_command):
+        def structure(dmi_type: int, handle: int, formatted: bytes, strings: list) -> bytes:
+            header = struct.pack("<BBH", dmi_type, len(formatted) + 4, handle)
+            return header + formatted + b"".join(text + b"\x00" for text in strings) + b"\x00" * (1 if strings else 2)
+
+        uuid = bytes.fromhex("1e9a2c3f4d8bec119a6f0242ac130003")
+        bios = bytes([1, 2, 0, 0, 3, 0]) + bytes(8)
+        system = bytes([1, 2, 0, 0]) + uuid + bytes(3)
+        dimm = bytearray(0x54 - 4)
+        struct.pack_into("<H", dimm, 0x0C - 4, 0x7FFF)
+        struct.pack_into("<I", dimm, 0x1C - 4, 64 * 1024)
+        dimm[0x10 - 4], dimm[0x12 - 4], dimm[0x17 - 4] = 1, 0x22, 2
+        struct.pack_into("<H", dimm, 0x15 - 4, 4800)
+        data = (
+            structure(0, 0, bios, [b"Huawei Corp.", b"1.57", b"06/21/2022"])
+            + structure(1, 1, system, [b"Huawei", b"TaiShan 200"])
+            + structure(17, 0x14, bytes(dimm), [b"DIMM000", b"Samsung "])
+            + structure(17, 0x15, bytes(0x28 - 4), [])
+            + structure(127, 0x7F, b"", [])
+        )
+        with tempfile.TemporaryDirectory() as tables_dir:
+            with open(os.path.join(tables_dir, "smbios_entry_point"), "wb") as file:
+                file.write(b"_SM3_\x00\x18\x03\x02")
+            with open(os.path.join(tables_dir, "DMI"), "wb") as file:
+                file.write(data)
+            with mock.patch("ceres.function.facts.DMI_TABLES_DIR", tables_dir):
+                table = get_dmi_table()
+        self.assertEqual("1.57", table.value(0, "Version"))
+        self.assertEqual("3F2C9A1E-8B4D-11EC-9A6F-0242AC130003", table.value(1, "UUID"))
+        dimms = table.find(17)
+        self.assertEqual(
+            ["64 GB", "DDR5", "4800 MT/s", "Samsung", "DIMM000"],
+            [dimms[0].fields[key] for key in ("Size", "Type", "Speed", "Manufacturer", "Locator")],
+        )
+        self.assertEqual(["No Module Installed", "Not Specified"], [dimms[1].fields["Size"], dimms[1].fields["Manufacturer"]])
+        mock_execute_shell_command.assert_not_called()
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ceres.function.cache import CachePolicy, CommandCache
+from ceres.function.ledger import CommandLedger
+from ceres.function.pipeline import run_pipeline, stream_pipeline
+
+
+class TestCommandLedger(unittest.TestCase):
+    def setUp(self):
+        self.ledger = CommandLedger()
+        patcher = mock.patch("ceres.function.pipeline.COMMAND_LEDGER", self.ledger)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_run_pipeline_should_not_record_command_when_ledger_is_disabled(self):
+        run_pipeline("echo hello")
+        self.assertEqual([], self.ledger.entries)
+
+    def test_run_pipeline_should_record_resource_usage_when_ledger_is_enabled(self):
+        self.ledger.enable()
+        run_pipeline("sh -c 'echo hello; echo oops >&2; exit 3'|grep hello")
+        entry = self.ledger.entries[0]
+        self.assertEqual([["sh", "-c", "echo hello; echo oops >&2; exit 3"]], entry.argv)
+        self.assertEqual((0, 5, 0), (entry.returncode, entry.stdout_bytes, entry.stderr_bytes))
+        self.assertIsNotNone(entry.user_time)
+        self.assertGreater(entry.max_rss, 0)
+
+    def test_run_pipeline_should_record_cached_command_without_process_when_cache_is_hit(self):
+        self.ledger.enable()
+        with mock.patch("ceres.function.pipeline.COMMAND_CACHE", CommandCache()):
+            run_pipeline("echo hello", cache=CachePolicy(ttl=60))
+            run_pipeline("echo hello", cache=CachePolicy(ttl=60))
+        first, second = self.ledger.entries
+        self.assertEqual((False, [["echo", "hello"]]), (first.cached, first.argv))
+        self.assertEqual((True, [], None), (second.cached, second.argv, second.max_rss))
+
+    def test_stream_pipeline_should_record_streamed_bytes_when_stream_is_exhausted(self):
+        self.ledger.enable()
+        with stream_pipeline("seq 1 3") as stream:
+            list(stream)
+        self.assertEqual(6, self.ledger.entries[0].stdout_bytes)
+
+    def test_record_should_append_json_line_when_ledger_file_is_set(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ledger_file = os.path.join(tmp_dir, "ledger.log")
+            self.ledger.enable(ledger_file)
+            run_pipeline("echo hello")
+            run_pipeline("echo world")
+            with open(ledger_file, "r", encoding="utf-8") as file:
+                entries = [json.loads(line) for line in file]
+        self.assertEqual(["echo hello", "echo world"], [entry["command"] for entry in entries])
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ceres.function.package_index import PackageIndex, diff_packages
+
+KERNEL_OLD = {"name": "kernel", "version": "5.10.0-60"}
+KERNEL_NEW = {"name": "kernel", "version": "5.10.0-136"}
+BASH = {"name": "bash", "version": "5.1.8-6"}
+NGINX = {"name": "nginx", "version": "1.21.5-2"}
+
+
+class TestPackageIndex(unittest.TestCase):
+    def test_diff_packages_should_report_replaced_version_as_upgrade_when_package_name_is_kept(self):
+        self.assertEqual(
+            {
+                "added": [NGINX],
+                "removed": [BASH],
+                "upgraded": [{"name": "kernel", "version": "5.10.0-136", "previous_version": "5.10.0-60"}],
+            },
+            diff_packages([BASH, KERNEL_OLD], [KERNEL_NEW, NGINX]),
+        )
+
+    def test_refresh_should_not_query_packages_when_rpmdb_fingerprint_is_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index_file = os.path.join(tmp_dir, "index.json")
+            package_index = PackageIndex(index_file)
+            self.assertTrue(package_index.refresh([["rpmdb.sqlite", 1, 1]], lambda: [BASH]))
+            package_index.save()
+
+            mock_query_packages = mock.Mock(return_value=[NGINX])
+            package_index = PackageIndex(index_file)
+            self.assertTrue(package_index.refresh([["rpmdb.sqlite", 1, 1]], mock_query_packages))
+            self.assertEqual([BASH], package_index.get_packages())
+            mock_query_packages.assert_not_called()
+
+    def test_get_changes_should_merge_the_changes_of_every_generation_when_generation_is_kept(self):
+        package_index = PackageIndex(None)
+        package_index.refresh([1], lambda: [BASH, KERNEL_OLD])
+        first_generation = package_index.generation
+        package_index.refresh([2], lambda: [BASH, KERNEL_NEW])
+        package_index.refresh([3], lambda: [BASH, KERNEL_NEW])
+        package_index.refresh([4], lambda: [KERNEL_NEW, NGINX])
+
+        self.assertEqual(first_generation + 2, package_index.generation)
+        self.assertEqual(
+            {
+                "added": [NGINX],
+                "removed": [BASH],
+                "upgraded": [{"name": "kernel", "version": "5.10.0-136", "previous_version": "5.10.0-60"}],
+            },
+            package_index.get_changes(first_generation),
+        )
+        no_changes = {"added": [], "removed": [], "upgraded": []}
+        self.assertEqual(no_changes, package_index.get_changes(package_index.generation))
+        self.assertIsNone(package_index.get_changes(first_generation - 1))
+        self.assertIsNone(package_index.get_changes(package_index.generation + 1))
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ceres.function.perf_facts import (
+    format_cpu_list,
+    get_cpufreq_policies,
+    get_hugepage_pools,
+    get_io_schedulers,
+    get_nic_irq_affinity,
+    get_numa_nodes,
+    get_transparent_hugepage,
+)
+
+
+def write_files(root: str, files: dict) -> None:
+    for name, content in files.items():
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content + "\n")
+
+
+class TestPerfFacts(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = temp_dir.name
+
+    def test_format_cpu_list_should_merge_consecutive_cpus_when_cpus_are_unordered(self):
+        self.assertEqual("0-3,8,10-11", format_cpu_list([11, 2, 0, 1, 3, 8, 10, 3]))
+        self.assertEqual("", format_cpu_list([]))
+
+    def test_get_perf_facts_should_read_selected_values_when_sysfs_is_readable(self):
+        write_files(
+            self.root,
+            {
+                "node/node1/cpulist": "32-63",
+                "node/node1/meminfo": "Node 1 MemTotal:       263700292 kB\nNode 1 MemFree: 1 kB",
+                "node/node0/cpulist": "0-31",
+                "node/node0/meminfo": "Node 0 MemTotal:       263700292 kB",
+                "node/possible": "0-1",
+                "thp/enabled": "always [madvise] never",
+                "thp/defrag": "always defer defer+madvise madvise [never]",
+                "hugepages/hugepages-2048kB/nr_hugepages": "1024",
+                "hugepages/hugepages-2048kB/free_hugepages": "1000",
+                "cpu/cpufreq/policy0/related_cpus": "0 1 2 3",
+                "cpu/cpufreq/policy0/scaling_governor": "performance",
+                "cpu/cpufreq/policy0/scaling_min_freq": "1000000",
+                "cpu/cpufreq/policy0/scaling_max_freq": "2600000",
+            },
+        )
+        with mock.patch("ceres.function.perf_facts.NODE_SYSFS_DIR", os.path.join(self.root, "node")), mock.patch(
+            "ceres.function.perf_facts.THP_SYSFS_DIR", os.path.join(self.root, "thp")
+        ), mock.patch(
+            "ceres.function.perf_facts.HUGEPAGES_SYSFS_DIR", os.path.join(self.root, "hugepages")
+        ), mock.patch(
+            "ceres.function.facts.CPU_SYSFS_DIR", os.path.join(self.root, "cpu")
+        ):
+            self.assertEqual(
+                [
+                    {"node": 0, "cpus": "0-31", "memory": 263700292 * 1024},
+                    {"node": 1, "cpus": "32-63", "memory": 263700292 * 1024},
+                ],
+                get_numa_nodes(),
+            )
+            self.assertEqual({"enabled": "madvise", "defrag": "never"}, get_transparent_hugepage())
+            self.assertEqual([{"size": 2 * 1024 * 1024, "total": 1024, "free": 1000}], get_hugepage_pools())
+            self.assertEqual(
+                [{"policy": 0, "cpus": "0-3", "governor": "performance", "min_freq": 1000000, "max_freq": 2600000}],
+                get_cpufreq_policies(),
+            )
+
+    def test_get_io_schedulers_and_nic_irq_affinity_should_skip_virtual_devices_when_they_are_listed(self):
+        devices = os.path.join(self.root, "devices")
+        write_files(
+            devices,
+            {
+                "pci0000:00/0000:00:01.0/queue/scheduler": "none [mq-deadline] kyber",
+                "pci0000:00/0000:00:02.0/queue/scheduler": "none",
+                "virtual/block/loop0/queue/scheduler": "[none]",
+                "pci0000:00/0000:00:03.0/msi_irqs/40": "msix",
+                "pci0000:00/0000:00:03.0/msi_irqs/41": "msix",
+                "pci0000:00/0000:00:04.0/virtio3/features": "1",
+                "pci0000:00/0000:00:04.0/irq": "11",
+            },
+        )
+        write_files(
+            self.root,
+            {"irq/40/smp_affinity_list": "0-1", "irq/41/smp_affinity_list": "4", "irq/11/smp_affinity_list": "0-7"},
+        )
+        links = {
+            "block/sda": "pci0000:00/0000:00:01.0",
+            "block/nvme0n1": "pci0000:00/0000:00:02.0",
+            "block/loop0": "virtual/block/loop0",
+            "net/eth0/device": "pci0000:00/0000:00:03.0",
+            "net/eth1/device": "pci0000:00/0000:00:04.0/virtio3",
+        }
+        for link, target in links.items():
+            os.makedirs(os.path.dirname(os.path.join(self.root, link)), exist_ok=True)
+            os.symlink(os.path.join(devices, target), os.path.join(self.root, link))
+        os.makedirs(os.path.join(self.root, "net", "lo"))
+        with mock.patch("ceres.function.facts.BLOCK_SYSFS_DIR", os.path.join(self.root, "block")), mock.patch(
+            "ceres.function.perf_facts.NET_SYSFS_DIR", os.path.join(self.root, "net")
+        ), mock.patch("ceres.function.perf_facts.IRQ_PROC_DIR", os.path.join(self.root, "irq")):
+            self.assertEqual({"nvme0n1": "none", "sda": "mq-deadline"}, get_io_schedulers())
+            self.assertEqual(
+                [{"name": "eth0", "irqs": 2, "cpus": "0-1,4"}, {"name": "eth1", "irqs": 1, "cpus": "0-7"}],
+                get_nic_irq_affinity(),
+            )
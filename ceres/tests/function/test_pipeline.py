@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from ceres.conf.constant import CommandExitCode
+from ceres.function.pipeline import (
+    AwkPrintFilter,
+    GrepFilter,
+    LineCountFilter,
+    PipelineError,
+    build_filter,
+    read_source_files,
+    run_batch,
+    run_pipeline,
+    stream_pipeline,
+)
+from ceres.function.spawn import spawn_process
+
+
+class TestPipeline(unittest.TestCase):
+    def test_build_filter_should_return_grep_filter_when_stage_is_simple_grep(self):
+        self.assertIsInstance(build_filter(["grep", "-w", "nginx"]), GrepFilter)
+
+    def test_build_filter_should_return_none_when_grep_has_unsupported_option(self):
+        self.assertIsNone(build_filter(["grep", "-E", "a|b"]))
+
+    def test_build_filter_should_return_none_when_grep_pattern_has_bracket_expression(self):
+        self.assertIsNone(build_filter(["grep", "[[:digit:]]"]))
+
+    def test_build_filter_should_return_awk_filter_when_stage_prints_field(self):
+        self.assertIsInstance(build_filter(["awk", "{print$3}"]), AwkPrintFilter)
+
+    def test_build_filter_should_return_none_when_awk_program_is_not_print_field(self):
+        self.assertIsNone(build_filter(["awk", "{sum+=$1} END {print sum}"]))
+
+    def test_build_filter_should_return_line_count_filter_when_stage_is_wc_l(self):
+        self.assertIsInstance(build_filter(["wc", "-l"]), LineCountFilter)
+
+    def test_grep_filter_should_match_whole_word_when_word_option_is_set(self):
+        grep = GrepFilter("nginx", word=True)
+        res = list(grep(["nginx: master\n", "nginx-agent\n", "mynginx\n"]))
+        self.assertEqual(["nginx: master\n", "nginx-agent\n"], res)
+        self.assertEqual(0, grep.returncode)
+
+    def test_grep_filter_should_return_code_1_when_no_line_is_matched(self):
+        grep = GrepFilter("Active")
+        self.assertEqual([], list(grep(["Loaded: loaded\n"])))
+        self.assertEqual(1, grep.returncode)
+
+    def test_awk_filter_should_print_empty_line_when_field_is_out_of_range(self):
+        self.assertEqual(["b\n", "\n"], list(AwkPrintFilter([2])(["  a   b c\n", "a\n"])))
+
+    def test_read_source_files_should_return_none_when_file_is_not_found(self):
+        self.assertIsNone(read_source_files(["cat", "/mock/not/exist"]))
+
+    @mock.patch("ceres.function.pipeline.spawn_process")
+    def test_run_pipeline_should_not_fork_when_all_stages_can_be_emulated(self, mock_spawn_process):
+        with tempfile.NamedTemporaryFile("w", delete=False) as file:
+            file.write("Name:\tmock\nVmRSS:\t  1024 kB\n")
+        try:
+            res = run_pipeline(f"cat {file.name}|grep VmRSS")
+        finally:
+            os.remove(file.name)
+        mock_spawn_process.assert_not_called()
+        self.assertEqual((0, "VmRSS:\t  1024 kB", ""), res)
+
+    def test_run_pipeline_should_return_same_result_as_shell_when_filters_follow_real_process(self):
+        command = "printf 'a 1\\nb 2\\na 3\\n'|grep a|awk '{print$2}'"
+        expected = subprocess.run(command, shell=True, capture_output=True, encoding="utf-8")
+        self.assertEqual((expected.returncode, expected.stdout.strip(), ""), run_pipeline(command))
+
+    def test_run_pipeline_should_feed_real_process_when_it_follows_a_filter(self):
+        self.assertEqual((0, "a 1\na 3", ""), run_pipeline("printf 'a 3\\nb 2\\na 1\\n'|grep a|sort"))
+
+    def test_run_pipeline_should_return_stderr_of_last_process_when_command_failed(self):
+        code, stdout, stderr = run_pipeline("ls /mock/not/exist")
+        self.assertNotEqual(0, code)
+        self.assertEqual("", stdout)
+        self.assertIn("/mock/not/exist", stderr)
+
+    def test_run_pipeline_should_raise_error_with_partial_stdout_when_output_is_not_utf8(self):
+        with self.assertRaises(PipelineError) as context:
+            run_pipeline("sh -c \"printf 'ok\\n'; sleep 0.2; printf 'bad \\377\\n'\"|grep o")
+        self.assertEqual("ok\n", context.exception.stdout)
+
+
+class TestStreamPipeline(unittest.TestCase):
+    def test_stream_pipeline_should_yield_lines_without_ending_when_command_succeed(self):
+        with stream_pipeline("seq 1 3") as stream:
+            self.assertEqual(["1", "2", "3"], list(stream))
+        self.assertEqual(0, stream.returncode)
+
+    def test_stream_pipeline_should_apply_filters_when_they_follow_real_process(self):
+        with stream_pipeline("seq 1 12|grep 1") as stream:
+            self.assertEqual(["1", "10", "11", "12"], list(stream))
+        self.assertEqual(0, stream.returncode)
+
+    def test_stream_pipeline_should_return_stderr_of_last_process_when_command_failed(self):
+        with stream_pipeline("sh -c 'echo out; echo err >&2; exit 3'") as stream:
+            self.assertEqual(["out"], list(stream))
+        self.assertEqual((3, "err"), (stream.returncode, stream.stderr))
+
+    def test_stream_pipeline_should_kill_command_when_stream_is_closed_early(self):
+        stream = stream_pipeline("seq 1 100000000")
+        self.assertEqual("1", next(stream))
+        stream.close()
+        self.assertLess(stream.returncode, 0)
+
+    def test_stream_pipeline_should_reap_processes_when_stream_ending_with_filter_is_closed_unread(self):
+        processes = []
+
+        def spawn(*args, **kwargs):
+            processes.append(spawn_process(*args, **kwargs))
+            return processes[-1]
+
+        with mock.patch("ceres.function.pipeline.spawn_process", side_effect=spawn):
+            stream = stream_pipeline("seq 1 100000000|grep 1")
+        stream.close()
+        self.assertEqual(1, len(processes))
+        self.assertLess(processes[0].returncode, 0)
+
+class TestRunBatch(unittest.TestCase):
+    def test_run_batch_should_return_same_results_as_run_pipeline_when_commands_are_independent(self):
+        commands = [
+            "sh -c 'echo out; echo err >&2; exit 3'",
+            "printf 'a\\nb\\n'|grep b",
+            "sh -c 'printf no-newline'",
+            "true",
+        ]
+        self.assertEqual([run_pipeline(command) for command in commands], run_batch(commands))
+
+    @mock.patch("ceres.function.pipeline.spawn_process", wraps=spawn_process)
+    def test_run_batch_should_start_one_process_when_several_commands_need_a_process(self, mock_spawn_process):
+        results = run_batch(["echo a", "echo b", "echo c"])
+        self.assertEqual([(0, "a", ""), (0, "b", ""), (0, "c", "")], results)
+        self.assertEqual(1, mock_spawn_process.call_count)
+
+    def test_run_batch_should_return_fail_only_for_missing_command_when_command_is_not_found(self):
+        results = run_batch(["echo a", "ceres-command-which-does-not-exist", "echo b"])
+        self.assertEqual([(0, "a", ""), (0, "b", "")], [results[0], results[2]])
+        self.assertEqual(CommandExitCode.FAIL, results[1][0])
+
+    def test_run_batch_should_keep_finished_results_when_timeout_expired(self):
+        results = run_batch(["echo a", "sh -c 'echo partial; sleep 10'", "echo b"], timeout=0.5)
+        self.assertEqual(
+            [(0, "a", ""), (CommandExitCode.TIMEOUT, "partial", ""), (CommandExitCode.TIMEOUT, "", "deadline exceeded")],
+            results,
+        )
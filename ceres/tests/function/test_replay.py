@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from ceres.function.replay import install_shims
+from ceres.function.replay_shim import MISSING_FIXTURE_CODE, read_fixture, write_fixture
+from ceres.function.util import execute_shell_command, execute_shell_commands
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.shim_dir = os.path.join(temp_dir.name, "shims")
+        self.corpus = os.path.join(temp_dir.name, "fixtures")
+        patcher = mock.patch.dict("ceres.function.spawn.configuration.command", {"SHIM_DIR": self.shim_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_record_shim_should_save_output_of_real_command_when_command_is_executed(self):
+        install_shims(self.shim_dir, ["uname"], "record", self.corpus)
+        result = execute_shell_command("uname -s")
+        fixture = read_fixture(self.corpus, ["uname", "-s"])
+        self.assertEqual((0, os.uname().sysname, ""), result)
+        self.assertEqual(
+            {"argv": ["uname", "-s"], "returncode": 0, "stdout": os.uname().sysname + "\n", "stderr": ""}, fixture
+        )
+
+    def test_replay_shim_should_serve_recorded_output_when_command_is_executed(self):
+        write_fixture(self.corpus, ["dmidecode", "-t", "bios"], 0, b"Version: 1.0\n", b"")
+        write_fixture(self.corpus, ["lsmem"], 1, b"", b"lsmem: failed\n")
+        install_shims(self.shim_dir, ["dmidecode", "lsmem"], "replay", self.corpus)
+        self.assertEqual(
+            [(0, "Version: 1.0", ""), (1, "", "lsmem: failed")],
+            execute_shell_commands(["dmidecode -t bios|grep Version", "lsmem"]),
+        )
+
+    def test_replay_shim_should_return_127_when_command_is_not_recorded(self):
+        install_shims(self.shim_dir, ["dmidecode"], "replay", self.corpus)
+        code, _, stderr = execute_shell_command("dmidecode -t memory")
+        self.assertEqual(MISSING_FIXTURE_CODE, code)
+        self.assertIn("no recording", stderr)
+
+    def test_replay_shim_should_inject_failure_and_latency_when_they_are_configured(self):
+        write_fixture(self.corpus, ["dnf", "hotpatch", "--list", "cves"], 0, b"CVE-2023-1\n", b"")
+        install_shims(
+            self.shim_dir, ["dnf"], "replay", self.corpus, latency=0.3, failure_rate=1, failure_code=3
+        )
+        start = time.monotonic()
+        result = execute_shell_command("dnf hotpatch --list cves")
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+        self.assertEqual((3, "", "dnf: injected failure"), result)
+
+    def test_install_shims_should_raise_value_error_when_mode_is_unknown(self):
+        with self.assertRaises(ValueError):
+            install_shims(self.shim_dir, ["dnf"], "mock", self.corpus)
@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import os
+import sqlite3
+import struct
+import tempfile
+import unittest
+from typing import List, Optional, Tuple
+from unittest import mock
+
+from ceres.conf.constant import CommandExitCode
+from ceres.function.pipeline import CommandStream
+from ceres.function.rpmdb import RpmPackage, get_installed_rpm_packages, parse_header_blob, read_sqlite_rpmdb
+
+
+def make_header_blob(name: str, epoch: Optional[int], version: str, release: str, arch: str, source_rpm: str) -> bytes:
+    """
+    Build the header blob of a package as rpm saves it, with a string array tag the reader must skip
+    """
+    entries = [(1000, 6, name), (1001, 6, version), (1002, 6, release), (1022, 6, arch), (1118, 8, "/usr/bin")]
+    if epoch is not None:
+        entries.append((1003, 4, epoch))
+    if source_rpm:
+        entries.append((1044, 6, source_rpm))
+    index, data = b"", b""
+    for tag, tag_type, value in entries:
+        if tag_type == 4:
+            data += b"\x00" * (-len(data) % 4)
+            index += struct.pack(">iiii", tag, tag_type, len(data), 1)
+            data += struct.pack(">i", value)
+        else:
+            index += struct.pack(">iiii", tag, tag_type, len(data), 1)
+            data += value.encode() + b"\x00"
+    return struct.pack(">ii", len(entries), len(data)) + index + data
+
+
+def make_sqlite_rpmdb(path: str, packages: List[Tuple]) -> None:
+    """
+    Write a sqlite rpm database with the Packages table of rpm 4.16
+    """
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("CREATE TABLE Packages (hnum INTEGER PRIMARY KEY AUTOINCREMENT, blob BLOB NOT NULL)")
+        blobs = [(make_header_blob(*package),) for package in packages]
+        connection.executemany("INSERT INTO Packages (blob) VALUES (?)", blobs)
+    connection.close()
+
+
+class TestRpmdb(unittest.TestCase):
+    def test_parse_header_blob_should_raise_value_error_when_blob_is_truncated(self):
+        blob = make_header_blob("bash", None, "5.1.8", "6.oe2203", "x86_64", "bash-5.1.8-6.oe2203.src.rpm")
+        self.assertEqual("bash-5.1.8-6.oe2203.src.rpm", parse_header_blob(blob)[1044])
+        with self.assertRaises(ValueError):
+            parse_header_blob(blob[:-10])
+
+    @mock.patch("ceres.function.rpmdb.stream_shell_command")
+    def test_get_installed_rpm_packages_should_read_sqlite_database_when_it_exists(self, mock_stream_shell_command):
+        with tempfile.TemporaryDirectory() as rpm_dir:
+            path = os.path.join(rpm_dir, "rpmdb.sqlite")
+            make_sqlite_rpmdb(
+                path,
+                [
+                    ("bash", None, "5.1.8", "6.oe2203", "x86_64", "bash-5.1.8-6.oe2203.src.rpm"),
+                    ("python3-dnf", 1, "4.14.0", "9.oe2203", "noarch", "dnf-4.14.0-9.oe2203.src.rpm"),
+                    ("gpg-pubkey", None, "b25e7f66", "5f9c5ba8", "(none)", ""),
+                ],
+            )
+            with mock.patch("ceres.function.rpmdb.RPMDB_SQLITE_PATHS", ("/nonexistent/rpmdb.sqlite", path)):
+                packages = get_installed_rpm_packages()
+        self.assertEqual(
+            [
+                RpmPackage("bash", None, "5.1.8", "6.oe2203", "x86_64", "bash", "bash-5.1.8-6.oe2203.src.rpm"),
+                RpmPackage("python3-dnf", 1, "4.14.0", "9.oe2203", "noarch", "dnf", "dnf-4.14.0-9.oe2203.src.rpm"),
+                RpmPackage("gpg-pubkey", None, "b25e7f66", "5f9c5ba8", "(none)", None, None),
+            ],
+            packages,
+        )
+        mock_stream_shell_command.assert_not_called()
+
+    def test_read_sqlite_rpmdb_should_read_database_when_path_contains_uri_characters(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "merged #1?mode=rw%20", "rpmdb.sqlite")
+            os.makedirs(os.path.dirname(path))
+            make_sqlite_rpmdb(path, [("bash", None, "5.1.8", "6.oe2203", "x86_64", "bash-5.1.8-6.oe2203.src.rpm")])
+            packages = read_sqlite_rpmdb(path)
+        self.assertEqual(
+            [RpmPackage("bash", None, "5.1.8", "6.oe2203", "x86_64", "bash", "bash-5.1.8-6.oe2203.src.rpm")], packages
+        )
+
+    @mock.patch("ceres.function.rpmdb.stream_shell_command")
+    def test_get_installed_rpm_packages_should_query_rpm_when_database_is_not_sqlite(self, mock_stream_shell_command):
+        mock_stream_shell_command.return_value = CommandStream.from_output(
+            CommandExitCode.SUCCEED, "bash\t(none)\t5.1.8\t6.oe2203\tx86_64\tbash-5.1.8-6.oe2203.src.rpm\n"
+        )
+        with tempfile.NamedTemporaryFile(suffix="Packages") as berkeley_db:
+            berkeley_db.write(b"\x00\x06\x15\x61" * 256)
+            berkeley_db.flush()
+            with mock.patch("ceres.function.rpmdb.RPMDB_SQLITE_PATHS", (berkeley_db.name,)):
+                packages = get_installed_rpm_packages()
+        self.assertEqual(
+            [RpmPackage("bash", None, "5.1.8", "6.oe2203", "x86_64", "bash", "bash-5.1.8-6.oe2203.src.rpm")], packages
+        )
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import os
+import subprocess
+import unittest
+from unittest import mock
+
+from ceres.conf.constant import CommandExitCode
+from ceres.function.pipeline import run_pipeline
+from ceres.function.spawn import PopenProcess, spawn_process
+
+
+class TestSpawnProcess(unittest.TestCase):
+    def _run(self, spawner: str, argv: list, **kwargs):
+        read_fd, write_fd = os.pipe()
+        with mock.patch.dict("ceres.function.spawn.configuration.command", {"SPAWNER": spawner}):
+            process = spawn_process(argv, subprocess.DEVNULL, write_fd, subprocess.DEVNULL, **kwargs)
+        os.close(write_fd)
+        with open(read_fd, "r", encoding="utf-8") as file:
+            output = file.read()
+        return process, process.wait(), output
+
+    def test_spawn_process_should_run_child_in_own_process_group_when_spawner_is_posix_spawn(self):
+        process, returncode, output = self._run("posix_spawn", ["sh", "-c", "ps -o pgid= -p $$"])
+        self.assertEqual((returncode, output.strip()), (CommandExitCode.SUCCEED, str(process.pid)))
+        self.assertIsNotNone(process.rusage)
+
+    def test_spawn_process_should_run_child_in_own_process_group_when_spawner_is_fork_server(self):
+        process, returncode, output = self._run("fork_server", ["sh", "-c", "ps -o pgid= -p $$; exit 3"])
+        self.assertEqual((returncode, output.strip()), (3, str(process.pid)))
+        self.assertIsNotNone(process.rusage)
+
+    def test_spawn_process_should_change_directory_when_cwd_is_given_to_fork_server(self):
+        _, _, output = self._run("fork_server", ["pwd"], cwd="/")
+        self.assertEqual(output.strip(), "/")
+
+    def test_spawn_process_should_only_pass_stdio_when_spawner_is_fork_server(self):
+        _, returncode, output = self._run("fork_server", ["sh", "-c", "ls /proc/$$/fd"])
+        self.assertEqual((returncode, sorted(output.split())), (CommandExitCode.SUCCEED, ["0", "1", "2"]))
+
+    def test_spawn_process_should_fall_back_to_popen_when_cwd_is_given_to_posix_spawn(self):
+        process, _, output = self._run("posix_spawn", ["pwd"], cwd="/")
+        self.assertIsInstance(process, PopenProcess)
+        self.assertEqual(output.strip(), "/")
+
+    def test_spawn_process_should_raise_file_not_found_when_command_does_not_exist(self):
+        for spawner in ("posix_spawn", "fork_server", "popen"):
+            with self.subTest(spawner=spawner):
+                with self.assertRaises(FileNotFoundError):
+                    self._run(spawner, ["ceres-command-which-does-not-exist"])
+
+    def test_run_pipeline_should_return_same_result_when_spawner_changes(self):
+        results = []
+        for spawner in ("posix_spawn", "fork_server", "popen"):
+            with mock.patch.dict("ceres.function.spawn.configuration.command", {"SPAWNER": spawner}):
+                results.append(run_pipeline("sh -c 'echo a; echo b; echo c >&2; exit 1' | grep b"))
+        self.assertEqual(results, [(CommandExitCode.SUCCEED, "b", "")] * 3)
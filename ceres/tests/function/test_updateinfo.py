@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ceres.function.rpmdb import RpmPackage
+from ceres.function.updateinfo import load_advisories, match_advisories
+
+UPDATEINFO = """<?xml version="1.0" encoding="UTF-8"?>
+<updates>
+  <update from="openeuler.org" type="security" status="stable">
+    <id>openEuler-SA-2022-1001</id>
+    <references><reference href="" id="CVE-2022-3080" title="CVE-2022-3080" type="cve"/></references>
+    <pkglist><collection>
+      <package name="bind-libs" version="9.16.23" release="11.oe2203" epoch="32" arch="aarch64"/>
+      <package name="bind" version="9.16.23" release="11.oe2203" epoch="32" arch="src"/>
+    </collection></pkglist>
+  </update>
+  <update from="openeuler.org" type="security" status="stable">
+    <id>openEuler-SA-2022-1002</id>
+    <references>
+      <reference href="" id="CVE-2022-2602" type="cve"/><reference href="" id="CVE-2022-2978" type="cve"/>
+    </references>
+    <pkglist><collection>
+      <package name="kernel" version="5.10.0" release="106.18.0.68.oe2203" epoch="0" arch="aarch64"/>
+    </collection></pkglist>
+  </update>
+  <update from="openeuler.org" type="bugfix" status="stable">
+    <id>openEuler-BA-2022-1003</id>
+    <pkglist><collection>
+      <package name="bash" version="5.1.8" release="7.oe2203" epoch="0" arch="aarch64"/>
+    </collection></pkglist>
+  </update>
+</updates>
+"""
+
+
+class TestUpdateinfo(unittest.TestCase):
+    def test_load_advisories_should_parse_cached_updateinfo_once_when_repo_metadata_is_cached(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            repodata_dir = os.path.join(cache_dir, "aops-update-f9a1b7c2a0d35b13", "repodata")
+            os.makedirs(repodata_dir)
+            with gzip.open(os.path.join(repodata_dir, "0a1b2c-updateinfo.xml.gz"), "wt") as file:
+                file.write(UPDATEINFO)
+            with mock.patch("ceres.function.updateinfo.DNF_CACHE_DIR", cache_dir), mock.patch(
+                "ceres.function.updateinfo.execute_shell_command"
+            ) as mock_execute_shell_command:
+                advisories = load_advisories("aops-update")
+                self.assertIs(advisories, load_advisories("aops-update"))
+        mock_execute_shell_command.assert_not_called()
+        self.assertEqual(
+            {
+                ("bind-libs", "aarch64"): [((32, "9.16.23", "11.oe2203"), ("CVE-2022-3080",))],
+                ("kernel", "aarch64"): [((0, "5.10.0", "106.18.0.68.oe2203"), ("CVE-2022-2602", "CVE-2022-2978"))],
+            },
+            advisories,
+        )
+
+    def test_match_advisories_should_compare_newest_installed_version_when_several_are_installed(self):
+        advisories = {
+            ("bind-libs", "aarch64"): [((32, "9.16.23", "11.oe2203"), ("CVE-2022-3080",))],
+            ("kernel", "aarch64"): [((0, "5.10.0", "106.18.0.68.oe2203"), ("CVE-2022-2602",))],
+        }
+        packages = [
+            RpmPackage("kernel", None, "5.10.0", "60.18.0.50.oe2203", "aarch64", "kernel", None),
+            RpmPackage("kernel", None, "5.10.0", "136.12.0.86.oe2203", "aarch64", "kernel", None),
+            RpmPackage("bind-libs", 32, "9.16.23", "3.oe2203", "aarch64", "bind", None),
+            RpmPackage("bind-libs", None, "9.16.23", "12.oe2203", "x86_64", "bind", None),
+        ]
+        self.assertEqual(
+            {"unfixed_cves": ["CVE-2022-3080"], "fixed_cves": ["CVE-2022-2602"]},
+            match_advisories(packages, advisories),
+        )
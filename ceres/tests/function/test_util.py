@@ -25,6 +25,7 @@ from ceres.function.util import (
     get_dict_from_file,
     update_ini_data_value,
     execute_shell_command,
+    execute_shell_commands,
 )
 
 
@@ -156,3 +157,17 @@ class TestUtil(unittest.TestCase):
         mock_load.side_effect = libconf.ConfigParseError()
         mock_config = load_gopher_config('mock')
         self.assertEqual(libconf.AttrDict(), mock_config)
+
+    # the invalid utf-8 line is written after a delay, so that the first line is read before it
+    PARTIAL_OUTPUT_COMMAND = "sh -c \"printf 'ok\\n'; sleep 0.2; printf 'bad \\377\\n'\""
+
+    def test_execute_shell_command_should_keep_partial_stdout_when_output_can_not_be_read(self):
+        code, stdout, stderr = execute_shell_command(self.PARTIAL_OUTPUT_COMMAND)
+        self.assertEqual((CommandExitCode.FAIL, "ok"), (code, stdout))
+        self.assertIn("utf-8", stderr)
+
+    def test_execute_shell_commands_should_keep_partial_stdout_when_output_can_not_be_read(self):
+        results = execute_shell_commands(["echo mock", self.PARTIAL_OUTPUT_COMMAND + "|grep o"])
+        self.assertEqual(
+            [(CommandExitCode.FAIL, "mock"), (CommandExitCode.FAIL, "ok")], [result[:2] for result in results]
+        )
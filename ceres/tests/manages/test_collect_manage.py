@@ -10,69 +10,75 @@
 # PURPOSE.
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
+import asyncio
 import grp
 import json
 import os
 import pwd
+import socket
+import tempfile
+import time
 import unittest
 import warnings
 from unittest import mock
 
 from ceres.conf.constant import CommandExitCode
-from ceres.manages.collect_manage import Collect
-
-
-class Socket:
-    def connect(self):
-        pass
-
-    def getsockname(self):
-        pass
-
-    def close(self):
-        pass
+from ceres.function.netinfo import InterfaceAddress
+from ceres.function.pipeline import CommandStream
+from ceres.manages.collect_manage import ByteBudget, Collect
+from ceres.tests.function.test_facts import make_cpu_sysfs
 
 
 class TestCollectManage(unittest.TestCase):
     def setUp(self) -> None:
         warnings.simplefilter('ignore', ResourceWarning)
+        # the raw DMI table of the host must not be read instead of the mocked dmidecode
+        patcher = mock.patch('ceres.function.facts.DMI_TABLES_DIR', '/nonexistent/dmi/tables')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # every test collects the host info again instead of reading the snapshot and the package index of the host
+        patcher = mock.patch.dict(
+            'ceres.manages.collect_manage.configuration.command', {"SNAPSHOT_FILE": "", "PACKAGE_INDEX_FILE": ""}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
-    @mock.patch.object(Collect, "_Collect__get_total_online_memory")
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.manages.collect_manage.get_online_memory')
     def test_get_memory_info_should_return_memory_info_when_execute_shell_command_is_correct(
-        self, mock_execute_shell_command, mock_memory_size
+        self, mock_online_memory, mock_dmidecode
     ):
         mock_shell_stdout = """
-            Memory Device
-                    Array Handle: 0x0006
-                    Error Information Handle: Not Provided
-                    Total Width: 72 bits
-                    Data Width: 64 bits
-                    Size: 16 GB
-                    Form Factor: DIMM
-                    Set: None
-                    Locator: DIMM170 J31
-                    Bank Locator: SOCKET 1 CHANNEL 7 DIMM 0
-                    Type: DDR4
-                    Type Detail: Synchronous Registered (Buffered)
-                    Speed: 2000 MT/s
-                    Manufacturer: Test1
-                    Serial Number: 129C7699
-                    Asset Tag: 1939
-                    Part Number: HMA82GR7CJR4N-WM
-            Memory Device
-                    Form Factor: DIMM
-                    Set: None
-                    Size: 32 GB
-                    Locator: DIMM170 J31
-                    Bank Locator: SOCKET 1 CHANNEL 7 DIMM 0
-                    Type: DDR4
-                    Type Detail: Synchronous Registered (Buffered)
-                    Speed: 2000 MT/s
-                    Manufacturer: Test2
-            """
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, mock_shell_stdout, ""
-        mock_memory_size.return_value = '48G'
+Handle 0x0006, DMI type 16, 23 bytes
+Physical Memory Array
+	Location: System Board Or Motherboard
+	Number Of Devices: 2
+
+Handle 0x0014, DMI type 17, 84 bytes
+Memory Device
+	Array Handle: 0x0006
+	Size: 16 GB
+	Form Factor: DIMM
+	Locator: DIMM170 J31
+	Type: DDR4
+	Type Detail: Synchronous Registered (Buffered)
+	Speed: 2000 MT/s
+	Manufacturer: Test1
+	Part Number: HMA82GR7CJR4N-WM
+
+Handle 0x0015, DMI type 17, 84 bytes
+Memory Device
+	Array Handle: 0x0006
+	Size: 32 GB
+	Form Factor: DIMM
+	Locator: DIMM170 J31
+	Type: DDR4
+	Type Detail: Synchronous Registered (Buffered)
+	Speed: 2000 MT/s
+	Manufacturer: Test2
+"""
+        mock_online_memory.return_value = 48 * 1024**3
+        mock_dmidecode.return_value = CommandExitCode.SUCCEED, mock_shell_stdout, ""
         expect_res = {
             'total': 2,
             'size': "48G",
@@ -85,86 +91,69 @@ class TestCollectManage(unittest.TestCase):
         res = Collect()._get_memory_info()
         self.assertEqual(expect_res, res)
 
-    @mock.patch.object(Collect, "_Collect__get_total_online_memory")
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.manages.collect_manage.get_online_memory')
     def test_get_memory_info_should_return_empty_list_when_memory_info_is_not_showed(
-        self, mock_execute_shell_command, mock_memory_size
+        self, mock_online_memory, mock_dmidecode
     ):
         mock_shell_stdout = """
-                    Memory Device
-                    Array Handle: 0x0006
-                    Error Information Handle: Not Provided
-                    Total Width: Unknown
-                    Data Width: Unknown
-                    Size: No Module Installed
-                    Form Factor: DIMMis
-                    Set: None
-                    Locator: DIMM171 J32
-                    Bank Locator: SOCKET 1 CHANNEL 7 DIMM 1
-                    Type: Unknown
-                    Type Detail: Unknown Synchronous
-                    Speed: Unknown
-        """
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, mock_shell_stdout, ""
-        mock_memory_size.return_value = '4G'
+Handle 0x0016, DMI type 17, 84 bytes
+Memory Device
+	Array Handle: 0x0006
+	Error Information Handle: Not Provided
+	Size: No Module Installed
+	Locator: DIMM171 J32
+	Type: Unknown
+	Speed: Unknown
+"""
+        mock_online_memory.return_value = 4 * 1024**3
+        mock_dmidecode.return_value = CommandExitCode.SUCCEED, mock_shell_stdout, ""
         expect_res = {'info': [], 'total': 0, "size": "4G"}
 
         res = Collect()._get_memory_info()
         self.assertEqual(expect_res, res)
 
-    @mock.patch.object(Collect, "_Collect__get_total_online_memory")
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.manages.collect_manage.get_online_memory')
     def test_get_memory_info_should_return_empty_dict_when_execute_shell_command_failed(
-        self, mock_execute_shell_command, mock_memory_size
+        self, mock_online_memory, mock_dmidecode
     ):
         """
         This situation exists in the virtual machine
         """
-        mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
-        mock_memory_size.return_value = ''
+        mock_online_memory.return_value = None
+        mock_dmidecode.return_value = CommandExitCode.FAIL, "", ""
         res = Collect()._get_memory_info()
         self.assertEqual({'info': [], 'size': None, 'total': None}, res)
 
-    @mock.patch.object(Collect, "_Collect__get_total_online_memory")
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_memory_info_should_return_empty_dict_when_execute_shell_command_failed(
-        self, mock_execute_shell_command, mock_memory_size
-    ):
-        mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
-        mock_memory_size.return_value = ''
-        res = Collect()._get_memory_info()
-        self.assertEqual({'info': [], 'size': None, 'total': None}, res)
-
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_memory_size_should_return_memory_size_when_execute_shell_command_succeed(
-        self, mock_execute_shell_command
-    ):
-        mock_shell_stdout = '''
-            Memory block size:       128M
-            Total online memory:     2.5G
-            Total offline memory:      0B
-        '''
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, mock_shell_stdout, ""
-        res = Collect._Collect__get_total_online_memory()
+    def test_get_memory_size_should_return_online_blocks_size_when_memory_sysfs_is_readable(self):
+        with tempfile.TemporaryDirectory() as memory_dir:
+            with open(os.path.join(memory_dir, "block_size_bytes"), "w", encoding="utf-8") as file:
+                file.write("8000000\n")
+            for block in range(21):
+                os.makedirs(os.path.join(memory_dir, f"memory{block}"))
+                with open(os.path.join(memory_dir, f"memory{block}", "state"), "w", encoding="utf-8") as file:
+                    file.write("offline\n" if block == 20 else "online\n")
+            with mock.patch('ceres.function.facts.MEMORY_SYSFS_DIR', memory_dir):
+                res = Collect._Collect__get_total_online_memory()
         self.assertEqual('2.5G', res)
 
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_memory_size_should_return_empty_str_when_execute_shell_command_succeed_but_get_memory_info_failed(
-        self, mock_execute_shell_command
-    ):
-        mock_shell_stdout = '''
-            Memory block size:       128M
-        '''
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, mock_shell_stdout, ""
-        res = Collect._Collect__get_total_online_memory()
-        self.assertEqual("", res)
-
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_memory_size_should_return_empty_str_when_execute_shell_command_fail(self, mock_execute_shell_command):
-        mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
+    @mock.patch('ceres.function.facts.MEMORY_SYSFS_DIR', '/nonexistent/memory')
+    def test_get_memory_size_should_return_mem_total_when_memory_sysfs_is_missing(self):
+        with tempfile.NamedTemporaryFile("w", suffix="meminfo") as file:
+            file.write("MemTotal:        6147400 kB\nMemFree:         5012064 kB\n")
+            file.flush()
+            with mock.patch('ceres.function.facts.MEMINFO_PATH', file.name):
+                res = Collect._Collect__get_total_online_memory()
+        self.assertEqual("5.9G", res)
+
+    @mock.patch('ceres.function.facts.MEMINFO_PATH', '/nonexistent/meminfo')
+    @mock.patch('ceres.function.facts.MEMORY_SYSFS_DIR', '/nonexistent/memory')
+    def test_get_memory_size_should_return_empty_str_when_memory_can_not_be_read(self):
         res = Collect._Collect__get_total_online_memory()
         self.assertEqual("", res)
 
+    @mock.patch('ceres.manages.collect_manage.get_cpu_topology', mock.Mock(return_value=None))
     @mock.patch('ceres.manages.collect_manage.execute_shell_command')
     def test_get_cpu_info_should_return_correct_info_when_execute_command_successful(self, mock_execute_shell_command):
         mock_shell_stdout = (
@@ -176,6 +165,9 @@ class TestCollectManage(unittest.TestCase):
             'L1i cache:                       32 KiB\n'
             'L2 cache:                        512 KiB\n'
             'L3 cache:                        8 MiB\n'
+            'Thread(s) per core:              1\n'
+            'Core(s) per socket:              1\n'
+            'Socket(s):                       1\n'
         )
         mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, mock_shell_stdout, ""
         expect_res = {
@@ -187,10 +179,14 @@ class TestCollectManage(unittest.TestCase):
             "l1i_cache": "32 KiB",
             "l2_cache": "512 KiB",
             "l3_cache": "8 MiB",
+            "sockets": "1",
+            "cores_per_socket": "1",
+            "threads_per_core": "1",
         }
         res = Collect._get_cpu_info()
         self.assertEqual(expect_res, res)
 
+    @mock.patch('ceres.manages.collect_manage.get_cpu_topology', mock.Mock(return_value=None))
     @mock.patch('ceres.manages.collect_manage.execute_shell_command')
     def test_get_cpu_info_should_return_null_when_execute_command_successful_but_not_get_expected_information(
         self, mock_execute_shell_command
@@ -205,10 +201,14 @@ class TestCollectManage(unittest.TestCase):
             "l1i_cache": None,
             "l2_cache": None,
             "l3_cache": None,
+            "sockets": None,
+            "cores_per_socket": None,
+            "threads_per_core": None,
         }
         res = Collect._get_cpu_info()
         self.assertEqual(expect_res, res)
 
+    @mock.patch('ceres.manages.collect_manage.get_cpu_topology', mock.Mock(return_value=None))
     @mock.patch('ceres.manages.collect_manage.execute_shell_command')
     def test_get_cpu_info_should_return_empty_dict_when_host_has_no_command_lscpu(self, mock_execute_shell_command):
         mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
@@ -223,189 +223,259 @@ class TestCollectManage(unittest.TestCase):
                 "l1i_cache": None,
                 "l2_cache": None,
                 "l3_cache": None,
+                "sockets": None,
+                "cores_per_socket": None,
+                "threads_per_core": None,
             },
             res,
         )
 
     @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_kernel_version_should_return_cpu_info_when_execute_command_successfully(
-        self, mock_execute_shell_command
-    ):
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, '5.10.0-5.10.0.24.oe1.x86_64', ""
+    def test_get_cpu_info_should_read_proc_and_sysfs_when_sysfs_is_readable(self, mock_execute_shell_command):
+        cpuinfo = "processor\t: 0\nBogoMIPS\t: 200.00\nCPU implementer\t: 0x48\nCPU part\t: 0xd01\n\nprocessor\t: 1\n"
+        with tempfile.TemporaryDirectory() as cpu_dir:
+            make_cpu_sysfs(cpu_dir, sockets=2, cores=48, threads=1)
+            with open(os.path.join(cpu_dir, "cpuinfo"), "w", encoding="utf-8") as file:
+                file.write(cpuinfo)
+            with mock.patch('ceres.function.facts.CPU_SYSFS_DIR', cpu_dir), mock.patch(
+                'ceres.function.facts.CPUINFO_PATH', os.path.join(cpu_dir, "cpuinfo")
+            ):
+                res = Collect._get_cpu_info()
+        expect_res = {
+            "architecture": os.uname().machine,
+            "core_count": "96",
+            "model_name": "Kunpeng-920",
+            "vendor_id": "HiSilicon",
+            "l1d_cache": "3 MiB",
+            "l1i_cache": "6 MiB",
+            "l2_cache": "48 MiB",
+            "l3_cache": "64 MiB",
+            "sockets": "2",
+            "cores_per_socket": "48",
+            "threads_per_core": "1",
+        }
+        self.assertEqual(expect_res, res)
+        mock_execute_shell_command.assert_not_called()
+
+    @mock.patch('ceres.manages.collect_manage.get_kernel_release')
+    def test_get_kernel_version_should_return_kernel_version_when_kernel_release_is_correct(self, mock_kernel_release):
+        mock_kernel_release.return_value = '5.10.0-5.10.0.24.oe1.x86_64'
         expect_res = '5.10.0-5.10.0.24'
         res = Collect._Collect__get_kernel_version()
         self.assertEqual(expect_res, res)
 
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_kernel_version_should_return_empty_string_when_execute_command_successfully_but_not_get_expected_information(
-        self, mock_execute_shell_command
+    @mock.patch('ceres.manages.collect_manage.get_kernel_release')
+    def test_get_kernel_version_should_return_empty_string_when_kernel_release_is_not_expected_information(
+        self, mock_kernel_release
     ):
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, 'test_info', ""
-        res = Collect._Collect__get_kernel_version()
-        self.assertEqual('', res)
-
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_kernel_version_should_return_cpu_info_when_host_has_no_command_uname(self, mock_execute_shell_command):
-        mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
+        mock_kernel_release.return_value = 'test_info'
         res = Collect._Collect__get_kernel_version()
         self.assertEqual('', res)
 
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_bios_version_should_return_cpu_info_when_execute_command_successfully(
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.function.facts.DMI_ID_DIR')
+    def test_get_bios_version_should_return_bios_version_of_sysfs_when_sysfs_is_readable(
+        self, mock_dmi_id_dir, mock_execute_shell_command
+    ):
+        with tempfile.TemporaryDirectory() as dmi_id_dir:
+            with open(os.path.join(dmi_id_dir, "bios_version"), "w", encoding="utf-8") as file:
+                file.write("1.57\n")
+            with mock.patch('ceres.function.facts.DMI_ID_DIR', dmi_id_dir):
+                res = Collect._Collect__get_bios_version()
+        self.assertEqual('1.57', res)
+        mock_execute_shell_command.assert_not_called()
+
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.function.facts.DMI_ID_DIR', '/nonexistent/dmi/id')
+    def test_get_bios_version_should_return_bios_version_of_dmidecode_when_sysfs_is_missing(
         self, mock_execute_shell_command
     ):
-        mock_shell_stdout = """
-                BIOS Information
-                Vendor: innotek GmbH
-                Version: VirtualBox
-                Release Date: 12/01/2006
-                Address: 0xE0000
-                Runtime Size: 128 kB
-                ROM Size: 128 kB
-                Characteristics:
-                        ISA is supported
-                        PCI is supported
-                        Boot from CD is supported
-                        Selectable boot is supported
-                        8042 keyboard services are supported (int 9h)
-                        CGA/mono video services are supported (int 10h)
-                        ACPI is supported
-        """
+        mock_shell_stdout = """# dmidecode 3.2
+Getting SMBIOS data from sysfs.
+
+Handle 0x0000, DMI type 0, 20 bytes
+BIOS Information
+\tVendor: innotek GmbH
+\tVersion: VirtualBox
+\tRelease Date: 12/01/2006
+\tCharacteristics:
+\t\tISA is supported
+\t\tPCI is supported
+"""
         mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, mock_shell_stdout, ""
         expect_res = 'VirtualBox'
         res = Collect._Collect__get_bios_version()
         self.assertEqual(expect_res, res)
+        mock_execute_shell_command.assert_called_once_with("dmidecode", cache=mock.ANY)
 
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_bios_version_should_return_empty_string_when_execute_command_successfully_but_not_get_expected_information(
-        self, mock_execute_shell_command
-    ):
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, 'test_info', ""
-        res = Collect._Collect__get_bios_version()
-        self.assertEqual('', res)
-
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_bios_version_should_return_cpu_info_when_host_has_no_command_dmidecode(
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.function.facts.DMI_ID_DIR', '/nonexistent/dmi/id')
+    def test_get_bios_version_should_return_empty_string_when_host_has_no_command_dmidecode(
         self, mock_execute_shell_command
     ):
         mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
         res = Collect._Collect__get_bios_version()
         self.assertEqual('', res)
 
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_os_version_should_return_cpu_info_when_execute_command_successfully(self, mock_execute_shell_command):
-        mock_shell_stdout = """
-                    NAME="openEuler"
-                    VERSION="21.09"
-                    ID="openEuler"
-                    VERSION_ID="21.09"
-                    PRETTY_NAME="openEuler 21.09"
-                    ANSI_COLOR="0;31"
-        """
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, mock_shell_stdout, ""
-        expect_res = 'openEuler-21.09'
-        res = Collect.get_os_version()
-        self.assertEqual(expect_res, res)
-
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_os_version_should_return_empty_string_when_execute_command_successfully_but_not_get_expected_information(
-        self, mock_execute_shell_command
-    ):
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, 'test_info', ""
-        res = Collect.get_os_version()
-        self.assertEqual('', res)
-
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_system_info_should_return_cpu_info_when_host_has_no_command_cat(self, mock_execute_shell_command):
-        mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
-        res = Collect.get_os_version()
+    def test_get_os_version_should_return_os_version_when_os_release_is_correct(self):
+        os_release = """NAME="openEuler"
+VERSION="21.09"
+ID="openEuler"
+VERSION_ID="21.09"
+PRETTY_NAME="openEuler 21.09"
+ANSI_COLOR="0;31"
+"""
+        with mock.patch('builtins.open', mock.mock_open(read_data=os_release)):
+            res = Collect.get_os_version()
+        self.assertEqual('openEuler-21.09', res)
+
+    def test_get_os_version_should_return_empty_string_when_os_release_has_no_pretty_name(self):
+        with mock.patch('builtins.open', mock.mock_open(read_data='test_info')):
+            res = Collect.get_os_version()
         self.assertEqual('', res)
 
-    @mock.patch.object(pwd, 'getpwuid')
-    @mock.patch.object(grp, 'getgrgid')
-    @mock.patch('ceres.function.util.os.stat')
-    @mock.patch.object(os.path, 'getsize')
-    @mock.patch.object(os, 'access')
-    def test_get_file_info_should_return_file_content_when_target_file_exist_and_not_executable_and_less_than_1m(
-        self, mock_os_access, mock_getsize, mock_os_stat, mock_getgrgid, mock_getpwduid
-    ):
-        file_path = mock.Mock(return_value='test')
-        mock_os_access.return_value = False
-        mock_os_stat.st_mode.return_value = 33198
-        mock_os_stat.st_uid.return_value = '123456'
-        mock_os_stat.st_gid.return_value = '123456'
-        mock_getsize.return_value = 1024
-        mock_getgrgid.return_value = (1001,)
-        mock_getpwduid.return_value = (1001,)
-        with mock.patch('builtins.open', mock.mock_open(read_data='123456')):
-            info = Collect.get_file_info(file_path)
-        self.assertEqual('123456', info.get('content'))
-
-    @mock.patch.object(os, 'access')
-    def test_get_file_info_should_return_empty_dict_when_target_file_can_execute(self, mock_os_access):
-        file_path = mock.Mock(return_value='test')
-        mock_os_access.return_value = True
-        info = Collect.get_file_info(file_path)
-        self.assertEqual({}, info)
-
-    @mock.patch.object(os.path, 'getsize')
-    @mock.patch.object(os, 'access')
-    def test_get_file_info_should_return_empty_dict_when_target_file_is_larger_than_1m(
-        self, mock_os_access, mock_getsize
-    ):
-        file_path = mock.Mock(return_value='test')
-        mock_os_access.return_value = False
-        mock_getsize.return_value = 1024 * 1024 * 2
-        info = Collect.get_file_info(file_path)
-        self.assertEqual({}, info)
-
-    @mock.patch.object(os.path, 'getsize')
-    @mock.patch.object(os, 'access')
-    def test_get_file_info_should_return_empty_dict_when_target_file_is_not_encoded_by_utf8(
-        self, mock_os_access, mock_getsize
-    ):
-        file_path = mock.Mock(return_value='test')
-        mock_os_access.return_value = False
-        mock_getsize.return_value = 1024 * 1024
-        with mock.patch('builtins.open', mock.mock_open()) as mock_file:
-            mock_file.side_effect = UnicodeDecodeError('', bytes(), 1, 1, '')
-            info = Collect.get_file_info(file_path)
-        self.assertEqual({}, info)
-
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
-    def test_get_uuid_should_return_uuid_string_when_all_is_right(self, mock_execute_shell_command):
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, "UUID: m-o-c-k-uuid", ""
+    @mock.patch('ceres.function.facts.OS_RELEASE_PATHS', ('/nonexistent/os-release',))
+    def test_get_os_version_should_return_empty_string_when_os_release_is_missing(self):
+        self.assertEqual('', Collect.get_os_version())
+
+    def make_file(self, directory: str, name: str, content: bytes, mode: int = 0o644) -> str:
+        file_path = os.path.join(directory, name)
+        with open(file_path, "wb") as file:
+            file.write(content)
+        os.chmod(file_path, mode)
+        return file_path
+
+    def test_get_file_info_should_return_file_content_when_target_file_exist_and_not_executable_and_less_than_1m(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = self.make_file(tmp_dir, "ceres.conf", b"[log]\r\nlog_level=INFO\n", 0o640)
+            with mock.patch('ceres.manages.collect_manage.os.stat') as mock_stat:
+                info = Collect.get_file_info(file_path)
+        self.assertEqual("[log]\nlog_level=INFO\n", info.get('content'))
+        self.assertEqual("0640", info['file_attr']['mode'])
+        self.assertEqual(pwd.getpwuid(os.getuid())[0], info['file_attr']['owner'])
+        self.assertEqual(grp.getgrgid(os.getgid())[0], info['file_attr']['group'])
+        mock_stat.assert_not_called()
+
+    def test_get_file_info_should_return_empty_dict_when_target_file_can_execute(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = self.make_file(tmp_dir, "run.sh", b"#!/bin/sh\n", 0o755)
+            self.assertEqual({}, Collect.get_file_info(file_path))
+
+    def test_get_file_info_should_return_empty_dict_when_target_file_is_larger_than_1m(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = self.make_file(tmp_dir, "large.conf", b"a" * (1024 * 1024 + 1))
+            self.assertEqual({}, Collect.get_file_info(file_path))
+
+    def test_get_file_info_should_return_empty_dict_when_target_file_is_not_encoded_by_utf8(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = self.make_file(tmp_dir, "binary.conf", b"\xff\xfe\x00")
+            self.assertEqual({}, Collect.get_file_info(file_path))
+
+    def test_get_file_info_should_take_bytes_read_from_budget_when_file_size_is_unknown(self):
+        # the size of the files of procfs is 0
+        self.assertEqual(0, os.stat("/proc/self/status").st_size)
+        self.assertEqual({}, Collect.get_file_info("/proc/self/status", ByteBudget(100)))
+        byte_budget = ByteBudget(1024 * 1024)
+        info = Collect.get_file_info("/proc/self/status", byte_budget)
+        self.assertIn("VmRSS", info["content"])
+        self.assertFalse(byte_budget.reserve(1024 * 1024 - len(info["content"]) + 1))
+        self.assertTrue(byte_budget.reserve(1024 * 1024 - len(info["content"])))
+
+    @mock.patch('ceres.manages.collect_manage.COLLECT_FILE_BYTE_BUDGET', 10)
+    def test_collect_file_should_keep_order_and_fail_files_over_byte_budget_when_files_are_read_concurrently(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_paths = [self.make_file(tmp_dir, f"{index}.conf", b"12345\n") for index in range(5)]
+            missing_path = os.path.join(tmp_dir, "missing.conf")
+            with mock.patch.dict('ceres.manages.collect_manage.configuration.command', {"MAX_CONCURRENCY": 1}):
+                result = Collect.collect_file(file_paths[:2] + [tmp_dir, missing_path] + file_paths[2:])
+        self.assertEqual(file_paths[:1], result["success_files"])
+        self.assertEqual([file_paths[1], tmp_dir, missing_path] + file_paths[2:], result["fail_files"])
+        self.assertEqual(["12345\n"], [info["content"] for info in result["infos"]])
+
+    def test_get_uuid_should_return_upper_case_uuid_when_sysfs_is_readable(self):
+        with tempfile.TemporaryDirectory() as dmi_id_dir:
+            with open(os.path.join(dmi_id_dir, "product_uuid"), "w", encoding="utf-8") as file:
+                file.write("3f2c9a1e-8b4d-11ec-9a6f-0242ac130003\n")
+            with mock.patch('ceres.function.facts.DMI_ID_DIR', dmi_id_dir):
+                self.assertEqual('3F2C9A1E8B4D11EC9A6F0242AC130003', Collect.get_uuid())
+
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.function.facts.DMI_ID_DIR', '/nonexistent/dmi/id')
+    def test_get_uuid_should_return_uuid_of_dmidecode_when_sysfs_is_missing(self, mock_execute_shell_command):
+        mock_execute_shell_command.return_value = (
+            CommandExitCode.SUCCEED,
+            "Handle 0x0001, DMI type 1, 27 bytes\nSystem Information\n\tUUID: m-o-c-k-uuid\n",
+            "",
+        )
         self.assertEqual('mockuuid', Collect.get_uuid())
 
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.function.facts.DMI_ID_DIR', '/nonexistent/dmi/id')
     def test_get_uuid_should_return_empty_string_when_command_execution_failed(self, mock_execute_shell_command):
         mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
         self.assertEqual('', Collect.get_uuid())
 
-    @mock.patch("ceres.manages.collect_manage.socket")
-    def test_get_host_ip_should_return_host_ip_when_all_is_right(self, mock_socket):
-        Socket.connect = mock.Mock(return_value='')
-        Socket.getsockname = mock.Mock(return_value=('mock_host_ip',))
-        Socket.close = mock.Mock(return_value='')
-        mock_socket.return_value = Socket()
-        self.assertEqual('mock_host_ip', Collect.get_host_ip())
-
-    @mock.patch("ceres.manages.collect_manage.socket")
-    def test_get_host_ip_should_return_empty_string_when_socket_connect_failed(self, mock_socket):
-        Socket.connect = mock.Mock(side_effect=OSError())
-        mock_socket.return_value = Socket()
-        self.assertEqual('', Collect.get_host_ip())
+    @mock.patch('ceres.function.netinfo.get_interface_addresses')
+    def test_get_host_ip_should_return_ip_facing_destination_when_host_is_multi_homed(self, mock_addresses):
+        mock_addresses.return_value = [
+            InterfaceAddress("eth0", "192.168.1.2", socket.AF_INET),
+            InterfaceAddress("eth1", "10.0.0.2", socket.AF_INET),
+            InterfaceAddress("eth1", "fd00::2", socket.AF_INET6),
+        ]
+        ipv4_routes = (
+            "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n"
+            "eth0\t00000000\t0101A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0\n"
+            "eth0\t0001A8C0\t00000000\t0001\t0\t0\t100\t00FFFFFF\t0\t0\t0\n"
+            "eth1\t0000000A\t00000000\t0001\t0\t0\t0\t0000FFFF\t0\t0\t0\n"
+            "eth0\t0500000A\t00000000\t0201\t0\t0\t0\tFFFFFFFF\t0\t0\t0\n"
+        )
+        ipv6_routes = (
+            "fd000000000000000000000000000000 40 00000000000000000000000000000000 00 "
+            "00000000000000000000000000000000 00000100 00000001 00000000 00000001 eth1\n"
+            "fd000000000000000000000000000002 80 00000000000000000000000000000000 00 "
+            "00000000000000000000000000000000 00000000 00000002 00000000 80200001 eth1\n"
+        )
+        with tempfile.TemporaryDirectory() as proc_dir:
+            paths = {}
+            for name, content in (("route", ipv4_routes), ("ipv6_route", ipv6_routes)):
+                paths[name] = os.path.join(proc_dir, name)
+                with open(paths[name], "w", encoding="utf-8") as file:
+                    file.write(content)
+            with mock.patch('ceres.function.netinfo.IPV4_ROUTE_PATH', paths["route"]), mock.patch(
+                'ceres.function.netinfo.IPV6_ROUTE_PATH', paths["ipv6_route"]
+            ):
+                self.assertEqual(
+                    ["192.168.1.2", "10.0.0.2", "fd00::2"],
+                    [Collect.get_host_ip(), Collect.get_host_ip("10.0.0.5"), Collect.get_host_ip("fd00::1")],
+                )
+                with mock.patch.dict('ceres.manages.collect_manage.configuration.network', {"INTERFACE": "eth1"}):
+                    self.assertEqual("10.0.0.2", Collect.get_host_ip("192.168.1.100"))
+
+    @mock.patch('ceres.function.netinfo.IPV6_ROUTE_PATH', '/nonexistent/ipv6_route')
+    @mock.patch('ceres.function.netinfo.IPV4_ROUTE_PATH', '/nonexistent/route')
+    @mock.patch('ceres.function.netinfo.get_interface_addresses')
+    def test_get_host_ip_should_return_first_ip_when_there_is_no_route(self, mock_addresses):
+        mock_addresses.return_value = [
+            InterfaceAddress("eth0", "fd00::2", socket.AF_INET6),
+            InterfaceAddress("eth1", "10.0.0.2", socket.AF_INET),
+        ]
+        self.assertEqual("10.0.0.2", Collect.get_host_ip())
+        mock_addresses.return_value = []
+        self.assertEqual("", Collect.get_host_ip())
 
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
+    @mock.patch('ceres.function.rpmdb.RPMDB_SQLITE_PATHS', ())
+    @mock.patch('ceres.function.rpmdb.stream_shell_command')
     def test_get_installed_package_should_return_installed_packages_when_execute_command_successfully(
-        self, mock_execute_shell_command
+        self, mock_stream_shell_command
     ):
         mock_shell_stdout = (
-            "Source RPM: perl-Encode-Locale-1.05-12.oe1.src.rpm\n"
-            "Source RPM: glib-networking-2.58.0-7.oe1.src.rpm\n"
-            "Source RPM: dnf-4.2.15-8.oe1.src.rpm"
+            "perl-Encode-Locale\t(none)\t1.05\t12.oe1\tnoarch\tperl-Encode-Locale-1.05-12.oe1.src.rpm\n"
+            "glib-networking\t(none)\t2.58.0\t7.oe1\tx86_64\tglib-networking-2.58.0-7.oe1.src.rpm\n"
+            "python3-dnf\t(none)\t4.2.15\t8.oe1\tnoarch\tdnf-4.2.15-8.oe1.src.rpm\n"
+            "dnf\t(none)\t4.2.15\t8.oe1\tnoarch\tdnf-4.2.15-8.oe1.src.rpm\n"
+            "gpg-pubkey\t(none)\tb25e7f66\t5f9c5ba8\t(none)\t(none)"
         )
-        mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, mock_shell_stdout, ""
+        mock_stream_shell_command.return_value = CommandStream.from_output(CommandExitCode.SUCCEED, mock_shell_stdout)
         expected_result = [
             {"name": "perl-Encode-Locale", "version": "1.05-12"},
             {"name": "glib-networking", "version": "2.58.0-7"},
@@ -413,28 +483,34 @@ class TestCollectManage(unittest.TestCase):
         ]
         self.assertEqual(expected_result, Collect.get_installed_packages())
 
-    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
+    @mock.patch('ceres.function.rpmdb.RPMDB_SQLITE_PATHS', ('/nonexistent/rpmdb.sqlite',))
+    @mock.patch('ceres.function.rpmdb.stream_shell_command')
     def test_get_installed_package_should_return_empty_list_when_execute_command_failed(
-        self, mock_execute_shell_command
+        self, mock_stream_shell_command
     ):
-        mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
+        mock_stream_shell_command.return_value = CommandStream.from_output(CommandExitCode.FAIL, "")
         self.assertEqual([], Collect.get_installed_packages())
 
-    @mock.patch.object(Collect, "_Collect__get_kernel_version")
-    @mock.patch.object(Collect, "_Collect__get_bios_version")
-    @mock.patch.object(Collect, "get_os_version")
-    def test_get_os_info_should_return_os_info_when_execute_command_failed(
-        self, mock_system_info, mock_bios_version, mock_kernel_version
+    @mock.patch('ceres.manages.collect_manage.get_kernel_release')
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.function.facts.DMI_ID_DIR', '/nonexistent/dmi/id')
+    def test_get_os_info_should_return_os_info_when_sysfs_is_missing(
+        self, mock_execute_shell_command, mock_kernel_release
     ):
-        mock_system_info.return_value = "mock_os_version"
-        mock_bios_version.return_value = "mock_bios_version"
-        mock_kernel_version.return_value = "mock_kernel_version"
+        mock_execute_shell_command.return_value = (
+            CommandExitCode.SUCCEED,
+            "Handle 0x0000, DMI type 0, 26 bytes\nBIOS Information\n\tVersion: 1.57\n",
+            "",
+        )
+        mock_kernel_release.return_value = "5.10.0-60.18.0.50.oe2203.x86_64"
         expected_result = {
-            "os_version": "mock_os_version",
-            "bios_version": "mock_bios_version",
-            "kernel": "mock_kernel_version",
+            "os_version": "openEuler-22.03-LTS",
+            "bios_version": "1.57",
+            "kernel": "5.10.0-60.18.0.50",
         }
-        self.assertEqual(expected_result, Collect()._get_os_info())
+        with mock.patch('ceres.manages.collect_manage.read_os_release', return_value={"PRETTY_NAME": "openEuler 22.03 LTS"}):
+            self.assertEqual(expected_result, Collect()._get_os_info())
+        mock_execute_shell_command.assert_called_once()
 
     @mock.patch.object(Collect, "_get_os_info")
     @mock.patch.object(Collect, "_get_disk_info")
@@ -450,20 +526,148 @@ class TestCollectManage(unittest.TestCase):
         expected_result = {"disk": disk_info, "os": os_info}
         self.assertEqual(expected_result, Collect().get_host_info(['os', 'disk']))
 
+    @mock.patch.object(Collect, "_get_perf_info")
+    @mock.patch.object(Collect, "_get_memory_info")
+    @mock.patch.object(Collect, "_get_cpu_info")
+    @mock.patch.object(Collect, "_get_os_info")
+    @mock.patch.object(Collect, "_get_disk_info")
+    def test_get_host_info_should_only_collect_perf_when_it_is_requested(
+        self, mock_disk_info, mock_os_info, mock_cpu_info, mock_memory_info, mock_perf_info
+    ):
+        for mock_section_info in (mock_disk_info, mock_os_info, mock_cpu_info, mock_memory_info):
+            mock_section_info.return_value = {}
+        mock_perf_info.return_value = {"numa_nodes": []}
+        self.assertEqual(['cpu', 'disk', 'memory', 'os'], list(Collect().get_host_info([])))
+        mock_perf_info.assert_not_called()
+        self.assertEqual({"perf": {"numa_nodes": []}}, Collect().get_host_info(['perf']))
+
+    @mock.patch.object(Collect, "_get_memory_info")
+    @mock.patch.object(Collect, "_get_cpu_info")
+    @mock.patch.object(Collect, "_get_os_info")
+    @mock.patch.object(Collect, "_get_disk_info")
+    def test_get_host_info_should_keep_other_sections_in_requested_order_when_one_section_failed(
+        self, mock_disk_info, mock_os_info, mock_cpu_info, mock_memory_info
+    ):
+        def slow_section():
+            time.sleep(0.2)
+            return [{"capacity": "40GB", "model": "MOCK HARDDISK"}]
+
+        mock_disk_info.side_effect = slow_section
+        mock_os_info.return_value = {"os_version": "mock_os_version"}
+        mock_cpu_info.side_effect = OSError("mock error")
+        mock_memory_info.side_effect = slow_section
+        collect = Collect()
+        start = time.monotonic()
+        host_info = collect.get_host_info(['disk', 'os', 'cpu', 'memory'])
+        # disk and memory are collected at the same time
+        self.assertLess(time.monotonic() - start, 0.35)
+        self.assertEqual(['disk', 'os', 'cpu', 'memory'], list(host_info))
+        self.assertEqual({"os_version": "mock_os_version"}, host_info['os'])
+        self.assertIsNone(host_info['cpu'])
+        self.assertEqual(["cpu", "disk", "memory", "os"], sorted(collect.section_times))
+        self.assertGreaterEqual(collect.section_times["disk"], 0.2)
+
+    @mock.patch.object(Collect, "_get_memory_info")
+    @mock.patch.object(Collect, "_get_disk_info")
+    def test_get_host_info_should_only_collect_changed_sections_when_snapshot_is_saved(
+        self, mock_disk_info, mock_memory_info
+    ):
+        mock_disk_info.return_value = [{"capacity": "40GB", "name": "vda"}]
+        mock_memory_info.return_value = {"size": "6G", "total": 0, "info": []}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            block_dir = os.path.join(temp_dir, "block")
+            os.makedirs(os.path.join(block_dir, "vda"))
+            snapshot_file = os.path.join(temp_dir, "snapshot", "host.json")
+            with mock.patch.dict(
+                'ceres.manages.collect_manage.configuration.command', {"SNAPSHOT_FILE": snapshot_file}
+            ), mock.patch('ceres.function.facts.BLOCK_SYSFS_DIR', block_dir):
+                Collect().get_host_info(['disk', 'memory'])
+                self.assertEqual(
+                    {"disk": [{"capacity": "40GB", "name": "vda"}], "memory": {"size": "6G", "total": 0, "info": []}},
+                    Collect().get_host_info(['disk', 'memory']),
+                )
+                self.assertEqual((1, 1), (mock_disk_info.call_count, mock_memory_info.call_count))
+
+                os.makedirs(os.path.join(block_dir, "vdb"))
+                mock_disk_info.return_value = [{"capacity": "40GB", "name": "vda"}, {"capacity": "1GB", "name": "vdb"}]
+                collect = Collect()
+                self.assertEqual(2, len(collect.get_host_info(['disk', 'memory'])['disk']))
+                self.assertEqual(['disk'], list(collect.section_times))
+
+                Collect().get_host_info(['disk', 'memory'], refresh=True)
+                self.assertEqual((3, 2), (mock_disk_info.call_count, mock_memory_info.call_count))
+
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.manages.collect_manage.get_online_memory')
+    def test_get_host_info_should_not_save_section_to_snapshot_when_its_source_failed(
+        self, mock_online_memory, mock_dmidecode
+    ):
+        mock_online_memory.return_value = 6 * 1024**3
+        mock_dmidecode.return_value = CommandExitCode.FAIL, "", "dmidecode: command not found"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            snapshot_file = os.path.join(temp_dir, "host.json")
+            with mock.patch.dict('ceres.manages.collect_manage.configuration.command', {"SNAPSHOT_FILE": snapshot_file}):
+                collect = Collect()
+                self.assertEqual({"size": "6G", "total": None, "info": []}, collect.get_host_info(['memory'])['memory'])
+                self.assertEqual({"memory": ["dmidecode"]}, collect.section_failures)
+                self.assertFalse(os.path.exists(snapshot_file))
+
+                mock_dmidecode.return_value = CommandExitCode.SUCCEED, "", ""
+                Collect().get_host_info(['memory'])
+                saved_time = os.stat(snapshot_file).st_mtime_ns
+                collect = Collect()
+                collect.get_host_info(['memory', 'perf'])
+                self.assertEqual({}, collect.section_failures)
+                self.assertEqual(saved_time, os.stat(snapshot_file).st_mtime_ns)
+                self.assertEqual(2, mock_dmidecode.call_count)
+
+    @mock.patch('ceres.manages.collect_manage.execute_shell_command')
+    def test_get_disk_info_should_read_sys_block_when_sysfs_is_readable(self, mock_execute_shell_command):
+        devices = {
+            "sda": {"size": "1875385008", "device/model": "ST1000NM0055-1V4", "device/vendor": "ATA     ", "queue/rotational": "1"},
+            "nvme0n1": {"size": "1875385008", "device/model": "HWE52P431T9M002N", "queue/rotational": "0"},
+            "nvme0c0n1": {"size": "1875385008", "hidden": "1"},
+            "../virtual/loop0": {"size": "0"},
+        }
+        with tempfile.TemporaryDirectory() as sys_dir:
+            block_dir = os.path.join(sys_dir, "block")
+            os.makedirs(block_dir)
+            for name, files in devices.items():
+                device_dir = os.path.join(sys_dir, "devices", "pci0000:00", name)
+                for file_name, content in files.items():
+                    os.makedirs(os.path.dirname(os.path.join(device_dir, file_name)), exist_ok=True)
+                    with open(os.path.join(device_dir, file_name), "w", encoding="utf-8") as file:
+                        file.write(content + "\n")
+                os.symlink(device_dir, os.path.join(block_dir, os.path.basename(name)))
+            with mock.patch('ceres.function.facts.BLOCK_SYSFS_DIR', block_dir):
+                res = Collect()._get_disk_info()
+        expected_result = [
+            {"model": "HWE52P431T9M002N", "capacity": "960GB", "vendor": None, "name": "nvme0n1", "rotational": False, "nvme": True},
+            {"model": "ST1000NM0055-1V4", "capacity": "960GB", "vendor": "ATA", "name": "sda", "rotational": True, "nvme": False},
+        ]
+        self.assertEqual(expected_result, res)
+        mock_execute_shell_command.assert_not_called()
+
+    @mock.patch('ceres.manages.collect_manage.get_block_devices', mock.Mock(return_value=None))
     @mock.patch('ceres.manages.collect_manage.execute_shell_command')
     def test_get_disk_info_should_return_disk_info_when_shell_command_execute_succeed(self, mock_execute_shell_command):
         mock_execute_shell_command.return_value = (
             CommandExitCode.SUCCEED,
-            '{"product": "MOCK PRODUCT", "size": 42949672960}',
+            '{"product": "MOCK PRODUCT", "vendor": "MOCK", "logicalname": "/dev/sda", "size": 42949672960}',
             "",
         )
-        self.assertEqual([{"model": "MOCK PRODUCT", "capacity": "42GB"}], Collect()._get_disk_info())
+        expected_result = [
+            {"model": "MOCK PRODUCT", "capacity": "42GB", "vendor": "MOCK", "name": "sda", "rotational": None, "nvme": False}
+        ]
+        self.assertEqual(expected_result, Collect()._get_disk_info())
 
+    @mock.patch('ceres.manages.collect_manage.get_block_devices', mock.Mock(return_value=None))
     @mock.patch('ceres.manages.collect_manage.execute_shell_command')
     def test_get_disk_info_should_return_disk_info_when_shell_command_execute_fail(self, mock_execute_shell_command):
         mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
         self.assertEqual([], Collect()._get_disk_info())
 
+    @mock.patch('ceres.manages.collect_manage.get_block_devices', mock.Mock(return_value=None))
     @mock.patch.object(json, "loads")
     @mock.patch('ceres.manages.collect_manage.execute_shell_command')
     def test_get_disk_info_should_return_disk_info_when_shell_command_execute_succeed_but_decode_error(
@@ -476,3 +680,48 @@ class TestCollectManage(unittest.TestCase):
         )
         mock_json_loads.side_effect = json.decoder.JSONDecodeError('', '', int())
         self.assertEqual([], Collect()._get_disk_info())
+
+    @mock.patch('ceres.manages.collect_manage.get_kernel_release')
+    @mock.patch('ceres.manages.collect_manage.get_online_memory')
+    @mock.patch('ceres.function.facts.execute_shell_command')
+    @mock.patch('ceres.function.facts.DMI_ID_DIR', '/nonexistent/dmi/id')
+    def test_async_get_host_info_should_run_dmidecode_once_when_collect_os_and_memory_info(
+        self, mock_dmidecode, mock_online_memory, mock_kernel_release
+    ):
+        def mock_slow_dmidecode(command, **kwargs):
+            # the second collector must wait for this call instead of starting its own dmidecode
+            time.sleep(0.1)
+            return CommandExitCode.SUCCEED, dmidecode_output, ""
+
+        dmidecode_output = (
+            "Handle 0x0000, DMI type 0, 26 bytes\nBIOS Information\n\tVersion: 1.57\n\n"
+            "Handle 0x0014, DMI type 17, 84 bytes\nMemory Device\n\tSize: 32 GB\n\tType: DDR4\n"
+        )
+        cached_outputs = []
+
+        def mock_cached_dmidecode(command, **kwargs):
+            if not cached_outputs:
+                cached_outputs.append(mock_slow_dmidecode(command))
+            return cached_outputs[0]
+
+        mock_dmidecode.side_effect = mock_cached_dmidecode
+        mock_online_memory.return_value = 32 * 1024**3
+        mock_kernel_release.return_value = "5.10.0-5.10.0.24.oe1.x86_64"
+        with mock.patch('ceres.manages.collect_manage.read_os_release', return_value={"PRETTY_NAME": "openEuler 21.09"}):
+            res = asyncio.run(Collect().async_get_host_info(['os', 'memory']))
+        expected_result = {
+            "os": {"os_version": "openEuler-21.09", "bios_version": "1.57", "kernel": "5.10.0-5.10.0.24"},
+            "memory": {
+                "size": "32G",
+                "total": 1,
+                "info": [{"size": "32 GB", "type": "DDR4", "speed": None, "manufacturer": None}],
+            },
+        }
+        self.assertEqual(expected_result, res)
+        self.assertEqual(1, len(cached_outputs))
+
+    @mock.patch('ceres.manages.collect_manage.async_plugin_status_judge')
+    @mock.patch('ceres.manages.collect_manage.SCANNED_APPLICATION', ["mock1", "mock2"])
+    def test_async_get_application_info_should_return_running_applications_when_all_is_right(self, mock_judge):
+        mock_judge.side_effect = ["Active: active (running)", "Active: inactive (dead)"]
+        self.assertEqual(["mock1"], asyncio.run(Collect.async_get_application_info()))
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import unittest
+from unittest import mock
+
+from ceres.function.fact_graph import FactDefinition
+from ceres.manages.inventory_manage import HostInventory
+
+
+class TestInventoryManage(unittest.TestCase):
+    @mock.patch('ceres.manages.inventory_manage.Collect.get_plugin_info')
+    @mock.patch('ceres.manages.inventory_manage.plugin_status_judge')
+    def test_get_inventory_should_query_unit_states_once_when_application_and_plugin_are_collected(
+        self, mock_plugin_status_judge, mock_get_plugin_info
+    ):
+        def status(application_name):
+            if application_name == "nginx":
+                return "Active: active (running) since Tue 2022-10-11 10:00:00 CST; 1 day ago"
+            return "Active: inactive (dead)"
+
+        mock_plugin_status_judge.side_effect = status
+        mock_get_plugin_info.return_value = [{"plugin_name": "gala-gopher", "is_installed": False}]
+        inventory = HostInventory().get_inventory(["application", "plugin"])
+        self.assertEqual(
+            {"application": ["nginx"], "plugin": [{"plugin_name": "gala-gopher", "is_installed": False}]}, inventory
+        )
+        self.assertEqual(6, mock_plugin_status_judge.call_count)
+        self.assertEqual("Active: inactive (dead)", mock_get_plugin_info.call_args.args[0]["gala-gopher"])
+
+    @mock.patch('ceres.manages.collect_manage.get_installed_rpm_packages')
+    def test_get_inventory_should_only_compute_requested_fields_when_fields_are_given(self, mock_get_rpm_packages):
+        mock_get_os_version = mock.Mock(return_value="openEuler-22.03-LTS")
+        with mock.patch.dict(
+            'ceres.manages.inventory_manage.HOST_FACTS', {"os_version": FactDefinition(mock_get_os_version)}
+        ):
+            inventory = HostInventory()
+            self.assertEqual({"os_version": "openEuler-22.03-LTS"}, inventory.get_inventory(["os_version"]))
+            self.assertEqual("openEuler-22.03-LTS", inventory.get("os_version"))
+        mock_get_os_version.assert_called_once()
+        mock_get_rpm_packages.assert_not_called()
+
+    def test_get_inventory_should_return_none_packages_when_package_index_can_not_be_built(self):
+        mock_get_package_index = mock.Mock(return_value=None)
+        with mock.patch.dict(
+            'ceres.manages.inventory_manage.HOST_FACTS', {"_package_index": FactDefinition(mock_get_package_index)}
+        ):
+            self.assertEqual({"installed_packages": None}, HostInventory().get_inventory(["installed_packages"]))
+        mock_get_package_index.assert_called_once()
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import os
+import shutil
+import tempfile
+import unittest
+from typing import Optional
+from unittest import mock
+
+from ceres.function.rpmdb import get_installed_rpm_packages
+from ceres.manages.rootfs_manage import RootfsInventory
+from ceres.tests.function.test_rpmdb import make_sqlite_rpmdb
+
+
+def make_rootfs(root: str, rpmdb: Optional[str] = None) -> None:
+    os.makedirs(os.path.join(root, "etc"))
+    os.makedirs(os.path.join(root, "var", "lib", "rpm"))
+    with open(os.path.join(root, "etc", "os-release"), "w", encoding="utf-8") as file:
+        file.write('PRETTY_NAME="openEuler 22.03 (LTS)"\n')
+    if rpmdb:
+        # the rpm database of a container is a file of the image layer, its mtime is kept
+        shutil.copy2(rpmdb, os.path.join(root, "var", "lib", "rpm", "rpmdb.sqlite"))
+
+
+class TestRootfsManage(unittest.TestCase):
+    @mock.patch('ceres.manages.rootfs_manage.load_advisories')
+    @mock.patch('ceres.manages.rootfs_manage.get_installed_rpm_packages', wraps=get_installed_rpm_packages)
+    def test_scan_cves_should_read_shared_rpm_database_once_when_roots_come_from_same_image(
+        self, mock_get_installed_rpm_packages, mock_load_advisories
+    ):
+        mock_load_advisories.return_value = {("bash", "x86_64"): [((0, "5.1.8", "7.oe2203"), ("CVE-2022-3715",))]}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            rpmdb = os.path.join(tmp_dir, "rpmdb.sqlite")
+            make_sqlite_rpmdb(rpmdb, [("bash", None, "5.1.8", "6.oe2203", "x86_64", "bash-5.1.8-6.oe2203.src.rpm")])
+            roots = [os.path.join(tmp_dir, name) for name in ("container1", "container2")]
+            for root in roots:
+                make_rootfs(root, rpmdb)
+            missing_root = os.path.join(tmp_dir, "missing")
+
+            inventory = RootfsInventory(roots + [missing_root]).scan_cves("aops-update")
+
+        expected_inventory = {
+            "status": "Succeed",
+            "os_version": "openEuler-22.03-(LTS)",
+            "installed_packages": [{"name": "bash", "version": "5.1.8-6"}],
+            "unfixed_cves": [{"cve_id": "CVE-2022-3715", "support_hp": False}],
+            "fixed_cves": [],
+        }
+        self.assertEqual(
+            {roots[0]: expected_inventory, roots[1]: expected_inventory, missing_root: {"status": "File.Not.Found"}},
+            inventory,
+        )
+        mock_get_installed_rpm_packages.assert_called_once()
+        mock_load_advisories.assert_called_once_with("aops-update")
+
+    def test_get_inventory_should_read_each_rpm_database_when_databases_only_share_size_and_mtime(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            roots = []
+            for name in ("bash", "bosh"):
+                rpmdb = os.path.join(tmp_dir, f"{name}.sqlite")
+                package = (name, None, "5.1.8", "6.oe2203", "x86_64", f"{name}-5.1.8-6.oe2203.src.rpm")
+                make_sqlite_rpmdb(rpmdb, [package])
+                os.utime(rpmdb, ns=(1665452399651432011, 1665452399651432011))
+                roots.append(os.path.join(tmp_dir, name))
+                make_rootfs(roots[-1], rpmdb)
+            self.assertEqual(os.path.getsize(os.path.join(tmp_dir, "bash.sqlite")), os.path.getsize(rpmdb))
+
+            inventory = RootfsInventory(roots).get_inventory()
+
+        self.assertEqual([{"name": "bash", "version": "5.1.8-6"}], inventory[roots[0]]["installed_packages"])
+        self.assertEqual([{"name": "bosh", "version": "5.1.8-6"}], inventory[roots[1]]["installed_packages"])
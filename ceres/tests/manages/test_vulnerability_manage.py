@@ -10,11 +10,12 @@
 # PURPOSE.
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
+import asyncio
 import os
 import unittest
 from unittest import mock
 
-from ceres.conf.constant import CommandExitCode
+from ceres.conf.constant import CVE_SCAN_TIMEOUT, CommandExitCode
 from ceres.function.status import (
     PARAM_ERROR,
     REPO_CONTENT_INCORRECT,
@@ -22,7 +23,9 @@ from ceres.function.status import (
     SERVICE_NOT_EXIST,
     SUCCESS,
     COMMAND_EXEC_ERROR,
+    COMMAND_TIMEOUT,
 )
+from ceres.function.pipeline import CommandStream
 from ceres.manages.vulnerability_manage import VulnerabilityManage
 
 
@@ -117,30 +120,30 @@ class TestVulnerabilityManage(unittest.TestCase):
         mock_args = {"basic": False}
         self.assertEqual(SERVICE_NOT_EXIST, VulnerabilityManage().cve_scan(mock_args)[0])
 
-    @mock.patch('ceres.manages.vulnerability_manage.execute_shell_command')
+    @mock.patch('ceres.manages.vulnerability_manage.stream_shell_command')
     @mock.patch.object(VulnerabilityManage, "_validate_repo_source")
     def test_cve_scan_should_return_command_exec_error_when_query_hotpatch_failed(
-        self, mock_validate_repo, mock_execute_shell_command
+        self, mock_validate_repo, mock_stream_shell_command
     ):
         mock_validate_repo.return_value = True
-        mock_execute_shell_command.side_effect = [
-            (CommandExitCode.SUCCEED, "", ""),
-            (CommandExitCode.FAIL, "", ""),
-            (CommandExitCode.SUCCEED, "", ""),
+        mock_stream_shell_command.side_effect = [
+            CommandStream.from_output(CommandExitCode.SUCCEED, ""),
+            CommandStream.from_output(CommandExitCode.FAIL, ""),
+            CommandStream.from_output(CommandExitCode.SUCCEED, ""),
         ]
         mock_args = {"basic": True}
         self.assertEqual(COMMAND_EXEC_ERROR, VulnerabilityManage().cve_scan(mock_args)[0])
 
-    @mock.patch('ceres.manages.vulnerability_manage.execute_shell_command')
+    @mock.patch('ceres.manages.vulnerability_manage.stream_shell_command')
     @mock.patch.object(VulnerabilityManage, "_validate_repo_source")
     def test_cve_scan_should_return_command_exec_error_when_query_hotpatch_status_failed(
-        self, mock_validate_repo, mock_execute_shell_command
+        self, mock_validate_repo, mock_stream_shell_command
     ):
         mock_validate_repo.return_value = True
-        mock_execute_shell_command.side_effect = [
-            (CommandExitCode.SUCCEED, "", ""),
-            (CommandExitCode.SUCCEED, "", ""),
-            (CommandExitCode.FAIL, "", ""),
+        mock_stream_shell_command.side_effect = [
+            CommandStream.from_output(CommandExitCode.SUCCEED, ""),
+            CommandStream.from_output(CommandExitCode.SUCCEED, ""),
+            CommandStream.from_output(CommandExitCode.FAIL, ""),
         ]
         mock_args = {"basic": True}
         self.assertEqual(COMMAND_EXEC_ERROR, VulnerabilityManage().cve_scan(mock_args)[0])
@@ -167,9 +170,9 @@ class TestVulnerabilityManage(unittest.TestCase):
         ]
         self.assertEqual((REPO_NOT_SET, expected_result), VulnerabilityManage().cve_fix(mock_cve))
 
-    @mock.patch('ceres.manages.vulnerability_manage.execute_shell_command')
+    @mock.patch('ceres.manages.vulnerability_manage.stream_shell_command')
     def test_check_cve_by_dnf_should_return_cve_scan_result_when_hotpatch_scan_is_supported(
-        self, mock_execute_shell_command
+        self, mock_stream_shell_command
     ):
         mock_hot_updateinfo_stdout = (
             "Last metadata expiration check: 1:16:26 ago on Thu 06 Jul 2023 04:53:58 PM CST.\n"
@@ -190,10 +193,10 @@ class TestVulnerabilityManage(unittest.TestCase):
             "CVE-2023-1111 redis-6.2.5-1/HP001 ACTIVED\n"
             "CVE-2023-1112 redis-6.2.5-1/HP001 NOT-APPLIED\n"
         )
-        mock_execute_shell_command.side_effect = [
-            (CommandExitCode.SUCCEED, mock_hot_updateinfo_stdout, ""),
-            (CommandExitCode.SUCCEED, mock_cve_fixed_stdout, ""),
-            (CommandExitCode.SUCCEED, mock_hotpatch_whether_apply, ""),
+        mock_stream_shell_command.side_effect = [
+            CommandStream.from_output(CommandExitCode.SUCCEED, mock_hot_updateinfo_stdout),
+            CommandStream.from_output(CommandExitCode.SUCCEED, mock_cve_fixed_stdout),
+            CommandStream.from_output(CommandExitCode.SUCCEED, mock_hotpatch_whether_apply),
         ]
         expected_result = (
             SUCCESS,
@@ -212,13 +215,57 @@ class TestVulnerabilityManage(unittest.TestCase):
         )
         self.assertEqual(expected_result, VulnerabilityManage._check_cve_by_dnf(''))
 
-    @mock.patch('ceres.manages.vulnerability_manage.execute_shell_command')
-    def test_check_cve_by_dnf_should_return_empty_cve_list_when_command_execute_fail(self, mock_execute_shell_command):
-        mock_execute_shell_command.return_value = CommandExitCode.FAIL, "", ""
+    @mock.patch('ceres.manages.vulnerability_manage.stream_shell_command')
+    def test_check_cve_by_dnf_should_return_empty_cve_list_when_command_execute_fail(self, mock_stream_shell_command):
+        mock_stream_shell_command.return_value = CommandStream.from_output(CommandExitCode.FAIL, "")
         self.assertEqual(
             (COMMAND_EXEC_ERROR, {'fixed_cves': [], 'unfixed_cves': []}), VulnerabilityManage._check_cve_by_dnf('')
         )
 
+    @mock.patch('ceres.manages.vulnerability_manage.async_execute_shell_command')
+    def test_async_check_cve_by_dnf_should_fall_back_to_updateinfo_when_hotpatch_scan_is_not_supported(
+        self, mock_execute_shell_command
+    ):
+        mock_updateinfo_stdout = (
+            "Last metadata expiration check: 1:16:26 ago on Thu 06 Jul 2023 04:53:58 PM CST.\n"
+            "CVE-2023-34969 Moderate/Sec.  dbus-1:1.12.20-10.oe2203.x86_64\n"
+        )
+        mock_execute_shell_command.side_effect = [
+            (CommandExitCode.FAIL, "", ""),
+            (CommandExitCode.SUCCEED, "Last metadata expiration check\nCVE-2022-3715   Low/Sec. bash\n", ""),
+            (CommandExitCode.SUCCEED, "Last metadata expiration check\n", ""),
+            (CommandExitCode.SUCCEED, mock_updateinfo_stdout, ""),
+        ]
+        expected_result = (
+            SUCCESS,
+            {
+                "unfixed_cves": [{"cve_id": "CVE-2023-34969", "support_hp": False}],
+                "fixed_cves": [{"cve_id": "CVE-2022-3715", "fixed_by_hp": False}],
+            },
+        )
+        self.assertEqual(expected_result, asyncio.run(VulnerabilityManage._async_check_cve_by_dnf('')))
+
+    @mock.patch('ceres.manages.vulnerability_manage.stream_shell_command')
+    def test_check_cve_by_dnf_should_return_timeout_when_query_is_killed_at_deadline(self, mock_stream_shell_command):
+        mock_stream_shell_command.side_effect = [
+            CommandStream.from_output(CommandExitCode.SUCCEED, "Last metadata expiration check\n"),
+            CommandStream.from_output(CommandExitCode.TIMEOUT, ""),
+        ]
+        self.assertEqual(COMMAND_TIMEOUT, VulnerabilityManage._check_cve_by_dnf('')[0])
+
+    @mock.patch.object(VulnerabilityManage, "_validate_repo_source")
+    @mock.patch('ceres.manages.vulnerability_manage.stream_shell_command')
+    def test_cve_scan_should_share_scan_budget_between_dnf_queries(
+        self, mock_stream_shell_command, mock_validate_repo_source
+    ):
+        mock_validate_repo_source.return_value = True
+        mock_stream_shell_command.return_value = CommandStream.from_output(CommandExitCode.SUCCEED, "")
+        VulnerabilityManage().cve_scan({"basic": True})
+        timeouts = [call.kwargs["timeout"] for call in mock_stream_shell_command.call_args_list]
+        self.assertEqual(3, len(timeouts))
+        self.assertLessEqual(timeouts[0], CVE_SCAN_TIMEOUT / 3)
+        self.assertLessEqual(timeouts[1], CVE_SCAN_TIMEOUT / 2)
+
     @mock.patch.object(VulnerabilityManage, "_syscare_change_status")
     @mock.patch.object(VulnerabilityManage, "_hotpatch_list_cve_with_cveid")
     @mock.patch('ceres.manages.vulnerability_manage.execute_shell_command')
@@ -448,3 +495,24 @@ class TestVulnerabilityManage(unittest.TestCase):
         )
         mock_execute_shell_command.return_value = CommandExitCode.SUCCEED, mock_execte_shell_res, ""
         self.assertEqual(None, VulnerabilityManage._hotpatch_list_cve_with_cveid("CVE-2023-1111 "))
+
+    @mock.patch('ceres.manages.vulnerability_manage.execute_shell_command')
+    def test_syscare_operate_should_restore_patches_when_operation_timed_out(self, mock_execute_shell_command):
+        mock_execute_shell_command.side_effect = [
+            (CommandExitCode.SUCCEED, "", ""),
+            (CommandExitCode.TIMEOUT, "", ""),
+            (CommandExitCode.SUCCEED, "", ""),
+        ]
+        self.assertFalse(VulnerabilityManage()._syscare_operate("apply", "redis-6.2.5-1/HP002"))
+        self.assertEqual("syscare restore", mock_execute_shell_command.call_args_list[-1].args[0])
+
+    @mock.patch.object(VulnerabilityManage, "_hotpatch_info")
+    @mock.patch('ceres.manages.vulnerability_manage.execute_shell_command')
+    def test_hotpatch_rollback_should_return_false_when_dnf_remove_timed_out(
+        self, mock_execute_shell_command, mock_hotpatch_info
+    ):
+        mock_hotpatch_info.return_value = True, {"version": "1", "release": "1"}
+        mock_execute_shell_command.return_value = CommandExitCode.TIMEOUT, "Removing", ""
+        self.assertEqual(
+            (False, "Removing\ncommand timed out"), VulnerabilityManage()._hotpatch_rollback("redis-6.2.5-1/HP002")
+        )